@@ -1,12 +1,50 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import create_engine, text, inspect
+from sqlalchemy import text
 from datetime import datetime, timedelta
-import hashlib
+import hmac
+import math
 import secrets
-import time
 import string
 import random
+from engine_registry import engine_registry
+from schema_catalog import SchemaCatalog
+from reference_data import ReferenceDataCache
+from ticket_search import TicketSearchEngine, FULLTEXT_INDEXES
+from query_metrics import query_metrics, estimate_bytes
+from login_throttle import LoginThrottle
+from password_hashing import password_hashing
+from migrations import MigrationRunner
+from ticket_import import TicketImporter, DEFAULT_BATCH_SIZE
+from ticket_statistics import TicketStatistics, DIMENSIONS, statistics_key
+from ticket_analytics import TicketAnalytics
+from ticket_cache import TicketDetailCache
+from query_executor import QueryExecutor
+
+# Spalten der Ticketübersicht (gemeinsam für Seitenabfrage und Detailansicht)
+TICKET_OVERVIEW_COLUMNS = """
+    t.ID_Ticket, t.Titel, t.Beschreibung, t.Priorität, 
+    s.Name as Status, m.Name as Mitarbeiter, k.Name as Kunde,
+    t.Erstellt_am, t.Geändert_am
+"""
+
+TICKET_OVERVIEW_JOINS = """
+    LEFT JOIN status s ON t.Status_ID = s.ID_Status
+    LEFT JOIN mitarbeiter m ON t.Mitarbeiter_ID = m.ID_Mitarbeiter
+    LEFT JOIN kunden k ON t.Kunde_ID = k.ID_Kunde
+"""
+
+# Anzahl der Kommentare, die in der Ticketansicht auf einmal geladen werden
+COMMENT_PAGE_SIZE = 20
+
+# Suchfelder der Ticketübersicht: Textspalten von tickets und Stammdaten, deren Namen durchsucht werden
+TICKET_SEARCH_FIELDS = {
+    "Alle Felder": (["t.Titel", "t.Beschreibung"], [("kunden", "t.Kunde_ID"), ("mitarbeiter", "t.Mitarbeiter_ID")]),
+    "Titel": (["t.Titel"], []),
+    "Beschreibung": (["t.Beschreibung"], []),
+    "Kunde": ([], [("kunden", "t.Kunde_ID")]),
+    "Mitarbeiter": ([], [("mitarbeiter", "t.Mitarbeiter_ID")]),
+}
 
 class DatabaseManager:
     """
@@ -14,7 +52,8 @@ class DatabaseManager:
     Enthält Methoden für Datenbankzugriff, Benutzerauthentifizierung und Datenmanipulation.
     """
     
-    def __init__(self, db_user, db_password, db_host, db_port, db_name):
+    def __init__(self, db_user=None, db_password=None, db_host=None, db_port=None, db_name=None, pool_settings=None,
+                 slow_query_threshold=None, connection_url=None, persistent_login_throttle=False):
         """
         Initialisiert den DatabaseManager mit Datenbankverbindungsparametern.
         
@@ -24,247 +63,1333 @@ class DatabaseManager:
             db_host: Datenbankhost
             db_port: Datenbankport
             db_name: Datenbankname
+            pool_settings: Einstellungen für den gemeinsamen Verbindungspool (optional),
+                           z.B. pool_size, max_overflow, pool_recycle, pool_pre_ping, pool_timeout
+            slow_query_threshold: Laufzeit in Sekunden, ab der Abfragen protokolliert werden (optional)
+            connection_url: Vollständiger SQLAlchemy-Verbindungsstring (optional), ersetzt die
+                            Einzelparameter, z.B. "sqlite:///benchmark.db" für Benchmarks
+            persistent_login_throttle: Fehlversuche bei der Anmeldung in der Datenbank statt
+                                       im Prozess zählen, z.B. bei mehreren Anwendungsservern (optional)
         """
         self.db_user = db_user
         self.db_password = db_password
         self.db_host = db_host
         self.db_port = db_port
         self.db_name = db_name
+        self.pool_settings = pool_settings
+        self.connection_url = connection_url
+        self.persistent_login_throttle = persistent_login_throttle
+        
+        # Gemeinsames Passwort-Hashing mit begrenztem Thread-Pool
+        self.password_hashing = password_hashing
+        
+        # Gemeinsame Abfragemessung für alle Engines
+        self.metrics = query_metrics
+        if slow_query_threshold is not None:
+            self.metrics.slow_query_threshold = slow_query_threshold
         
         # Verbindung zur Datenbank herstellen
         self.setup_database_connection()
 
     def get_status_options(self):
-        query = "SELECT Name FROM status ORDER BY ID_Status"
-        df = pd.read_sql(query, con=self.engine)
-        return df["Name"].tolist()
+        return self.get_lookup("status").names
 
     def get_mitarbeiter_options(self):
-        query = "SELECT Name FROM mitarbeiter ORDER BY Name"
-        df = pd.read_sql(query, con=self.engine)
-        return df["Name"].tolist()
+        return self.get_lookup("mitarbeiter").names
 
     def get_kunden_options(self):
-        query = "SELECT Name FROM kunden ORDER BY Name"
-        df = pd.read_sql(query, con=self.engine)
-        return df["Name"].tolist()
+        return self.get_lookup("kunden").names
 
     def get_kategorien_options(self):
-        query = "SELECT Name FROM kategorien ORDER BY Name"
-        df = pd.read_sql(query, con=self.engine)
-        return df["Name"].tolist()
+        return self.get_lookup("kategorien").names
 
     def get_prioritaeten_options(self):
-        query = "SELECT DISTINCT Priorität FROM tickets ORDER BY FIELD(Priorität, 'Hoch', 'Mittel', 'Niedrig')"
-        df = pd.read_sql(query, con=self.engine)
-        return df["Priorität"].dropna().tolist()
+        return self.get_lookup("prioritaeten").names
+
+    def get_lookup(self, name):
+        """
+        Gibt die zwischengespeicherten Stammdaten einer Nachschlagetabelle zurück.
+        
+        Args:
+            name: Name der Tabelle (status, mitarbeiter, kunden, kategorien, prioritaeten)
+            
+        Returns:
+            LookupTable: Stammdaten mit names, ids, id_to_name und name_to_id
+        """
+        return self.reference_data.get(name)
+
+    def get_lookups(self, names):
+        """
+        Gibt die Stammdaten mehrerer Nachschlagetabellen zurück; nur fehlende oder veraltete
+        Tabellen werden parallel geladen.
+        
+        Args:
+            names: Namen der Tabellen (status, mitarbeiter, kunden, kategorien, prioritaeten)
+            
+        Returns:
+            dict: Name -> LookupTable
+        """
+        lookups = {name: self.reference_data.get_cached(name) for name in names}
+        missing = [name for name, lookup in lookups.items() if lookup is None]
+        if missing:
+            lookups.update(self.run_concurrently({name: lambda name=name: self.get_lookup(name) for name in missing}))
+        return lookups
+
+    def run_concurrently(self, tasks):
+        """
+        Führt voneinander unabhängige Abfragen parallel über den Verbindungspool aus
+        und wartet auf alle Ergebnisse. Die Abfragen werden weiterhin der aktuellen Seite
+        in den Abfragemetriken zugeordnet.
+        
+        Args:
+            tasks: Dictionary Name -> Funktion ohne Argumente, z.B. lambda: self.get_ticket(1)
+            
+        Returns:
+            dict: Name -> Ergebnis der Funktion
+        """
+        return self.query_executor.run(tasks)
+
+    def get_reference_data_version(self, name):
+        """
+        Gibt die Version der Stammdaten einer Tabelle zurück, z.B. für Caches in der Oberfläche.
+        
+        Args:
+            name: Name der Tabelle
+            
+        Returns:
+            int: Versionsnummer (erhöht sich bei jeder Änderung über invalidate_reference_data)
+        """
+        return self.reference_data.version(name)
+
+    def invalidate_reference_data(self, name):
+        """
+        Markiert die Stammdaten einer Tabelle nach einer Änderung als veraltet.
+        
+        Args:
+            name: Name der Tabelle (andere Tabellen werden ignoriert)
+        """
+        self.reference_data.bump(name)
+        
+        # Die Prioritäten werden aus den vorhandenen Tickets gelesen
+        if name == "tickets":
+            self.reference_data.bump("prioritaeten")
+        
+        # Ticketdetails enthalten Namen aus den Stammdaten und die Kommentare
+        if name in ("tickets", "kommentare", "status", "mitarbeiter", "kunden"):
+            self.ticket_details.invalidate()
 
 
     def setup_database_connection(self):
         """
-        Stellt die Verbindung zur Datenbank her und initialisiert den Inspector.
+        Stellt die Verbindung zur Datenbank her und initialisiert den Schema-Katalog.
+        Die Engine wird prozessweit geteilt, sodass Streamlit-Reruns keine neuen
+        Verbindungen aufbauen.
+        """
+        try:
+            # Verbindungsstring erstellen
+            connection_string = self.connection_url or f"mysql+pymysql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
+            self.connection_string = connection_string
+            
+            # Gemeinsame Engine aus der Registry holen (wird beim ersten Aufruf angelegt und getestet)
+            self.engine = engine_registry.get_engine(connection_string, self.pool_settings)
+            
+            # Laufzeiten, Zeilen und Pool-Wartezeiten messen (einmal pro Engine)
+            self.metrics.instrument(self.engine)
+            
+            # Gemeinsamer Katalog für Metadaten
+            self.schema = SchemaCatalog.for_engine(self.engine)
+            
+            # Gemeinsamer Cache für Stammdaten
+            self.reference_data = ReferenceDataCache.for_engine(self.engine)
+            
+            # Gemeinsame Volltextsuche für Tickets
+            self.ticket_search = TicketSearchEngine.for_engine(self.engine)
+            
+            # Gemeinsame vorberechnete Ticketstatistik
+            self.ticket_statistics = TicketStatistics.for_engine(self.engine)
+            
+            # Gemeinsamer Cache für Ticketdetails
+            self.ticket_details = TicketDetailCache.for_engine(self.engine)
+            
+            # Gemeinsame Zeitreihen-Auswertung
+            self.ticket_analytics = TicketAnalytics.for_engine(self.engine)
+            
+            # Gemeinsame Worker für parallele Abfragen einer Seite
+            self.query_executor = QueryExecutor.for_engine(self.engine)
+            
+            # Gemeinsamer Schutz vor Brute-Force-Angriffen
+            self.login_throttle = LoginThrottle.for_engine(self.engine, self.persistent_login_throttle)
+            
+            return True
+        except Exception as e:
+            print(f"Fehler bei der Datenbankverbindung: {str(e)}")
+            return False
+    
+    def get_columns(self, table):
+        """
+        Gibt die Spaltennamen einer Tabelle zurück.
+        
+        Args:
+            table: Name der Tabelle
+            
+        Returns:
+            list: Liste der Spaltennamen
+        """
+        try:
+            return [col["name"] for col in self.schema.get_columns(table)]
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Spalten: {str(e)}")
+            return []
+    
+    def get_primary_key(self, table):
+        """
+        Ermittelt den Primärschlüssel einer Tabelle.
+        
+        Args:
+            table: Name der Tabelle
+            
+        Returns:
+            str: Name der Primärschlüsselspalte oder None
+        """
+        try:
+            pk_columns = self.schema.get_primary_key_columns(table)
+            if pk_columns:
+                return pk_columns[0]
+            
+            # Fallback: Suche nach Spalten mit 'id' im Namen
+            columns = self.get_columns(table)
+            for col in columns:
+                if col.lower() == 'id':
+                    return col
+            
+            # Zweiter Fallback: Erste Spalte
+            if columns:
+                return columns[0]
+            
+            return None
+        except Exception as e:
+            print(f"Fehler beim Ermitteln des Primärschlüssels: {str(e)}")
+            return None
+    
+    def get_single_primary_key(self, table):
+        """
+        Gibt die Primärschlüsselspalte zurück, wenn die Tabelle einen echten Primärschlüssel
+        aus genau einer Spalte hat. Anders als get_primary_key ohne Ausweichen auf "id" oder
+        die erste Spalte, damit Joins und Keyset-Paginierung nur über eindeutige Werte laufen.
+        
+        Args:
+            table: Name der Tabelle
+            
+        Returns:
+            str: Name der Primärschlüsselspalte oder None
+        """
+        try:
+            pk_columns = self.schema.get_primary_key_columns(table)
+            return pk_columns[0] if len(pk_columns) == 1 else None
+        except Exception as e:
+            print(f"Fehler beim Ermitteln des Primärschlüssels: {str(e)}")
+            return None
+    
+    def get_column_types(self, table):
+        """
+        Gibt die Spaltentypen einer Tabelle zurück.
+        
+        Args:
+            table: Name der Tabelle
+            
+        Returns:
+            dict: Dictionary mit Spaltenname als Schlüssel und Spaltentyp als Wert
+        """
+        try:
+            return {col["name"]: col["type"] for col in self.schema.get_columns(table)}
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Spaltentypen: {str(e)}")
+            return {}
+    
+    def is_auto_increment(self, table, column):
+        """
+        Prüft, ob eine Spalte automatisch hochgezählt wird.
+        
+        Args:
+            table: Name der Tabelle
+            column: Name der Spalte
+            
+        Returns:
+            bool: Spalte ist Auto-Increment
+        """
+        try:
+            return any(col["name"] == column and col["autoincrement"] for col in self.schema.get_columns(table))
+        except Exception as e:
+            print(f"Fehler beim Prüfen der Auto-Increment-Spalte: {str(e)}")
+            return False
+    
+    def refresh_schema(self):
+        """
+        Verwirft die zwischengespeicherten Schema-Metadaten, damit sie beim nächsten Zugriff neu geladen werden.
+        """
+        self.schema.invalidate()
+    
+    def get_table_names(self):
+        """
+        Gibt die Namen aller Tabellen in der Datenbank zurück.
+        
+        Returns:
+            list: Liste der Tabellennamen
+        """
+        try:
+            return self.schema.get_table_names()
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Tabellennamen: {str(e)}")
+            return []
+    
+    def execute_query(self, query, params=None):
+        """
+        Führt eine SQL-Abfrage aus.
+        
+        Args:
+            query: SQL-Abfrage
+            params: Parameter für die Abfrage (optional)
+            
+        Returns:
+            bool: Erfolg
+        """
+        try:
+            if params is None:
+                params = {}
+            
+            with self.engine.begin() as conn:
+                conn.execute(text(query), params)
+            
+            return True
+        except Exception as e:
+            print(f"Fehler bei der Datenbankabfrage: {str(e)}")
+            return False
+    
+    def execute_query_to_df(self, query, params=None):
+        """
+        Führt eine SQL-Abfrage aus und gibt das Ergebnis als DataFrame zurück.
+        
+        Args:
+            query: SQL-Abfrage
+            params: Parameter für die Abfrage (optional)
+            
+        Returns:
+            pandas.DataFrame: Ergebnis der Abfrage
+        """
+        try:
+            if params is None:
+                params = {}
+            
+            df = pd.read_sql(text(query), self.engine, params=params)
+            self.metrics.record_fetch(query, estimate_bytes(df))
+            return df
+        except Exception as e:
+            print(f"Fehler bei der Datenbankabfrage: {str(e)}")
+            return pd.DataFrame()
+    
+    def execute_transaction(self, query, params=None):
+        """
+        Führt eine SQL-Transaktion aus.
+        
+        Args:
+            query: SQL-Abfrage
+            params: Parameter für die Abfrage (optional)
+            
+        Returns:
+            bool: Erfolg
+        """
+        try:
+            if params is None:
+                params = {}
+            
+            with self.engine.begin() as conn:
+                result = conn.execute(text(query), params)
+                return result
+        except Exception as e:
+            print(f"Fehler bei der Datenbanktransaktion: {str(e)}")
+            return None
+    
+    def _insert_ignore(self, table, columns, source):
+        """
+        Erstellt ein INSERT, das Zeilen mit bereits vorhandenem eindeutigen Schlüssel überspringt.
+        
+        Args:
+            table: Name der Tabelle
+            columns: Liste der Spalten
+            source: VALUES-Klausel oder SELECT-Abfrage
+            
+        Returns:
+            str: SQL-Anweisung für den Dialekt der Engine
+        """
+        column_list = ", ".join(columns)
+        dialect = self.engine.dialect.name
+        
+        if dialect == "mysql":
+            return f"INSERT IGNORE INTO {table} ({column_list}) {source}"
+        if dialect == "sqlite":
+            return f"INSERT OR IGNORE INTO {table} ({column_list}) {source}"
+        return f"INSERT INTO {table} ({column_list}) {source} ON CONFLICT DO NOTHING"
+    
+    def create_ticket_relations(self, ticket_id, mitarbeiter_id, kategorie_id=1):
+        """
+        Erstellt automatisch Einträge in ticket_mitarbeiter und ticket_kategorie.
+        Vorhandene Einträge werden über die eindeutigen Indizes übersprungen,
+        sodass höchstens zwei Anweisungen in einer Transaktion nötig sind.
+        
+        Args:
+            ticket_id: ID des Tickets
+            mitarbeiter_id: ID des Mitarbeiters
+            kategorie_id: ID der Kategorie (optional, Standard: 1)
+            
+        Returns:
+            bool: Erfolg
+        """
+        try:
+            with self.engine.begin() as conn:
+                # Eintrag in ticket_mitarbeiter
+                if mitarbeiter_id:
+                    insert_query = self._insert_ignore(
+                        "ticket_mitarbeiter", ["ID_Ticket", "ID_Mitarbeiter", "Rolle_im_Ticket"],
+                        "VALUES (:ticket_id, :mitarbeiter_id, 'Hauptverantwortlicher')"
+                    )
+                    conn.execute(text(insert_query), {"ticket_id": ticket_id, "mitarbeiter_id": mitarbeiter_id})
+                
+                # Eintrag in ticket_kategorie, nur wenn die Kategorie existiert
+                if kategorie_id:
+                    insert_query = self._insert_ignore(
+                        "ticket_kategorie", ["ID_Ticket", "ID_Kategorie"],
+                        "SELECT :ticket_id, ID_Kategorie FROM kategorie WHERE ID_Kategorie = :kategorie_id"
+                    )
+                    conn.execute(text(insert_query), {"ticket_id": ticket_id, "kategorie_id": kategorie_id})
+            
+            return True
+        except Exception as e:
+            print(f"Fehler beim Erstellen der Ticket-Beziehungen: {str(e)}")
+            return False
+    
+    def create_ticket_relations_bulk(self, relations):
+        """
+        Erstellt die Einträge in ticket_mitarbeiter und ticket_kategorie für viele Tickets,
+        z.B. bei Massenimporten. Es werden unabhängig von der Anzahl der Tickets drei
+        Anweisungen ausgeführt (Kategorien prüfen und zwei executemany).
+        
+        Args:
+            relations: Liste von (Ticket-ID, Mitarbeiter-ID, Kategorie-ID); Mitarbeiter und
+                       Kategorie dürfen None sein
+            
+        Returns:
+            bool: Erfolg
+        """
+        try:
+            mitarbeiter_rows = [
+                {"ticket_id": ticket_id, "mitarbeiter_id": mitarbeiter_id}
+                for ticket_id, mitarbeiter_id, _ in relations if mitarbeiter_id
+            ]
+            kategorie_ids = sorted({kategorie_id for _, _, kategorie_id in relations if kategorie_id})
+            
+            with self.engine.begin() as conn:
+                # Vorhandene Kategorien in einer Abfrage ermitteln
+                existing_kategorien = set()
+                if kategorie_ids:
+                    placeholders = ", ".join(f":kategorie_{i}" for i in range(len(kategorie_ids)))
+                    params = {f"kategorie_{i}": kategorie_id for i, kategorie_id in enumerate(kategorie_ids)}
+                    query = text(f"SELECT ID_Kategorie FROM kategorie WHERE ID_Kategorie IN ({placeholders})")
+                    existing_kategorien = {row[0] for row in conn.execute(query, params).fetchall()}
+                
+                kategorie_rows = [
+                    {"ticket_id": ticket_id, "kategorie_id": kategorie_id}
+                    for ticket_id, _, kategorie_id in relations if kategorie_id in existing_kategorien
+                ]
+                
+                if mitarbeiter_rows:
+                    insert_query = self._insert_ignore(
+                        "ticket_mitarbeiter", ["ID_Ticket", "ID_Mitarbeiter", "Rolle_im_Ticket"],
+                        "VALUES (:ticket_id, :mitarbeiter_id, 'Hauptverantwortlicher')"
+                    )
+                    conn.execute(text(insert_query), mitarbeiter_rows)
+                
+                if kategorie_rows:
+                    insert_query = self._insert_ignore(
+                        "ticket_kategorie", ["ID_Ticket", "ID_Kategorie"],
+                        "VALUES (:ticket_id, :kategorie_id)"
+                    )
+                    conn.execute(text(insert_query), kategorie_rows)
+            
+            return True
+        except Exception as e:
+            print(f"Fehler beim Erstellen der Ticket-Beziehungen: {str(e)}")
+            return False
+    
+    # Ticketabfragen
+    
+    def _build_ticket_filter(self, filters, include_search=True):
+        """
+        Erstellt die WHERE-Bedingungen für die Ticketübersicht.
+        Alle Bedingungen beziehen sich nur auf den Alias t, sodass keine Joins nötig sind.
+        
+        Args:
+            filters: Dictionary mit status_id, prioritaet, mitarbeiter_id,
+                     search_term und search_field (alle optional)
+            include_search: Ob der Suchbegriff berücksichtigt wird (optional, Standard: True)
+            
+        Returns:
+            tuple: (Liste der Bedingungen, Parameter)
+        """
+        conditions = []
+        params = {}
+        
+        if filters.get("status_id") is not None:
+            conditions.append("t.Status_ID = :status_id")
+            params["status_id"] = filters["status_id"]
+        
+        if filters.get("prioritaet"):
+            conditions.append("t.Priorität = :priority")
+            params["priority"] = filters["prioritaet"]
+        
+        if filters.get("mitarbeiter_id") is not None:
+            conditions.append("t.Mitarbeiter_ID = :mitarbeiter_id")
+            params["mitarbeiter_id"] = filters["mitarbeiter_id"]
+        
+        search_term = filters.get("search_term")
+        if include_search and search_term:
+            text_columns, lookup_columns = TICKET_SEARCH_FIELDS.get(filters.get("search_field"), TICKET_SEARCH_FIELDS["Alle Felder"])
+            search_conditions = [f"{col} LIKE :search_term" for col in text_columns]
+            if text_columns:
+                params["search_term"] = f"%{search_term}%"
+            
+            # Kunden- und Mitarbeiternamen im Stammdaten-Cache statt per Join durchsuchen
+            name_condition, name_params = self._build_name_match_condition(search_term, lookup_columns)
+            if name_condition:
+                search_conditions.append(name_condition)
+                params.update(name_params)
+            
+            conditions.append("(" + " OR ".join(search_conditions) + ")" if search_conditions else "1 = 0")
+        
+        return conditions, params
+    
+    def _build_name_match_condition(self, search_term, lookup_columns):
+        """
+        Erstellt eine IN-Bedingung für alle Stammdaten-IDs, deren Name den Suchbegriff enthält.
+        
+        Args:
+            search_term: Suchbegriff
+            lookup_columns: Liste von (Nachschlagetabelle, Spalte in tickets)
+            
+        Returns:
+            tuple: (Bedingung oder None, Parameter)
+        """
+        conditions = []
+        params = {}
+        term = search_term.lower()
+        
+        for lookup_name, column in lookup_columns:
+            lookup = self.get_lookup(lookup_name)
+            matching_ids = [row_id for row_id, name in zip(lookup.ids, lookup.names) if name and term in name.lower()]
+            if not matching_ids:
+                continue
+            
+            placeholders = []
+            for i, row_id in enumerate(matching_ids):
+                param_name = f"{lookup_name}_id_{i}"
+                params[param_name] = row_id
+                placeholders.append(f":{param_name}")
+            conditions.append(f"{column} IN ({', '.join(placeholders)})")
+        
+        if not conditions:
+            return None, {}
+        return " OR ".join(conditions), params
+    
+    def count_tickets(self, filters=None, allow_estimate=True):
+        """
+        Zählt die Tickets, die den Filtern entsprechen.
+        Ohne Filter wird auf MySQL die Zeilenschätzung aus information_schema verwendet.
+        
+        Args:
+            filters: Filter wie bei get_ticket_page (optional)
+            allow_estimate: Ob ohne Filter eine Schätzung genügt (optional, Standard: True)
+            
+        Returns:
+            tuple: (Anzahl, Ist Schätzung)
+        """
+        filters = filters or {}
+        conditions, params = self._build_ticket_filter(filters)
+        
+        try:
+            if not conditions and allow_estimate:
+                estimate = self.estimate_row_count("tickets")
+                if estimate is not None:
+                    return estimate, True
+            
+            query = "SELECT COUNT(*) FROM tickets t"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            
+            with self.engine.connect() as conn:
+                return int(conn.execute(text(query), params).scalar() or 0), False
+        except Exception as e:
+            print(f"Fehler beim Zählen der Tickets: {str(e)}")
+            return 0, False
+    
+    def get_ticket_page(self, filters=None, page_size=50, cursor=None, direction="next"):
+        """
+        Lädt eine Seite der Ticketübersicht per Keyset-Paginierung auf (Erstellt_am, ID_Ticket).
+        
+        Args:
+            filters: Dictionary mit status_id, prioritaet, mitarbeiter_id,
+                     search_term und search_field (optional)
+            page_size: Anzahl der Tickets pro Seite (optional, Standard: 50)
+            cursor: (Erstellt_am, ID_Ticket) des letzten Tickets der vorherigen Seite bei "next"
+                    bzw. des ersten Tickets der aktuellen Seite bei "prev" (optional)
+            direction: "next" für ältere, "prev" für neuere Tickets (optional, Standard: "next")
+            
+        Returns:
+            tuple: (pandas.DataFrame mit den Tickets, Weitere Seite in dieser Richtung vorhanden)
+        """
+        filters = filters or {}
+        conditions, params = self._build_ticket_filter(filters)
+        
+        if cursor is not None:
+            operator = "<" if direction == "next" else ">"
+            conditions.append(
+                f"(t.Erstellt_am {operator} :cursor_erstellt OR "
+                f"(t.Erstellt_am = :cursor_erstellt AND t.ID_Ticket {operator} :cursor_id))"
+            )
+            params["cursor_erstellt"] = cursor[0]
+            params["cursor_id"] = cursor[1]
+        
+        order = "DESC" if direction == "next" else "ASC"
+        query = f"SELECT {TICKET_OVERVIEW_COLUMNS} FROM tickets t {TICKET_OVERVIEW_JOINS}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY t.Erstellt_am {order}, t.ID_Ticket {order} LIMIT :limit"
+        
+        # Eine Zeile mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+        params["limit"] = page_size + 1
+        
+        tickets_df = self.execute_query_to_df(query, params)
+        has_more = len(tickets_df) > page_size
+        tickets_df = tickets_df.head(page_size)
+        
+        if direction == "prev":
+            tickets_df = tickets_df.iloc[::-1].reset_index(drop=True)
+        
+        return tickets_df, has_more
+    
+    def search_tickets(self, filters, limit=500):
+        """
+        Sucht Tickets per Volltextsuche und liefert sie nach Relevanz sortiert.
+        Bei "Alle Felder" werden anschließend Tickets angehängt, deren Kunde oder Mitarbeiter passt.
+        
+        Args:
+            filters: Filter wie bei get_ticket_page, inklusive search_term und search_field
+            limit: Maximale Anzahl der Treffer (optional, Standard: 500)
+            
+        Returns:
+            list: Liste von (ID_Ticket, Relevanz) oder None, wenn keine Volltextsuche möglich ist
+                  (Suchfeld Kunde/Mitarbeiter oder Suchbegriff ohne durchsuchbare Wörter)
+        """
+        search_field = filters.get("search_field", "Alle Felder")
+        if search_field not in FULLTEXT_INDEXES:
+            return None
+        
+        conditions, params = self._build_ticket_filter(filters, include_search=False)
+        
+        try:
+            ranked = self.ticket_search.search(filters["search_term"], search_field, conditions, params, limit)
+            if ranked is None:
+                return None
+            
+            if search_field == "Alle Felder" and len(ranked) < limit:
+                _, lookup_columns = TICKET_SEARCH_FIELDS["Alle Felder"]
+                name_condition, name_params = self._build_name_match_condition(filters["search_term"], lookup_columns)
+                if name_condition:
+                    query = "SELECT t.ID_Ticket FROM tickets t WHERE " + " AND ".join([f"({name_condition})"] + conditions)
+                    query += " ORDER BY t.Erstellt_am DESC, t.ID_Ticket DESC LIMIT :limit"
+                    with self.engine.connect() as conn:
+                        name_ids = conn.execute(text(query), {**params, **name_params, "limit": limit}).scalars().all()
+                    
+                    seen = {ticket_id for ticket_id, _ in ranked}
+                    ranked.extend((ticket_id, 0.0) for ticket_id in name_ids if ticket_id not in seen)
+                    ranked = ranked[:limit]
+            
+            return ranked
+        except Exception as e:
+            print(f"Fehler bei der Volltextsuche: {str(e)}")
+            return None
+    
+    def get_tickets_by_ids(self, ticket_ids):
+        """
+        Lädt die Übersichtsdaten für bestimmte Tickets in der angegebenen Reihenfolge.
+        
+        Args:
+            ticket_ids: Liste der Ticket-IDs
+            
+        Returns:
+            pandas.DataFrame: Tickets in der Reihenfolge von ticket_ids
+        """
+        if not ticket_ids:
+            return pd.DataFrame()
+        
+        params = {f"ticket_id_{i}": ticket_id for i, ticket_id in enumerate(ticket_ids)}
+        placeholders = ", ".join(f":{name}" for name in params)
+        query = f"SELECT {TICKET_OVERVIEW_COLUMNS} FROM tickets t {TICKET_OVERVIEW_JOINS} WHERE t.ID_Ticket IN ({placeholders})"
+        
+        tickets_df = self.execute_query_to_df(query, params)
+        if tickets_df.empty:
+            return tickets_df
+        
+        order = {ticket_id: position for position, ticket_id in enumerate(ticket_ids)}
+        return tickets_df.sort_values("ID_Ticket", key=lambda ids: ids.map(order)).reset_index(drop=True)
+    
+    def get_ticket(self, ticket_id):
+        """
+        Lädt die Details eines Tickets mit Status-, Mitarbeiter- und Kundennamen.
+        
+        Args:
+            ticket_id: ID des Tickets
+            
+        Returns:
+            pandas.DataFrame: Ticket (leer, wenn es nicht existiert)
+        """
+        query = f"""
+        SELECT {TICKET_OVERVIEW_COLUMNS}
+        FROM tickets t
+        {TICKET_OVERVIEW_JOINS}
+        WHERE t.ID_Ticket = :ticket_id
+        """
+        return self.execute_query_to_df(query, {"ticket_id": ticket_id})
+    
+    def get_ticket_comments(self, ticket_id, page_size=COMMENT_PAGE_SIZE, cursor=None):
+        """
+        Lädt eine Seite der Kommentare eines Tickets per Keyset-Paginierung auf (Erstellt_am, ID_Kommentar),
+        die neuesten zuerst.
+        
+        Args:
+            ticket_id: ID des Tickets
+            page_size: Anzahl der Kommentare pro Seite (optional, Standard: COMMENT_PAGE_SIZE)
+            cursor: (Erstellt_am, ID_Kommentar) des ältesten bereits geladenen Kommentars (optional)
+            
+        Returns:
+            tuple: (pandas.DataFrame mit den Kommentaren und Mitarbeitername, Ältere Kommentare vorhanden)
+        """
+        params = {"ticket_id": ticket_id, "limit": page_size + 1}
+        cursor_condition = ""
+        if cursor is not None:
+            cursor_condition = """
+            AND (k.Erstellt_am < :cursor_erstellt OR
+                 (k.Erstellt_am = :cursor_erstellt AND k.ID_Kommentar < :cursor_id))
+            """
+            params["cursor_erstellt"] = cursor[0]
+            params["cursor_id"] = cursor[1]
+        
+        query = f"""
+        SELECT k.ID_Kommentar, k.Kommentar, m.Name AS Mitarbeiter, k.Erstellt_am
+        FROM kommentare k
+        JOIN mitarbeiter m ON k.Mitarbeiter_ID = m.ID_Mitarbeiter
+        WHERE k.Ticket_ID = :ticket_id {cursor_condition}
+        ORDER BY k.Erstellt_am DESC, k.ID_Kommentar DESC
+        LIMIT :limit
+        """
+        
+        # Eine Zeile mehr laden, um zu erkennen, ob es ältere Kommentare gibt
+        comments_df = self.execute_query_to_df(query, params)
+        has_more = len(comments_df) > page_size
+        return comments_df.head(page_size), has_more
+    
+    def count_ticket_comments(self, ticket_id):
+        """
+        Zählt die Kommentare eines Tickets (wie get_ticket_comments nur mit vorhandenem Mitarbeiter).
+        
+        Args:
+            ticket_id: ID des Tickets
+            
+        Returns:
+            int: Anzahl der Kommentare
+        """
+        query = """
+        SELECT COUNT(*) AS Anzahl
+        FROM kommentare k
+        JOIN mitarbeiter m ON k.Mitarbeiter_ID = m.ID_Mitarbeiter
+        WHERE k.Ticket_ID = :ticket_id
+        """
+        result = self.execute_query_to_df(query, {"ticket_id": ticket_id})
+        return 0 if result.empty else int(result.iloc[0]["Anzahl"])
+    
+    def get_ticket_details(self, ticket_id, modified=None):
+        """
+        Lädt ein Ticket mit der ersten Seite seiner Kommentare und deren Gesamtzahl,
+        bei wiederholtem Aufruf aus dem Cache. Ältere Kommentare lädt get_ticket_comments mit Cursor.
+        
+        Args:
+            ticket_id: ID des Tickets
+            modified: Bekannter Wert von Geändert_am, z.B. aus der Ticketübersicht (optional);
+                      weicht er vom zwischengespeicherten ab, wird neu geladen
+            
+        Returns:
+            tuple: (Ticket als DataFrame, neueste Kommentare als DataFrame, Anzahl aller Kommentare)
+        """
+        ticket_id = int(ticket_id)
+        cached = self.ticket_details.get(ticket_id, modified)
+        if cached is not None:
+            return cached["ticket"], cached["comments"], cached["comment_count"]
+        
+        ticket_df = self.get_ticket(ticket_id)
+        comments_df, has_more = self.get_ticket_comments(ticket_id)
+        # Zählen nur nötig, wenn nicht alle Kommentare auf die erste Seite passen
+        comment_count = self.count_ticket_comments(ticket_id) if has_more else len(comments_df)
+        
+        # Nicht vorhandene Tickets nicht zwischenspeichern
+        if not ticket_df.empty:
+            self.ticket_details.put(ticket_id, ticket_df.iloc[0]["Geändert_am"], {
+                "ticket": ticket_df,
+                "comments": comments_df,
+                "comment_count": comment_count,
+            })
+        
+        return ticket_df, comments_df, comment_count
+    
+    def invalidate_ticket_details(self, ticket_id=None):
+        """
+        Verwirft die zwischengespeicherten Details eines oder aller Tickets nach einer Änderung.
+        
+        Args:
+            ticket_id: ID des Tickets (optional, sonst alle)
+        """
+        self.ticket_details.invalidate(None if ticket_id is None else int(ticket_id))
+    
+    def add_ticket_comment(self, ticket_id, mitarbeiter_id, kommentar):
+        """
+        Fügt einem Ticket einen Kommentar hinzu und verwirft dessen zwischengespeicherte Details.
+        
+        Args:
+            ticket_id: ID des Tickets
+            mitarbeiter_id: ID des kommentierenden Mitarbeiters
+            kommentar: Text des Kommentars
+            
+        Returns:
+            bool: Erfolg
+        """
+        insert_query = """
+        INSERT INTO kommentare (Ticket_ID, Mitarbeiter_ID, Kommentar, Erstellt_am)
+        VALUES (:ticket_id, :mitarbeiter_id, :kommentar, CURRENT_TIMESTAMP)
+        """
+        
+        success = self.execute_query(insert_query, {
+            "ticket_id": ticket_id,
+            "mitarbeiter_id": mitarbeiter_id,
+            "kommentar": kommentar
+        })
+        
+        if success:
+            self.invalidate_ticket_details(ticket_id)
+        
+        return success
+    
+    def get_ticket_statistics(self):
+        """
+        Zählt die Tickets nach Status, Priorität und Mitarbeiter.
+        Die Zähler stammen aus der Tabelle ticket_statistik, die Namen aus dem Stammdaten-Cache.
+        
+        Returns:
+            dict: DataFrames unter den Schlüsseln status, prioritaet und mitarbeiter
+        """
+        try:
+            # Zähler und Stammdaten unabhängig voneinander parallel laden
+            results = self.run_concurrently({
+                "counts": self.ticket_statistics.get_counts,
+                "status": lambda: self.get_lookup("status"),
+                "mitarbeiter": lambda: self.get_lookup("mitarbeiter"),
+            })
+            counts = results["counts"]
+            
+            def to_df(dimension, column, lookup_name):
+                lookup = results[lookup_name]
+                # Reihenfolge der Stammdaten beibehalten; Zähler ohne Stammdatensatz entfallen wie beim JOIN
+                rows = [
+                    (name, counts[dimension][str(row_id)])
+                    for row_id, name in zip(lookup.ids, lookup.names)
+                    if str(row_id) in counts[dimension]
+                ]
+                df = pd.DataFrame(rows, columns=[column, "Anzahl"])
+                return df.groupby(column, as_index=False, sort=False)["Anzahl"].sum()
+            
+            return {
+                "status": to_df("status", "Status", "status"),
+                "prioritaet": pd.DataFrame(list(counts["prioritaet"].items()), columns=["Priorität", "Anzahl"]),
+                "mitarbeiter": to_df("mitarbeiter", "Mitarbeiter", "mitarbeiter"),
+            }
+        except Exception as e:
+            print(f"Fehler beim Abrufen der Statistiken: {str(e)}")
+            return {
+                "status": pd.DataFrame(columns=["Status", "Anzahl"]),
+                "prioritaet": pd.DataFrame(columns=["Priorität", "Anzahl"]),
+                "mitarbeiter": pd.DataFrame(columns=["Mitarbeiter", "Anzahl"]),
+            }
+    
+    def get_ticket_trends(self, granularity="day", days=30):
+        """
+        Gibt Zeitreihen zu neuen und erledigten Tickets, zum offenen Bestand und zum
+        Durchsatz je Mitarbeiter aus den vorverdichteten Rollups zurück.
+        
+        Args:
+            granularity: "hour", "day" oder "week" (optional, Standard: "day")
+            days: Anzahl der zurückliegenden Tage (optional, Standard: 30)
+            
+        Returns:
+            dict: DataFrames unter den Schlüsseln verlauf, bestand und durchsatz
+        """
+        try:
+            start = datetime.now() - timedelta(days=days)
+            
+            # Fällige Aktualisierung der Rollups im Hintergrund anstoßen, gelesen wird der bisherige Stand
+            self.ticket_analytics.refresh_in_background()
+            
+            # Unabhängige Abfragen parallel; der Bestand baut auf dem Verlauf auf
+            results = self.run_concurrently({
+                "verlauf": lambda: self.ticket_analytics.get_created_resolved(granularity, start),
+                "durchsatz": lambda: self.ticket_analytics.get_throughput(granularity, start),
+                "mitarbeiter": lambda: self.get_lookup("mitarbeiter"),
+            })
+            verlauf = results["verlauf"]
+            throughput = results["durchsatz"]
+            
+            # Mitarbeiternamen aus dem Stammdaten-Cache
+            mitarbeiter = results["mitarbeiter"].id_to_name
+            throughput["Mitarbeiter"] = throughput["Mitarbeiter_ID"].map(mitarbeiter).fillna("Unbekannt")
+            
+            return {
+                "verlauf": verlauf,
+                "bestand": self.ticket_analytics.get_backlog(granularity, start, series=verlauf),
+                "durchsatz": throughput[["Zeitraum", "Mitarbeiter", "Anzahl"]],
+            }
+        except Exception as e:
+            print(f"Fehler beim Abrufen des Ticketverlaufs: {str(e)}")
+            return {
+                "verlauf": pd.DataFrame(columns=["Zeitraum", "erstellt", "erledigt", "wiedereroeffnet"]),
+                "bestand": pd.DataFrame(columns=["Zeitraum", "Offen"]),
+                "durchsatz": pd.DataFrame(columns=["Zeitraum", "Mitarbeiter", "Anzahl"]),
+            }
+    
+    def create_ticket(self, titel, beschreibung, prioritaet, status_id, kunde_id, mitarbeiter_id):
+        """
+        Erstellt ein Ticket und aktualisiert die Statistik in derselben Transaktion.
+        Danach werden die Zuordnungen angelegt und das Ticket in die Volltextsuche übernommen.
+        
+        Args:
+            titel: Titel des Tickets
+            beschreibung: Beschreibung des Tickets
+            prioritaet: Priorität
+            status_id: ID des Status
+            kunde_id: ID des Kunden
+            mitarbeiter_id: ID des Mitarbeiters
+            
+        Returns:
+            int: ID des neuen Tickets oder None bei Fehlern
+        """
+        insert_query = """
+        INSERT INTO tickets (Titel, Beschreibung, Priorität, Status_ID, Kunde_ID, Mitarbeiter_ID, Erstellt_am, Geändert_am)
+        VALUES (:titel, :beschreibung, :prioritaet, :status_id, :kunde_id, :mitarbeiter_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        """
+        
+        try:
+            with self.engine.begin() as conn:
+                result = conn.execute(text(insert_query), {
+                    "titel": titel,
+                    "beschreibung": beschreibung,
+                    "prioritaet": prioritaet,
+                    "status_id": status_id,
+                    "kunde_id": kunde_id,
+                    "mitarbeiter_id": mitarbeiter_id
+                })
+                ticket_id = result.lastrowid
+                self.ticket_statistics.record_changes(conn, added=[(status_id, prioritaet, mitarbeiter_id)])
+        except Exception as e:
+            print(f"Fehler beim Erstellen des Tickets: {str(e)}")
+            return None
+        
+        # Automatische Einträge in ticket_mitarbeiter und ticket_kategorie
+        self.create_ticket_relations(ticket_id, mitarbeiter_id)
+        
+        # Neues Ticket in die Volltextsuche übernehmen
+        self.index_ticket(ticket_id, titel, beschreibung)
+        
+        return ticket_id
+    
+    def index_ticket(self, ticket_id, titel, beschreibung):
+        """
+        Übernimmt ein neues oder geändertes Ticket in die Volltextsuche.
+        
+        Args:
+            ticket_id: ID des Tickets
+            titel: Titel des Tickets
+            beschreibung: Beschreibung des Tickets
+        """
+        self.ticket_search.index_ticket(ticket_id, titel, beschreibung)
+    
+    def import_tickets(self, df, batch_size=DEFAULT_BATCH_SIZE, use_load_data=False, progress_callback=None):
+        """
+        Importiert viele Tickets auf einmal, z.B. aus einer CSV-, JSON- oder Parquet-Datei.
+        
+        Args:
+            df: pandas.DataFrame mit den Spalten Titel, Beschreibung, Priorität, Status,
+                Kunde, Mitarbeiter (Namen oder *_ID), Kategorie_ID und Erstellt_am
+            batch_size: Anzahl der Tickets pro Block (optional, Standard: 1000)
+            use_load_data: LOAD DATA LOCAL INFILE verwenden (optional, nur MySQL)
+            progress_callback: Funktion progress_callback(verarbeitet, gesamt) (optional)
+            
+        Returns:
+            ImportReport: Ergebnis mit Durchsatz und Fehlern je Zeile
+        """
+        importer = TicketImporter(self, batch_size=batch_size, use_load_data=use_load_data)
+        report = importer.import_dataframe(df, progress_callback)
+        
+        # Neue Tickets bei der nächsten Suche in den Fallback-Index aufnehmen
+        if report.imported:
+            self.ticket_search.invalidate_index()
+        
+        return report
+    
+    def get_bulk_load_engine(self):
         """
-        try:
-            # Verbindungsstring erstellen
-            connection_string = f"mysql+pymysql://{self.db_user}:{self.db_password}@{self.db_host}:{self.db_port}/{self.db_name}"
-            
-            # Engine erstellen
-            self.engine = create_engine(connection_string)
+        Gibt die gemeinsame Engine für LOAD DATA LOCAL INFILE zurück. Der Treiber erlaubt das Senden
+        lokaler Dateien nur mit local_infile, daher nutzt der Import einen eigenen Pool mit dieser Option,
+        statt sie für alle Verbindungen freizuschalten.
+        
+        Returns:
+            sqlalchemy.engine.Engine: Engine mit local_infile
+        """
+        settings = {**(self.pool_settings or {})}
+        settings["connect_args"] = {**settings.get("connect_args", {}), "local_infile": True}
+        engine = engine_registry.get_engine(self.connection_string, settings)
+        self.metrics.instrument(engine)
+        return engine
+    
+    # Tabellenbrowser
+    
+    def estimate_row_count(self, table):
+        """
+        Gibt die geschätzte Zeilenanzahl einer Tabelle aus den MySQL-Statistiken zurück.
+        
+        Args:
+            table: Name der Tabelle
             
-            # Verbindung testen
+        Returns:
+            int: Geschätzte Anzahl oder None, wenn keine Schätzung verfügbar ist
+        """
+        if self.engine.dialect.name != "mysql":
+            return None
+        
+        try:
+            query = text("""
+            SELECT TABLE_ROWS FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table
+            """)
             with self.engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
-            
-            # Inspector für Metadaten
-            self.inspector = inspect(self.engine)
-            
-            return True
+                estimate = conn.execute(query, {"table": table}).scalar()
+            return int(estimate) if estimate is not None else None
         except Exception as e:
-            print(f"Fehler bei der Datenbankverbindung: {str(e)}")
-            return False
+            print(f"Fehler beim Schätzen der Zeilenanzahl: {str(e)}")
+            return None
     
-    def get_columns(self, table):
+    def _build_table_filter(self, table, filter_column, filter_value):
         """
-        Gibt die Spaltennamen einer Tabelle zurück.
+        Erstellt die WHERE-Bedingung für den Tabellenbrowser.
         
         Args:
             table: Name der Tabelle
+            filter_column: Zu filternde Spalte (optional)
+            filter_value: Filterwert (optional)
             
         Returns:
-            list: Liste der Spaltennamen
+            tuple: (Liste der Bedingungen, Parameter)
         """
-        try:
-            return [col["name"] for col in self.inspector.get_columns(table)]
-        except Exception as e:
-            print(f"Fehler beim Abrufen der Spalten: {str(e)}")
-            return []
+        if not filter_column or filter_value in (None, ""):
+            return [], {}
+        
+        column_types = self.get_column_types(table)
+        if filter_column not in column_types:
+            raise ValueError(f"Unbekannte Spalte: {filter_column}")
+        
+        col_type = column_types[filter_column].lower()
+        numeric_value = self._parse_numeric_term(str(filter_value))
+        if numeric_value is not None and any(num_type in col_type for num_type in ["int", "decimal", "float", "double", "numeric"]):
+            return [f"{filter_column} = :filter_value"], {"filter_value": numeric_value}
+        
+        escaped_value = str(filter_value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        condition = f"{filter_column} LIKE :filter_value"
+        if self.engine.dialect.name != "mysql":
+            condition += " ESCAPE '\\'"
+        return [condition], {"filter_value": f"%{escaped_value}%"}
     
-    def get_primary_key(self, table):
+    def count_table_rows(self, table, filter_column=None, filter_value=None, allow_estimate=True):
         """
-        Ermittelt den Primärschlüssel einer Tabelle.
+        Zählt die Datensätze einer Tabelle, ungefiltert auf MySQL per Schätzung.
         
         Args:
             table: Name der Tabelle
+            filter_column: Zu filternde Spalte (optional)
+            filter_value: Filterwert (optional)
+            allow_estimate: Ob ohne Filter eine Schätzung genügt (optional, Standard: True)
             
         Returns:
-            str: Name der Primärschlüsselspalte oder None
+            tuple: (Anzahl, Ist Schätzung)
         """
         try:
-            pk = self.inspector.get_pk_constraint(table)
-            if pk and 'constrained_columns' in pk and pk['constrained_columns']:
-                return pk['constrained_columns'][0]
+            if table not in self.get_table_names():
+                raise ValueError(f"Unbekannte Tabelle: {table}")
             
-            # Fallback: Suche nach Spalten mit 'id' im Namen
-            columns = self.get_columns(table)
-            for col in columns:
-                if col.lower() == 'id':
-                    return col
+            conditions, params = self._build_table_filter(table, filter_column, filter_value)
             
-            # Zweiter Fallback: Erste Spalte
-            if columns:
-                return columns[0]
+            if not conditions and allow_estimate:
+                estimate = self.estimate_row_count(table)
+                if estimate is not None:
+                    return estimate, True
             
-            return None
+            query = f"SELECT COUNT(*) FROM {table}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            
+            with self.engine.connect() as conn:
+                return int(conn.execute(text(query), params).scalar() or 0), False
         except Exception as e:
-            print(f"Fehler beim Ermitteln des Primärschlüssels: {str(e)}")
-            return None
+            print(f"Fehler beim Zählen der Datensätze: {str(e)}")
+            return 0, False
     
-    def get_column_types(self, table):
+    def uses_table_keyset(self, table, primary_key, sort_column=None):
         """
-        Gibt die Spaltentypen einer Tabelle zurück.
+        Prüft, ob get_table_page per Keyset paginiert. Das setzt eine Sortierung nach einem
+        echten, einspaltigen Primärschlüssel voraus; bei zusammengesetzten Schlüsseln oder
+        Tabellen ohne Schlüssel würden Datensätze mit gleichem Wert übersprungen.
         
         Args:
             table: Name der Tabelle
+            primary_key: Primärschlüsselspalte
+            sort_column: Sortierspalte (optional, Standard: Primärschlüssel)
             
         Returns:
-            dict: Dictionary mit Spaltenname als Schlüssel und Spaltentyp als Wert
+            bool: True bei Keyset-Paginierung, False bei LIMIT/OFFSET
         """
-        try:
-            return {col["name"]: str(col["type"]) for col in self.inspector.get_columns(table)}
-        except Exception as e:
-            print(f"Fehler beim Abrufen der Spaltentypen: {str(e)}")
-            return {}
+        return bool(primary_key) and (sort_column or primary_key) == primary_key \
+            and self.get_single_primary_key(table) == primary_key
     
-    def get_table_names(self):
+    def get_table_page(self, table, primary_key, page_size=50, sort_column=None, descending=False,
+                       filter_column=None, filter_value=None, cursor=None, direction="next", offset=0):
         """
-        Gibt die Namen aller Tabellen in der Datenbank zurück.
+        Lädt eine Seite einer Tabelle mit serverseitiger Sortierung und Filterung.
+        Bei Sortierung nach einem einspaltigen Primärschlüssel wird per Keyset paginiert
+        (cursor/direction, siehe uses_table_keyset), sonst per LIMIT/OFFSET.
         
+        Args:
+            table: Name der Tabelle
+            primary_key: Primärschlüsselspalte
+            page_size: Anzahl der Datensätze pro Seite (optional, Standard: 50)
+            sort_column: Sortierspalte (optional, Standard: Primärschlüssel)
+            descending: Absteigend sortieren (optional)
+            filter_column: Zu filternde Spalte (optional)
+            filter_value: Filterwert (optional)
+            cursor: Primärschlüssel des letzten (next) bzw. ersten (prev) Datensatzes der aktuellen Seite (optional)
+            direction: "next" oder "prev" (optional, Standard: "next")
+            offset: Anzahl zu überspringender Datensätze bei Sortierung nach anderen Spalten (optional)
+            
         Returns:
-            list: Liste der Tabellennamen
+            tuple: (pandas.DataFrame mit den Datensätzen, Weitere Seite in dieser Richtung vorhanden)
         """
         try:
-            return self.inspector.get_table_names()
+            columns = self.get_columns(table)
+            if not columns:
+                raise ValueError(f"Unbekannte Tabelle: {table}")
+            
+            sort_column = sort_column or primary_key
+            if sort_column not in columns or (primary_key and primary_key not in columns):
+                raise ValueError(f"Unbekannte Spalte: {sort_column}")
+            
+            conditions, params = self._build_table_filter(table, filter_column, filter_value)
+            keyset = self.uses_table_keyset(table, primary_key, sort_column)
+            
+            if keyset:
+                # Rückwärts blättern: Sortierung umkehren und Ergebnis anschließend wieder drehen
+                reverse = direction == "prev"
+                ascending = descending == reverse
+                if cursor is not None:
+                    conditions.append(f"{primary_key} {'>' if ascending else '<'} :cursor")
+                    params["cursor"] = cursor
+                order_by = f"{primary_key} {'ASC' if ascending else 'DESC'}"
+            else:
+                reverse = False
+                # Alle Schlüsselspalten (ohne Schlüssel alle Spalten) als Zweitsortierung,
+                # damit OFFSET eine stabile Reihenfolge hat
+                tie_breakers = self.schema.get_primary_key_columns(table) or columns
+                order_by = ", ".join(
+                    f"{col} {'DESC' if descending else 'ASC'}"
+                    for col in [sort_column] + [col for col in tie_breakers if col != sort_column]
+                )
+            
+            query = f"SELECT * FROM {table}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += f" ORDER BY {order_by} LIMIT :limit"
+            
+            # Eine Zeile mehr laden, um zu erkennen, ob es eine weitere Seite gibt
+            params["limit"] = page_size + 1
+            if not keyset and offset:
+                query += " OFFSET :offset"
+                params["offset"] = offset
+            
+            page_df = self.execute_query_to_df(query, params)
+            has_more = len(page_df) > page_size
+            page_df = page_df.head(page_size)
+            
+            if reverse:
+                page_df = page_df.iloc[::-1].reset_index(drop=True)
+            
+            return page_df, has_more
         except Exception as e:
-            print(f"Fehler beim Abrufen der Tabellennamen: {str(e)}")
-            return []
+            print(f"Fehler beim Laden der Tabellenseite: {str(e)}")
+            return pd.DataFrame(), False
     
-    def execute_query(self, query, params=None):
+    def get_record(self, table, primary_key, value):
         """
-        Führt eine SQL-Abfrage aus.
+        Lädt einen einzelnen Datensatz über seinen Primärschlüssel.
         
         Args:
-            query: SQL-Abfrage
-            params: Parameter für die Abfrage (optional)
+            table: Name der Tabelle
+            primary_key: Primärschlüsselspalte
+            value: Wert des Primärschlüssels
             
         Returns:
-            bool: Erfolg
+            pandas.Series: Datensatz oder None
         """
         try:
-            if params is None:
-                params = {}
-            
-            with self.engine.begin() as conn:
-                conn.execute(text(query), params)
+            if primary_key not in self.get_columns(table):
+                raise ValueError(f"Unbekannte Spalte: {primary_key}")
             
-            return True
+            record_df = self.execute_query_to_df(
+                f"SELECT * FROM {table} WHERE {primary_key} = :value",
+                {"value": value}
+            )
+            return None if record_df.empty else record_df.iloc[0]
         except Exception as e:
-            print(f"Fehler bei der Datenbankabfrage: {str(e)}")
-            return False
+            print(f"Fehler beim Laden des Datensatzes: {str(e)}")
+            return None
     
-    def execute_query_to_df(self, query, params=None):
+    def _check_record_columns(self, table, columns):
+        table_columns = self.get_columns(table)
+        unknown = [column for column in columns if column not in table_columns]
+        if unknown:
+            raise ValueError(f"Unbekannte Spalten: {', '.join(unknown)}")
+    
+    def _ticket_statistics_values(self, conn, primary_key, value):
+        # Gezählte Spalten eines Tickets lesen, auf MySQL mit Zeilensperre bis zum Ende der Transaktion
+        lock_clause = " FOR UPDATE" if conn.dialect.name == "mysql" else ""
+        result = conn.execute(
+            text(f"SELECT {', '.join(DIMENSIONS.values())} FROM tickets WHERE {primary_key} = :value{lock_clause}"),
+            {"value": value}
+        )
+        return [tuple(row) for row in result.fetchall()]
+    
+    def _log_status_change(self, conn, ticket_id, removed, added, changed_by):
+        # Statuswechsel für die Auswertungen (erledigt, wiedereröffnet, Durchsatz) protokollieren
+        if not removed or not added:
+            return
+        status_index = list(DIMENSIONS).index("status")
+        old_status = statistics_key(removed[0][status_index])
+        new_status = statistics_key(added[0][status_index])
+        if old_status == new_status:
+            return
+        
+        conn.execute(text("""
+        INSERT INTO ticket_historie (ID_Ticket, Feldname, Alter_Wert, Neuer_Wert, Geändert_von, Geändert_am)
+        VALUES (:ticket_id, 'Status_ID', :old_status, :new_status, :changed_by, CURRENT_TIMESTAMP)
+        """), {"ticket_id": ticket_id, "old_status": old_status, "new_status": new_status, "changed_by": changed_by})
+    
+    def insert_record(self, table, values, primary_key=None):
         """
-        Führt eine SQL-Abfrage aus und gibt das Ergebnis als DataFrame zurück.
+        Fügt einen Datensatz in eine Tabelle ein. Bei Tickets werden die Statistikzähler
+        in derselben Transaktion angepasst.
         
         Args:
-            query: SQL-Abfrage
-            params: Parameter für die Abfrage (optional)
+            table: Name der Tabelle
+            values: Dictionary Spalte -> Wert
+            primary_key: Primärschlüsselspalte (optional, für Tickets benötigt)
             
         Returns:
-            pandas.DataFrame: Ergebnis der Abfrage
+            bool: Erfolg
         """
         try:
-            if params is None:
-                params = {}
+            self._check_record_columns(table, values)
+            columns = list(values.keys())
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(f':{col}' for col in columns)})"
+            
+            with self.engine.begin() as conn:
+                result = conn.execute(text(query), values)
+                if table == "tickets" and primary_key:
+                    value = values.get(primary_key)
+                    added = self._ticket_statistics_values(conn, primary_key, result.lastrowid if value is None else value)
+                    self.ticket_statistics.record_changes(conn, added=added)
             
-            return pd.read_sql(text(query), self.engine, params=params)
+            return True
         except Exception as e:
-            print(f"Fehler bei der Datenbankabfrage: {str(e)}")
-            return pd.DataFrame()
+            print(f"Fehler beim Hinzufügen des Datensatzes: {str(e)}")
+            return False
     
-    def execute_transaction(self, query, params=None):
+    def update_record(self, table, primary_key, value, values, changed_by=None):
         """
-        Führt eine SQL-Transaktion aus.
+        Aktualisiert einen Datensatz über seinen Primärschlüssel. Bei Tickets werden die
+        Statistikzähler mit altem und neuem Stand angepasst und Statuswechsel in ticket_historie
+        protokolliert, beides in derselben Transaktion.
         
         Args:
-            query: SQL-Abfrage
-            params: Parameter für die Abfrage (optional)
+            table: Name der Tabelle
+            primary_key: Primärschlüsselspalte
+            value: Wert des Primärschlüssels
+            values: Dictionary Spalte -> neuer Wert
+            changed_by: ID des ändernden Mitarbeiters (optional, für ticket_historie)
             
         Returns:
             bool: Erfolg
         """
         try:
-            if params is None:
-                params = {}
+            self._check_record_columns(table, [primary_key, *values])
+            set_clauses = [f"{col} = :{col}" for col in values.keys()]
+            query = f"UPDATE {table} SET {', '.join(set_clauses)} WHERE {primary_key} = :primary_key"
             
             with self.engine.begin() as conn:
-                result = conn.execute(text(query), params)
-                return result
+                removed = self._ticket_statistics_values(conn, primary_key, value) if table == "tickets" else []
+                conn.execute(text(query), {**values, "primary_key": value})
+                if table == "tickets":
+                    added = self._ticket_statistics_values(conn, primary_key, value)
+                    self.ticket_statistics.record_changes(conn, added=added, removed=removed)
+                    self._log_status_change(conn, value, removed, added, changed_by)
+            
+            return True
         except Exception as e:
-            print(f"Fehler bei der Datenbanktransaktion: {str(e)}")
-            return None
+            print(f"Fehler beim Aktualisieren des Datensatzes: {str(e)}")
+            return False
     
-    def create_ticket_relations(self, ticket_id, mitarbeiter_id, kategorie_id=1):
+    def delete_record(self, table, primary_key, value):
         """
-        Erstellt automatisch Einträge in ticket_mitarbeiter und ticket_kategorie.
+        Löscht einen Datensatz über seinen Primärschlüssel. Bei Tickets werden die
+        Statistikzähler in derselben Transaktion angepasst.
         
         Args:
-            ticket_id: ID des Tickets
-            mitarbeiter_id: ID des Mitarbeiters
-            kategorie_id: ID der Kategorie (optional, Standard: 1)
+            table: Name der Tabelle
+            primary_key: Primärschlüsselspalte
+            value: Wert des Primärschlüssels
             
         Returns:
             bool: Erfolg
         """
         try:
+            self._check_record_columns(table, [primary_key])
+            
             with self.engine.begin() as conn:
-                # Eintrag in ticket_mitarbeiter
-                if mitarbeiter_id:
-                    # Prüfen, ob der Eintrag bereits existiert
-                    check_query = text("SELECT COUNT(*) FROM ticket_mitarbeiter WHERE ID_Ticket = :ticket_id AND ID_Mitarbeiter = :mitarbeiter_id")
-                    result = conn.execute(check_query, {"ticket_id": ticket_id, "mitarbeiter_id": mitarbeiter_id}).scalar()
-                    
-                    if result == 0:  # Eintrag existiert noch nicht
-                        insert_query = text("INSERT INTO ticket_mitarbeiter (ID_Ticket, ID_Mitarbeiter, Rolle_im_Ticket) VALUES (:ticket_id, :mitarbeiter_id, 'Hauptverantwortlicher')")
-                        conn.execute(insert_query, {"ticket_id": ticket_id, "mitarbeiter_id": mitarbeiter_id})
-                
-                # Eintrag in ticket_kategorie
-                if kategorie_id:
-                    # Prüfen, ob die Kategorie existiert
-                    check_kategorie = text("SELECT COUNT(*) FROM kategorie WHERE ID_Kategorie = :kategorie_id")
-                    kategorie_exists = conn.execute(check_kategorie, {"kategorie_id": kategorie_id}).scalar()
-                    
-                    if kategorie_exists > 0:
-                        # Prüfen, ob der Eintrag bereits existiert
-                        check_query = text("SELECT COUNT(*) FROM ticket_kategorie WHERE ID_Ticket = :ticket_id AND ID_Kategorie = :kategorie_id")
-                        result = conn.execute(check_query, {"ticket_id": ticket_id, "kategorie_id": kategorie_id}).scalar()
-                        
-                        if result == 0:  # Eintrag existiert noch nicht
-                            insert_query = text("INSERT INTO ticket_kategorie (ID_Ticket, ID_Kategorie) VALUES (:ticket_id, :kategorie_id)")
-                            conn.execute(insert_query, {"ticket_id": ticket_id, "kategorie_id": kategorie_id})
+                removed = self._ticket_statistics_values(conn, primary_key, value) if table == "tickets" else []
+                conn.execute(text(f"DELETE FROM {table} WHERE {primary_key} = :value"), {"value": value})
+                self.ticket_statistics.record_changes(conn, removed=removed)
             
             return True
         except Exception as e:
-            print(f"Fehler beim Erstellen der Ticket-Beziehungen: {str(e)}")
+            print(f"Fehler beim Löschen des Datensatzes: {str(e)}")
             return False
     
     # Authentifizierungsfunktionen
@@ -280,22 +1405,21 @@ class DatabaseManager:
     
     def hash_password(self, password, salt):
         """
-        Hasht ein Passwort mit dem angegebenen Salt.
+        Hasht ein Passwort mit dem angegebenen Salt und dem aktuellen Standardverfahren (scrypt bzw. PBKDF2).
         
         Args:
             password: Passwort
             salt: Salt
             
         Returns:
-            str: Gehashtes Passwort
+            str: Gehashtes Passwort im versionierten Format, z.B. scrypt$16384$8$1$<Salt>$<Hash>
         """
-        salted_password = password + salt
-        password_hash = hashlib.sha256(salted_password.encode()).hexdigest()
-        return password_hash
+        return self.password_hashing.hash(password, salt)
     
     def verify_password(self, password, stored_hash, salt):
         """
         Überprüft, ob das eingegebene Passwort korrekt ist.
+        Unterstützt die versionierten Formate und den bisherigen SHA-256-Hash.
         
         Args:
             password: Passwort
@@ -305,8 +1429,31 @@ class DatabaseManager:
         Returns:
             bool: Passwort korrekt
         """
-        calculated_hash = self.hash_password(password, salt)
-        return calculated_hash == stored_hash
+        return self.password_hashing.verify(password, stored_hash, salt)
+    
+    def _store_password_hash(self, user_id, password):
+        """
+        Hasht ein Passwort mit dem aktuellen Standardverfahren neu und speichert es.
+        
+        Args:
+            user_id: Benutzer-ID
+            password: Passwort im Klartext
+        """
+        new_salt = self.generate_salt()
+        new_hash = self.hash_password(password, new_salt)
+        
+        update_query = text("""
+        UPDATE mitarbeiter 
+        SET Password_hash = :password_hash, salt = :salt 
+        WHERE ID_Mitarbeiter = :user_id
+        """)
+        
+        with self.engine.begin() as conn:
+            conn.execute(update_query, {
+                "password_hash": new_hash,
+                "salt": new_salt,
+                "user_id": user_id
+            })
     
     def generate_temp_password(self, length=12):
         """
@@ -332,21 +1479,66 @@ class DatabaseManager:
         random.shuffle(password)
         return ''.join(password)
     
-    def authenticate_user(self, username_or_email, password):
+    def get_login_retry_after(self, username_or_email, source=None):
+        """
+        Gibt an, wie lange nach zu vielen Fehlversuchen bis zur nächsten Anmeldung gewartet werden muss.
+        
+        Args:
+            username_or_email: Benutzername oder E-Mail
+            source: Quelle der Anmeldung, z.B. IP-Adresse (optional)
+            
+        Returns:
+            int: Wartezeit in Sekunden (0, wenn eine Anmeldung möglich ist)
+        """
+        try:
+            return math.ceil(self.login_throttle.retry_after(username_or_email, source))
+        except Exception as e:
+            print(f"Fehler beim Prüfen der Anmeldesperre: {str(e)}")
+            return 0
+    
+    def authenticate_user(self, username_or_email, password, source=None):
         """
         Authentifiziert einen Benutzer anhand von Benutzername/E-Mail und Passwort.
+        Zu viele Fehlversuche je Konto oder Quelle werden sofort abgewiesen (siehe get_login_retry_after).
         
         Args:
             username_or_email: Benutzername oder E-Mail
             password: Passwort
+            source: Quelle der Anmeldung, z.B. IP-Adresse (optional)
             
         Returns:
             tuple: (Erfolg, Benutzer-ID, Passwortänderung erforderlich)
         """
         try:
-            # Kleine Verzögerung als Schutz vor Brute-Force-Angriffen
-            time.sleep(0.5)
+            # Schutz vor Brute-Force-Angriffen ohne Wartezeit im Server
+            if self.login_throttle.acquire(username_or_email, source) > 0:
+                return False, None, False
             
+            success, user_id, password_change_required = self._check_credentials(username_or_email, password)
+            
+            if success:
+                self.login_throttle.record_success(username_or_email, source)
+            else:
+                self.login_throttle.record_failure(username_or_email, source)
+            
+            return success, user_id, password_change_required
+        
+        except Exception as e:
+            print(f"Fehler bei der Authentifizierung: {str(e)}")
+            return False, None, False
+    
+    def _check_credentials(self, username_or_email, password):
+        """
+        Prüft Benutzername/E-Mail und Passwort gegen die Datenbank.
+        
+        Args:
+            username_or_email: Benutzername oder E-Mail
+            password: Passwort
+            
+        Returns:
+            tuple: (Erfolg, Benutzer-ID, Passwortänderung erforderlich)
+        """
+        try:
             # Benutzer in der Datenbank suchen
             query = text("""
             SELECT ID_Mitarbeiter, Name, Password_hash, salt, password_change_required 
@@ -365,31 +1557,18 @@ class DatabaseManager:
             # Falls kein Salt vorhanden ist (Altdaten), Passwort direkt vergleichen
             # und bei Erfolg ein Salt generieren und das Passwort hashen
             if not salt:
-                if password == stored_hash:
+                if stored_hash and hmac.compare_digest(password.encode(), stored_hash.encode()):
                     # Passwort ist korrekt, aber ungehasht - jetzt hashen und speichern
-                    new_salt = self.generate_salt()
-                    new_hash = self.hash_password(password, new_salt)
-                    
-                    # Datensatz aktualisieren
-                    update_query = text("""
-                    UPDATE mitarbeiter 
-                    SET Password_hash = :password_hash, salt = :salt 
-                    WHERE ID_Mitarbeiter = :user_id
-                    """)
-                    
-                    with self.engine.begin() as conn:
-                        conn.execute(update_query, {
-                            "password_hash": new_hash,
-                            "salt": new_salt,
-                            "user_id": user_id
-                        })
-                    
+                    self._store_password_hash(user_id, password)
                     return True, user_id, password_change_required
                 else:
                     return False, None, False
             
             # Ansonsten mit Salt hashen und vergleichen
             if self.verify_password(password, stored_hash, salt):
+                # Ältere Verfahren (SHA-256) oder veraltete Parameter transparent ersetzen
+                if self.password_hashing.needs_rehash(stored_hash):
+                    self._store_password_hash(user_id, password)
                 return True, user_id, password_change_required
             else:
                 return False, None, False
@@ -398,42 +1577,39 @@ class DatabaseManager:
             print(f"Fehler bei der Authentifizierung: {str(e)}")
             return False, None, False
     
-    def ensure_required_columns_exist(self):
+    def run_migrations(self):
         """
-        Überprüft, ob die erforderlichen Spalten existieren, und fügt sie hinzu, falls nicht.
+        Führt die ausstehenden Schema-Migrationen aus (Spalten, Indizes, FULLTEXT, Historientabelle).
+        Die Prüfung erfolgt nur einmal pro Prozess, weitere Aufrufe kosten keine Abfrage.
         
         Returns:
             bool: Erfolg
         """
+        runner = MigrationRunner.for_engine(self.engine)
         try:
-            # Prüfen, ob die salt-Spalte bereits existiert
-            mitarbeiter_columns = self.get_columns("mitarbeiter")
-            
-            # Salt-Spalte hinzufügen, falls nicht vorhanden
-            if "salt" not in mitarbeiter_columns:
-                with self.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE mitarbeiter ADD COLUMN salt VARCHAR(64)"))
+            applied = runner.run()
             
-            # Reset-Token-Spalte hinzufügen, falls nicht vorhanden
-            if "reset_token" not in mitarbeiter_columns:
-                with self.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE mitarbeiter ADD COLUMN reset_token VARCHAR(64)"))
+            # Geänderte Tabellenstruktur beim nächsten Zugriff neu laden
+            if applied:
+                self.schema.invalidate()
             
-            # Reset-Token-Expiry-Spalte hinzufügen, falls nicht vorhanden
-            if "reset_token_expiry" not in mitarbeiter_columns:
-                with self.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE mitarbeiter ADD COLUMN reset_token_expiry DATETIME"))
-            
-            # Password-Change-Required-Spalte hinzufügen, falls nicht vorhanden
-            if "password_change_required" not in mitarbeiter_columns:
-                with self.engine.begin() as conn:
-                    conn.execute(text("ALTER TABLE mitarbeiter ADD COLUMN password_change_required BOOLEAN DEFAULT FALSE"))
-            
-            return True
+            # Ein früherer Fehlschlag im selben Prozess wird nicht wiederholt
+            return runner.error is None
         except Exception as e:
-            print(f"Fehler beim Überprüfen/Hinzufügen der erforderlichen Spalten: {str(e)}")
+            print(f"Fehler beim Ausführen der Schema-Migrationen: {str(e)}")
+            self.schema.invalidate()
             return False
     
+    def ensure_required_columns_exist(self):
+        """
+        Überprüft, ob die erforderlichen Spalten existieren, und fügt sie hinzu, falls nicht.
+        Die Spalten werden inzwischen über die Schema-Migrationen angelegt (siehe run_migrations).
+        
+        Returns:
+            bool: Erfolg
+        """
+        return self.run_migrations()
+    
     def reset_password(self, email):
         """
         Setzt das Passwort eines Benutzers zurück und generiert ein temporäres Passwort.
@@ -588,9 +1764,171 @@ class DatabaseManager:
             print(f"Fehler beim Ermitteln der durchsuchbaren Spalten: {str(e)}")
             return []
     
-    def search_table(self, table_name, search_term, search_columns=None, exact_match=False, case_sensitive=False):
+    def get_indexed_columns(self, table):
+        """
+        Gibt die Spalten zurück, die an erster Stelle eines Index stehen.
+        
+        Args:
+            table: Name der Tabelle
+            
+        Returns:
+            set: Menge der indizierten Spalten
+        """
+        try:
+            return self.schema.get_indexed_columns(table)
+        except Exception as e:
+            print(f"Fehler beim Abrufen der indizierten Spalten: {str(e)}")
+            return set()
+    
+    def plan_table_search(self, table_name, search_term, search_columns=None, exact_match=False,
+                          case_sensitive=False, prefix_match=False):
+        """
+        Erstellt einen Suchplan für search_table.
+        
+        Auf MySQL übernimmt die Kollation der Spalte die Groß-/Kleinschreibung, sodass
+        Gleichheits- und Präfixvergleiche einen Index nutzen können. Zahlen werden nur in
+        Zahlenspalten gesucht, Text nur in Textspalten. Jede indexfähige Bedingung wird als
+        eigene Teilabfrage per UNION kombiniert, die übrigen Bedingungen in einer gemeinsamen
+        Teilabfrage mit OR.
+        
+        Args:
+            table_name: Name der Tabelle
+            search_term: Suchbegriff (nicht leer)
+            search_columns: Liste der zu durchsuchenden Spalten (optional)
+            exact_match: Ob exakte Übereinstimmung gefordert ist (optional)
+            case_sensitive: Ob Groß-/Kleinschreibung beachtet werden soll (optional)
+            prefix_match: Ob nur am Anfang der Spalte gesucht wird (optional, indexfreundlich)
+            
+        Returns:
+            dict: Suchplan mit mode, strategy, indexed, scanned, skipped, sql und params
+        """
+        if search_columns is None or len(search_columns) == 0:
+            search_columns = self.get_searchable_columns(table_name)
+        
+        column_types = self.get_column_types(table_name)
+        indexed_columns = self.get_indexed_columns(table_name)
+        # Der Join über den Schlüssel ist nur bei einem eindeutigen, einspaltigen Primärschlüssel korrekt
+        primary_key = self.get_single_primary_key(table_name)
+        collation_ci = self.engine.dialect.name == "mysql"
+        
+        mode = "exact" if exact_match else ("prefix" if prefix_match else "contains")
+        numeric_term = self._parse_numeric_term(search_term)
+        
+        plan = {
+            "table": table_name,
+            "mode": mode,
+            "numeric_term": numeric_term is not None,
+            "indexed": [],
+            "scanned": [],
+            "skipped": [],
+        }
+        params = {}
+        indexed_predicates = []
+        scan_predicates = []
+        
+        # Suchbegriff für LIKE maskieren, damit % und _ wörtlich gesucht werden
+        escaped_term = search_term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        
+        for i, col in enumerate(search_columns):
+            if col not in column_types:
+                plan["skipped"].append(col)
+                continue
+            
+            col_type = column_types[col].lower()
+            param_name = f"search_term_{i}"
+            
+            if any(num_type in col_type for num_type in ["int", "decimal", "float", "double", "numeric"]):
+                # Zahlenspalten nur mit numerischem Suchbegriff und Gleichheit durchsuchen
+                if numeric_term is None:
+                    plan["skipped"].append(col)
+                    continue
+                predicate = f"{col} = :{param_name}"
+                params[param_name] = numeric_term
+                indexable = col in indexed_columns
+            else:
+                if mode == "exact":
+                    operator, value, indexable = "=", search_term, col in indexed_columns
+                elif mode == "prefix":
+                    operator, value, indexable = "LIKE", f"{escaped_term}%", col in indexed_columns
+                else:
+                    operator, value, indexable = "LIKE", f"%{escaped_term}%", False
+                
+                if collation_ci:
+                    # Kollation vergleicht ohne Groß-/Kleinschreibung; BINARY prüft nur die Treffer nach
+                    predicate = f"{col} {operator} :{param_name}"
+                    if case_sensitive:
+                        predicate += f" AND BINARY {col} {operator} :{param_name}"
+                elif case_sensitive:
+                    predicate = f"{col} {operator} :{param_name}"
+                else:
+                    predicate = f"LOWER({col}) {operator} :{param_name}"
+                    value = value.lower()
+                    indexable = False
+                
+                if operator == "LIKE" and not collation_ci:
+                    # MySQL verwendet den Backslash bereits standardmäßig als Escape-Zeichen
+                    predicate = predicate.replace(f"LIKE :{param_name}", f"LIKE :{param_name} ESCAPE '\\'")
+                params[param_name] = value
+            
+            if indexable:
+                indexed_predicates.append(predicate)
+                plan["indexed"].append(col)
+            else:
+                scan_predicates.append(f"({predicate})")
+                plan["scanned"].append(col)
+        
+        # Teilabfragen zusammenstellen
+        key_column = primary_key if primary_key in column_types else None
+        select_list = key_column if key_column else "*"
+        branches = [f"SELECT {select_list} FROM {table_name} WHERE {predicate}" for predicate in indexed_predicates]
+        if scan_predicates:
+            branches.append(f"SELECT {select_list} FROM {table_name} WHERE {' OR '.join(scan_predicates)}")
+        
+        if not branches:
+            plan["strategy"] = "none"
+            plan["sql"] = None
+        elif len(branches) == 1:
+            plan["strategy"] = "index" if indexed_predicates else "scan"
+            plan["sql"] = branches[0].replace(f"SELECT {select_list} ", "SELECT * ", 1)
+        else:
+            plan["strategy"] = "union+scan" if scan_predicates else "union"
+            union = " UNION ".join(branches)
+            if key_column:
+                # UNION nur über den Primärschlüssel, danach die vollständigen Zeilen nachladen
+                plan["sql"] = f"SELECT t.* FROM {table_name} t JOIN ({union}) hits ON t.{key_column} = hits.{key_column}"
+            else:
+                plan["sql"] = union
+        
+        plan["params"] = params
+        return plan
+    
+    def _parse_numeric_term(self, search_term):
+        """
+        Wandelt einen Suchbegriff in eine Zahl um, falls möglich.
+        
+        Args:
+            search_term: Suchbegriff
+            
+        Returns:
+            int, float oder None
+        """
+        term = search_term.strip()
+        try:
+            return int(term)
+        except ValueError:
+            pass
+        try:
+            value = float(term.replace(",", "."))
+        except ValueError:
+            return None
+        # "nan" und "inf" lassen sich nicht an Zahlenspalten binden
+        return value if math.isfinite(value) else None
+    
+    def search_table(self, table_name, search_term, search_columns=None, exact_match=False, case_sensitive=False,
+                     prefix_match=False):
         """
         Durchsucht eine Tabelle nach einem Suchbegriff.
+        Der verwendete Suchplan wird in last_search_plan abgelegt.
         
         Args:
             table_name: Name der Tabelle
@@ -598,54 +1936,28 @@ class DatabaseManager:
             search_columns: Liste der zu durchsuchenden Spalten (optional)
             exact_match: Ob exakte Übereinstimmung gefordert ist (optional)
             case_sensitive: Ob Groß-/Kleinschreibung beachtet werden soll (optional)
+            prefix_match: Ob nur am Anfang der Spalte gesucht wird (optional)
             
         Returns:
             pandas.DataFrame: Gefundene Datensätze
         """
+        self.last_search_plan = None
+        
         try:
             if not search_term:
                 # Bei leerem Suchbegriff alle Datensätze zurückgeben
                 query = f"SELECT * FROM {table_name}"
                 return self.execute_query_to_df(query)
             
-            # Wenn keine Spalten angegeben sind, alle durchsuchbaren Spalten verwenden
-            if search_columns is None or len(search_columns) == 0:
-                search_columns = self.get_searchable_columns(table_name)
+            plan = self.plan_table_search(table_name, search_term, search_columns, exact_match, case_sensitive, prefix_match)
+            self.last_search_plan = plan
             
             # Wenn keine durchsuchbaren Spalten gefunden wurden, leeren DataFrame zurückgeben
-            if not search_columns:
+            if plan["sql"] is None:
                 return pd.DataFrame()
             
-            # SQL-Bedingungen für die Suche erstellen
-            conditions = []
-            params = {}
-            
-            for i, col in enumerate(search_columns):
-                param_name = f"search_term_{i}"
-                
-                if exact_match:
-                    # Exakte Übereinstimmung
-                    if case_sensitive:
-                        conditions.append(f"{col} = :{param_name}")
-                    else:
-                        conditions.append(f"LOWER({col}) = :{param_name}")
-                        search_term = search_term.lower()
-                else:
-                    # Teilweise Übereinstimmung (LIKE)
-                    if case_sensitive:
-                        conditions.append(f"{col} LIKE :{param_name}")
-                        params[param_name] = f"%{search_term}%"
-                    else:
-                        conditions.append(f"LOWER({col}) LIKE :{param_name}")
-                        params[param_name] = f"%{search_term.lower()}%"
-                
-                params[param_name] = f"%{search_term}%" if not exact_match else search_term
-            
-            # SQL-Query erstellen
-            query = f"SELECT * FROM {table_name} WHERE {' OR '.join(conditions)}"
-            
             # Query ausführen und Ergebnisse zurückgeben
-            return self.execute_query_to_df(query, params)
+            return self.execute_query_to_df(plan["sql"], plan["params"])
         
         except Exception as e:
             print(f"Fehler bei der Tabellensuche: {str(e)}")
@@ -0,0 +1,144 @@
+import atexit
+import threading
+from sqlalchemy import create_engine, event, text
+from query_metrics import TimedQueuePool
+
+# Standard-Einstellungen für den Verbindungspool; TimedQueuePool misst die Wartezeiten
+DEFAULT_POOL_SETTINGS = {
+    "poolclass": TimedQueuePool,
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "pool_timeout": 30,
+}
+
+# Pool-Ereignisse, für die Lifecycle-Hooks registriert werden können
+POOL_EVENTS = ("connect", "checkout", "checkin", "close", "invalidate")
+
+
+def _freeze(value):
+    # Verschachtelte Einstellungen (z.B. connect_args) für den Registry-Schlüssel hashbar machen
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class EngineRegistry:
+    """
+    Prozessweite Registry für SQLAlchemy-Engines.
+    Alle Sitzungen mit denselben Verbindungsparametern teilen sich eine Engine
+    und damit einen begrenzten Verbindungspool.
+    """
+
+    def __init__(self):
+        """
+        Initialisiert die leere Registry.
+        """
+        self._engines = {}
+        self._lock = threading.Lock()
+        self._hooks = {event_name: [] for event_name in POOL_EVENTS}
+        self._created_hooks = []
+
+    def _make_key(self, connection_string, pool_settings):
+        return connection_string, _freeze(pool_settings)
+
+    def get_engine(self, connection_string, pool_settings=None):
+        """
+        Gibt die gemeinsame Engine für die Verbindungsparameter zurück und legt sie bei Bedarf an.
+
+        Args:
+            connection_string: SQLAlchemy-Verbindungsstring
+            pool_settings: Pool-Einstellungen (optional, überschreiben DEFAULT_POOL_SETTINGS)
+
+        Returns:
+            sqlalchemy.engine.Engine: Gemeinsame Engine
+        """
+        settings = {**DEFAULT_POOL_SETTINGS, **(pool_settings or {})}
+        key = self._make_key(connection_string, settings)
+
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            # Erneut prüfen, falls ein anderer Thread die Engine inzwischen angelegt hat
+            engine = self._engines.get(key)
+            if engine is not None:
+                return engine
+
+            engine = self._create_engine(connection_string, settings)
+
+            # Verbindung einmalig beim Anlegen testen
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+            self._engines[key] = engine
+
+        for callback in self._created_hooks:
+            callback(engine)
+
+        return engine
+
+    def _create_engine(self, connection_string, settings):
+        # SQLite (z.B. für lokale Tests) kennt keine Pool-Größen
+        if connection_string.startswith("sqlite"):
+            engine = create_engine(connection_string)
+        else:
+            engine = create_engine(connection_string, **settings)
+
+        for event_name, callbacks in self._hooks.items():
+            for callback in callbacks:
+                event.listen(engine.pool, event_name, callback)
+
+        return engine
+
+    def add_hook(self, event_name, callback):
+        """
+        Registriert einen Lifecycle-Hook für alle vorhandenen und zukünftigen Engines.
+
+        Args:
+            event_name: Pool-Ereignis (connect, checkout, checkin, close, invalidate)
+                        oder "engine_created"
+            callback: Aufzurufende Funktion mit der Signatur des SQLAlchemy-Pool-Ereignisses
+                      bzw. callback(engine) für "engine_created"
+        """
+        with self._lock:
+            if event_name == "engine_created":
+                self._created_hooks.append(callback)
+                return
+
+            if event_name not in self._hooks:
+                raise ValueError(f"Unbekanntes Pool-Ereignis: {event_name}")
+
+            self._hooks[event_name].append(callback)
+            for engine in self._engines.values():
+                event.listen(engine.pool, event_name, callback)
+
+    def pool_status(self):
+        """
+        Gibt den Zustand aller Verbindungspools zurück.
+
+        Returns:
+            dict: Pool-Status je Engine-URL
+        """
+        return {str(engine.url): engine.pool.status() for engine in list(self._engines.values())}
+
+    def dispose(self, connection_string=None):
+        """
+        Schließt die Verbindungspools und entfernt die Engines aus der Registry.
+
+        Args:
+            connection_string: Nur Engines mit diesem Verbindungsstring schließen (optional, Standard: alle)
+        """
+        with self._lock:
+            for key in list(self._engines.keys()):
+                if connection_string is None or key[0] == connection_string:
+                    self._engines.pop(key).dispose()
+
+
+# Prozessweite Instanz, die von allen DatabaseManager-Objekten genutzt wird
+engine_registry = EngineRegistry()
+atexit.register(engine_registry.dispose)
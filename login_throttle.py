@@ -0,0 +1,362 @@
+import threading
+import time
+from sqlalchemy import inspect, text
+
+# Standardwerte: 5 Versuche je Konto (1 neuer Versuch pro Minute), 30 je Quelle (1 alle 10 Sekunden)
+DEFAULT_ACCOUNT_CAPACITY = 5
+DEFAULT_ACCOUNT_REFILL = 1 / 60
+DEFAULT_SOURCE_CAPACITY = 30
+DEFAULT_SOURCE_REFILL = 1 / 10
+
+# Fehlversuche ohne Sperre, danach verdoppelt sich die Sperrzeit bis zum Maximum.
+# Quellen erhalten mehr Spielraum, da sich viele Benutzer eine IP-Adresse teilen können.
+FREE_FAILURES = 3
+SOURCE_FREE_FAILURES = 20
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 900.0
+
+# Fehlversuche einer Quelle verfallen schrittweise (einer je Intervall ohne neuen Fehlversuch),
+# da sie nicht durch eine erfolgreiche Anmeldung zurückgesetzt werden
+SOURCE_FAILURE_DECAY = 300.0
+
+# Einträge mit Fehlversuchen, die so lange unverändert sind, darf der Speicher verwerfen
+STALE_FAILURE_AGE = 86400.0
+
+
+class ThrottleState:
+    """
+    Zustand eines Token-Buckets mit Fehlversuchszähler.
+    """
+
+    def __init__(self, tokens, updated_at, failures=0, blocked_until=0.0, failed_at=0.0):
+        self.tokens = tokens
+        self.updated_at = updated_at
+        self.failures = failures
+        self.blocked_until = blocked_until
+        self.failed_at = failed_at
+
+
+class InMemoryThrottleStore:
+    """
+    Speicher für Throttle-Zustände im Prozess. Alle Sitzungen eines Streamlit-Servers teilen ihn.
+    """
+
+    def __init__(self, max_entries=100000, stale_failure_age=STALE_FAILURE_AGE):
+        """
+        Initialisiert den leeren Speicher.
+
+        Args:
+            max_entries: Maximale Anzahl der Einträge, bevor veraltete entfernt werden (optional)
+            stale_failure_age: Sekunden seit dem letzten Fehlversuch, nach denen ein Eintrag entfernt werden darf (optional)
+        """
+        self.max_entries = max_entries
+        self.stale_failure_age = stale_failure_age
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, func):
+        """
+        Liest, ändert und speichert einen Zustand atomar.
+
+        Args:
+            key: Schlüssel (z.B. "account:max")
+            func: Funktion func(state oder None) -> (neuer Zustand, Rückgabewert)
+
+        Returns:
+            Rückgabewert von func
+        """
+        with self._lock:
+            state, result = func(self._states.get(key))
+            self._states[key] = state
+            if len(self._states) > self.max_entries:
+                self._prune()
+            return result
+
+    def _prune(self):
+        # Einträge ohne Sperre und ohne aktuelle Fehlversuche entfernen, älteste zuerst
+        now = time.time()
+        removable = sorted(
+            (state.updated_at, key) for key, state in self._states.items()
+            if state.blocked_until <= now
+            and (state.failures == 0 or now - state.failed_at >= self.stale_failure_age)
+        )
+        for _, key in removable[:max(len(self._states) - self.max_entries, len(self._states) // 10)]:
+            del self._states[key]
+
+
+class SqlThrottleStore:
+    """
+    Speicher für Throttle-Zustände in der Tabelle login_throttle,
+    damit mehrere Anwendungsserver dieselben Zähler verwenden.
+    """
+
+    def __init__(self, engine, table="login_throttle"):
+        """
+        Initialisiert den Speicher und legt die Tabelle bei Bedarf an.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            table: Name der Tabelle (optional, Standard: login_throttle)
+        """
+        self.engine = engine
+        self.table = table
+        self.ensure_table()
+
+    def ensure_table(self):
+        """
+        Legt die Tabelle für die Throttle-Zustände an, falls sie fehlt.
+        """
+        with self.engine.begin() as conn:
+            conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                Schluessel VARCHAR(255) PRIMARY KEY,
+                Tokens DOUBLE NOT NULL,
+                Aktualisiert_am DOUBLE NOT NULL,
+                Fehlversuche INT NOT NULL DEFAULT 0,
+                Gesperrt_bis DOUBLE NOT NULL DEFAULT 0,
+                Letzter_Fehlversuch DOUBLE NOT NULL DEFAULT 0
+            )
+            """))
+
+            # Ältere Tabellen ohne Zeitpunkt des letzten Fehlversuchs ergänzen
+            columns = {column["name"] for column in inspect(conn).get_columns(self.table)}
+            if "Letzter_Fehlversuch" not in columns:
+                conn.execute(text(f"ALTER TABLE {self.table} ADD COLUMN Letzter_Fehlversuch DOUBLE NOT NULL DEFAULT 0"))
+
+    def update(self, key, func):
+        """
+        Liest, ändert und speichert einen Zustand in einer Transaktion.
+
+        Args:
+            key: Schlüssel (z.B. "account:max")
+            func: Funktion func(state oder None) -> (neuer Zustand, Rückgabewert)
+
+        Returns:
+            Rückgabewert von func
+        """
+        # Auf MySQL die Zeile sperren, damit parallele Anmeldungen nacheinander zählen
+        lock_clause = " FOR UPDATE" if self.engine.dialect.name == "mysql" else ""
+
+        with self.engine.begin() as conn:
+            row = conn.execute(text(f"""
+            SELECT Tokens, Aktualisiert_am, Fehlversuche, Gesperrt_bis, Letzter_Fehlversuch
+            FROM {self.table} WHERE Schluessel = :key{lock_clause}
+            """), {"key": key}).fetchone()
+
+            state, result = func(ThrottleState(*row) if row else None)
+            params = {
+                "key": key,
+                "tokens": state.tokens,
+                "updated_at": state.updated_at,
+                "failures": state.failures,
+                "blocked_until": state.blocked_until,
+                "failed_at": state.failed_at,
+            }
+
+            if row:
+                conn.execute(text(f"""
+                UPDATE {self.table}
+                SET Tokens = :tokens, Aktualisiert_am = :updated_at, Fehlversuche = :failures,
+                    Gesperrt_bis = :blocked_until, Letzter_Fehlversuch = :failed_at
+                WHERE Schluessel = :key
+                """), params)
+            else:
+                conn.execute(text(f"""
+                INSERT INTO {self.table} (Schluessel, Tokens, Aktualisiert_am, Fehlversuche, Gesperrt_bis, Letzter_Fehlversuch)
+                VALUES (:key, :tokens, :updated_at, :failures, :blocked_until, :failed_at)
+                """), params)
+
+            return result
+
+
+class LoginThrottle:
+    """
+    Schutz vor Brute-Force-Angriffen ohne blockierende Wartezeiten.
+    Jedes Konto und jede Quelle (IP-Adresse) hat einen Token-Bucket; jeder Anmeldeversuch
+    verbraucht ein Token; erfolgreiche Anmeldungen erhalten das Token der Quelle zurück.
+    Nach wiederholten Fehlversuchen wird das Konto bzw. die Quelle mit exponentiell
+    wachsender Dauer gesperrt. Gesperrte Versuche werden sofort abgewiesen.
+    """
+
+    # Ein Schutz je Engine, damit alle Sitzungen dieselben Zähler verwenden
+    _throttles = {}
+    _throttles_lock = threading.Lock()
+
+    def __init__(self, store=None, account_capacity=DEFAULT_ACCOUNT_CAPACITY, account_refill=DEFAULT_ACCOUNT_REFILL,
+                 source_capacity=DEFAULT_SOURCE_CAPACITY, source_refill=DEFAULT_SOURCE_REFILL,
+                 free_failures=FREE_FAILURES, source_free_failures=SOURCE_FREE_FAILURES,
+                 base_backoff=BASE_BACKOFF, max_backoff=MAX_BACKOFF, source_failure_decay=SOURCE_FAILURE_DECAY):
+        """
+        Initialisiert den Schutz.
+
+        Args:
+            store: Speicher für die Zustände (optional, Standard: InMemoryThrottleStore)
+            account_capacity: Versuche je Konto ohne Wartezeit (optional)
+            account_refill: Neue Versuche je Sekunde und Konto (optional)
+            source_capacity: Versuche je Quelle ohne Wartezeit (optional)
+            source_refill: Neue Versuche je Sekunde und Quelle (optional)
+            free_failures: Fehlversuche je Konto bis zur ersten Sperre (optional)
+            source_free_failures: Fehlversuche je Quelle bis zur ersten Sperre (optional)
+            base_backoff: Dauer der ersten Sperre in Sekunden (optional)
+            max_backoff: Maximale Dauer einer Sperre in Sekunden (optional)
+            source_failure_decay: Sekunden ohne Fehlversuch, nach denen ein Fehlversuch der Quelle verfällt (optional)
+        """
+        self.store = store or InMemoryThrottleStore()
+        self.limits = {
+            "account": (account_capacity, account_refill),
+            "source": (source_capacity, source_refill),
+        }
+        self.free_failures = {"account": free_failures, "source": source_free_failures}
+        # Fehlversuche eines Kontos verfallen nicht, sie werden bei erfolgreicher Anmeldung zurückgesetzt
+        self.failure_decay = {"account": None, "source": source_failure_decay}
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def for_engine(cls, engine, persistent=False):
+        """
+        Gibt den gemeinsamen Schutz für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            persistent: Zustände in der Tabelle login_throttle statt im Prozess speichern (optional)
+
+        Returns:
+            LoginThrottle: Gemeinsamer Schutz
+        """
+        with cls._throttles_lock:
+            throttle = cls._throttles.get(engine)
+            if throttle is None:
+                throttle = cls(SqlThrottleStore(engine) if persistent else None)
+                cls._throttles[engine] = throttle
+            return throttle
+
+    def _keys(self, account, source):
+        keys = [("account", f"account:{str(account).strip().lower()}")]
+        if source:
+            keys.append(("source", f"source:{source}"))
+        return keys
+
+    def _refill(self, state, kind, now):
+        capacity, refill = self.limits[kind]
+        if state is None:
+            return ThrottleState(capacity, now)
+        state.tokens = min(capacity, state.tokens + (now - state.updated_at) * refill)
+        state.updated_at = now
+
+        # Je vollem Intervall seit dem letzten Fehlversuch verfällt einer; der Rest des Intervalls bleibt erhalten
+        decay = self.failure_decay[kind]
+        if decay and state.failures > 0:
+            expired = int((now - state.failed_at) // decay)
+            if expired > 0:
+                state.failures = max(state.failures - expired, 0)
+                state.failed_at += expired * decay
+        return state
+
+    def _wait_time(self, state, kind, now):
+        _, refill = self.limits[kind]
+        wait = max(state.blocked_until - now, 0.0)
+        if state.tokens < 1:
+            wait = max(wait, (1 - state.tokens) / refill)
+        return wait
+
+    def retry_after(self, account, source=None):
+        """
+        Gibt an, wie lange ein weiterer Anmeldeversuch warten muss, ohne ein Token zu verbrauchen.
+
+        Args:
+            account: Benutzername oder E-Mail
+            source: Quelle des Versuchs, z.B. IP-Adresse (optional)
+
+        Returns:
+            float: Wartezeit in Sekunden (0, wenn ein Versuch möglich ist)
+        """
+        now = time.time()
+        wait = 0.0
+        for kind, key in self._keys(account, source):
+            def peek(state, kind=kind):
+                state = self._refill(state, kind, now)
+                return state, self._wait_time(state, kind, now)
+            wait = max(wait, self.store.update(key, peek))
+        return wait
+
+    def acquire(self, account, source=None):
+        """
+        Prüft einen Anmeldeversuch und verbraucht bei Erfolg je ein Token für Konto und Quelle.
+        Prüfung und Verbrauch erfolgen je Schlüssel in einer Aktualisierung des Speichers, sodass
+        parallele Versuche das Limit nicht gemeinsam überschreiten können.
+
+        Args:
+            account: Benutzername oder E-Mail
+            source: Quelle des Versuchs, z.B. IP-Adresse (optional)
+
+        Returns:
+            float: 0, wenn der Versuch erlaubt ist, sonst die Wartezeit in Sekunden
+        """
+        now = time.time()
+        consumed = []
+        for kind, key in self._keys(account, source):
+            def consume(state, kind=kind):
+                state = self._refill(state, kind, now)
+                wait = self._wait_time(state, kind, now)
+                if wait == 0:
+                    state.tokens -= 1
+                return state, wait
+
+            wait = self.store.update(key, consume)
+            if wait > 0:
+                # Bereits verbrauchte Tokens der anderen Schlüssel zurückgeben
+                for consumed_kind, consumed_key in consumed:
+                    self.store.update(consumed_key, lambda state, kind=consumed_kind: self._refund(state, kind, now))
+                return wait
+            consumed.append((kind, key))
+        return 0.0
+
+    def _refund(self, state, kind, now):
+        state = self._refill(state, kind, now)
+        state.tokens = min(state.tokens + 1, self.limits[kind][0])
+        return state, None
+
+    def record_failure(self, account, source=None):
+        """
+        Zählt einen Fehlversuch und sperrt Konto bzw. Quelle bei Bedarf mit exponentiellem Backoff.
+
+        Args:
+            account: Benutzername oder E-Mail
+            source: Quelle des Versuchs, z.B. IP-Adresse (optional)
+        """
+        now = time.time()
+        for kind, key in self._keys(account, source):
+            def fail(state, kind=kind):
+                state = self._refill(state, kind, now)
+                state.failures += 1
+                state.failed_at = now
+                free_failures = self.free_failures[kind]
+                if state.failures > free_failures:
+                    backoff = self.base_backoff * 2 ** (state.failures - free_failures - 1)
+                    state.blocked_until = now + min(backoff, self.max_backoff)
+                return state, None
+            self.store.update(key, fail)
+
+    def record_success(self, account, source=None):
+        """
+        Setzt die Fehlversuche des Kontos nach einer erfolgreichen Anmeldung zurück und
+        erstattet das von acquire verbrauchte Token der Quelle. Die Fehlversuche der Quelle
+        bleiben bestehen, damit ein gültiges Konto keine Angriffe auf andere Konten von
+        derselben Quelle freischaltet; sie verfallen mit der Zeit (source_failure_decay).
+
+        Args:
+            account: Benutzername oder E-Mail
+            source: Quelle des Versuchs, z.B. IP-Adresse (optional)
+        """
+        now = time.time()
+        for kind, key in self._keys(account, source):
+            def succeed(state, kind=kind):
+                if kind != "account":
+                    return self._refund(state, kind, now)
+                state = self._refill(state, kind, now)
+                state.failures = 0
+                state.blocked_until = 0.0
+                state.tokens = self.limits[kind][0]
+                return state, None
+            self.store.update(key, succeed)
@@ -0,0 +1,353 @@
+import re
+import threading
+from sqlalchemy import text, inspect
+from ticket_search import FULLTEXT_INDEXES
+from ticket_statistics import create_statistics_table, rebuild_statistics
+from ticket_analytics import TicketAnalytics, WATERMARK_TABLE, create_rollup_tables
+
+# Name der MySQL-Sperre, damit mehrere Prozesse die Migrationen nicht gleichzeitig ausführen
+MIGRATION_LOCK_NAME = "ticketsystem_migrations"
+MIGRATION_LOCK_TIMEOUT = 60
+
+
+class MigrationDeferred(Exception):
+    """
+    Eine Migration kann wegen vorhandener Daten noch nicht ausgeführt werden (z.B. Duplikate).
+    Sie wird übersprungen und beim nächsten Prozessstart erneut versucht; die übrigen Migrationen laufen weiter.
+    """
+
+
+def get_existing_columns(conn, table):
+    """
+    Gibt die vorhandenen Spalten einer Tabelle zurück.
+
+    Args:
+        conn: Offene Verbindung
+        table: Name der Tabelle
+
+    Returns:
+        dict: Spaltenname -> Typ als Text (leer, wenn die Tabelle fehlt)
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return {}
+    return {col["name"]: str(col["type"]) for col in inspector.get_columns(table)}
+
+
+def get_existing_indexes(conn, table):
+    """
+    Gibt die Namen der vorhandenen Indizes einer Tabelle zurück.
+
+    Args:
+        conn: Offene Verbindung
+        table: Name der Tabelle
+
+    Returns:
+        set: Indexnamen
+    """
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return set()
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def alter_table(conn, table, clauses):
+    """
+    Führt mehrere Änderungen an einer Tabelle aus. Auf MySQL geschieht dies in einem
+    einzigen ALTER TABLE, sodass große Tabellen nur einmal umgebaut werden.
+    Nur für Spaltenänderungen; FULLTEXT-Indizes brauchen je ein eigenes ALTER TABLE.
+
+    Args:
+        conn: Offene Verbindung
+        table: Name der Tabelle
+        clauses: Liste von Änderungen, z.B. ["ADD COLUMN salt VARCHAR(64)"]
+    """
+    if not clauses:
+        return
+
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"ALTER TABLE {table} " + ", ".join(clauses)))
+    else:
+        # SQLite erlaubt nur eine Änderung pro ALTER TABLE
+        for clause in clauses:
+            conn.execute(text(f"ALTER TABLE {table} {clause}"))
+
+
+def create_index(conn, table, index_name, columns, unique=False):
+    """
+    Legt einen Index an, falls er noch nicht existiert.
+
+    Args:
+        conn: Offene Verbindung
+        table: Name der Tabelle
+        index_name: Name des Index
+        columns: Liste der Spalten
+        unique: Eindeutiger Index (optional)
+    """
+    if index_name in get_existing_indexes(conn, table):
+        return
+    conn.execute(text(f"CREATE {'UNIQUE ' if unique else ''}INDEX {index_name} ON {table} ({', '.join(columns)})"))
+
+
+def migrate_mitarbeiter_auth_columns(conn):
+    # Spalten für Salt, Passwort-Reset und Passwortänderung sowie breiteres Password_hash
+    # für die versionierten Hash-Formate, auf MySQL in einem ALTER TABLE
+    existing = get_existing_columns(conn, "mitarbeiter")
+    if not existing:
+        return
+
+    required = [
+        ("salt", "VARCHAR(64)"),
+        ("reset_token", "VARCHAR(64)"),
+        ("reset_token_expiry", "DATETIME"),
+        ("password_change_required", "BOOLEAN DEFAULT FALSE"),
+    ]
+    clauses = [f"ADD COLUMN {name} {definition}" for name, definition in required if name not in existing]
+
+    length_match = re.search(r"CHAR\((\d+)\)", existing.get("Password_hash", "").upper())
+    if conn.dialect.name == "mysql" and length_match and int(length_match.group(1)) < 255:
+        clauses.append("MODIFY Password_hash VARCHAR(255)")
+
+    alter_table(conn, "mitarbeiter", clauses)
+
+
+def migrate_ticket_keyset_index(conn):
+    # Index für die Keyset-Paginierung der Ticketübersicht
+    if get_existing_columns(conn, "tickets"):
+        create_index(conn, "tickets", "idx_tickets_erstellt_id", ["Erstellt_am", "ID_Ticket"])
+
+
+def migrate_ticket_fulltext_indexes(conn):
+    # FULLTEXT-Indizes für die Volltextsuche (nur MySQL, andere Backends nutzen den In-Process-Index)
+    if conn.dialect.name != "mysql" or not get_existing_columns(conn, "tickets"):
+        return
+
+    # InnoDB legt je ALTER TABLE nur einen FULLTEXT-Index an (Fehler 1795), daher ein Statement je Index
+    existing = get_existing_indexes(conn, "tickets")
+    for index_name, columns in FULLTEXT_INDEXES.values():
+        if index_name not in existing:
+            conn.execute(text(f"ALTER TABLE tickets ADD FULLTEXT INDEX {index_name} ({', '.join(columns)})"))
+
+
+def migrate_ticket_history_table(conn):
+    # Änderungshistorie der Tickets mit Index für die Anzeige je Ticket
+    if conn.dialect.name == "mysql":
+        primary_key = "INT AUTO_INCREMENT PRIMARY KEY"
+    else:
+        primary_key = "INTEGER PRIMARY KEY AUTOINCREMENT"
+
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS ticket_historie (
+        ID_Historie {primary_key},
+        ID_Ticket INT NOT NULL,
+        Feldname VARCHAR(100) NOT NULL,
+        Alter_Wert TEXT,
+        Neuer_Wert TEXT,
+        Geändert_von INT,
+        Geändert_am DATETIME NOT NULL
+    )
+    """))
+    create_index(conn, "ticket_historie", "idx_historie_ticket_datum", ["ID_Ticket", "Geändert_am"])
+
+
+def migrate_ticket_relation_unique_keys(conn):
+    # Eindeutige Schlüssel, damit create_ticket_relations doppelte Einträge per INSERT IGNORE überspringt
+    for table, columns in (
+        ("ticket_mitarbeiter", ["ID_Ticket", "ID_Mitarbeiter"]),
+        ("ticket_kategorie", ["ID_Ticket", "ID_Kategorie"]),
+    ):
+        if not get_existing_columns(conn, table):
+            continue
+
+        duplicates = conn.execute(text(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} GROUP BY {', '.join(columns)} HAVING COUNT(*) > 1) d"
+        )).scalar()
+        if duplicates:
+            raise MigrationDeferred(f"{table} enthält {duplicates} doppelte Zuordnungen, bitte vor der Migration bereinigen")
+
+        create_index(conn, table, f"uq_{table}", columns, unique=True)
+
+
+def migrate_ticket_statistics_table(conn):
+    # Vorberechnete Zähler für die Statistikseite, einmalig aus den vorhandenen Tickets befüllt
+    create_statistics_table(conn)
+    if get_existing_columns(conn, "tickets"):
+        rebuild_statistics(conn)
+
+
+def migrate_ticket_rollup_tables(conn):
+    # Zeitreihen-Rollups für die Verlaufsauswertung, einmalig aus tickets und ticket_historie befüllt
+    create_rollup_tables(conn)
+    if all(get_existing_columns(conn, table) for table in ("tickets", "ticket_historie", "status")):
+        TicketAnalytics.for_engine(conn.engine).update(conn)
+
+
+def migrate_comment_thread_index(conn):
+    # Index für die seitenweise Anzeige der Kommentare je Ticket, neueste zuerst;
+    # InnoDB hängt den Primärschlüssel ID_Kommentar als Sortierkriterium bei Gleichstand an
+    if get_existing_columns(conn, "kommentare"):
+        create_index(conn, "kommentare", "idx_kommentare_ticket_erstellt", ["Ticket_ID", "Erstellt_am"])
+
+
+def migrate_ticket_rollup_settle_window(conn):
+    # Kandidat und einzeln verarbeitete IDs für den Nachlauf der Rollups (ticket_analytics.SETTLE_SECONDS);
+    # neue Installationen erhalten beides bereits mit Migration 7
+    create_rollup_tables(conn)
+    existing = get_existing_columns(conn, WATERMARK_TABLE)
+    clauses = []
+    if "Kandidat_ID" not in existing:
+        clauses.append("ADD COLUMN Kandidat_ID INT NOT NULL DEFAULT 0")
+    if "Kandidat_Zeit" not in existing:
+        clauses.append("ADD COLUMN Kandidat_Zeit DATETIME NULL")
+    alter_table(conn, WATERMARK_TABLE, clauses)
+
+
+# Geordnete Liste der Migrationen: (Version, Beschreibung, Funktion)
+# Neue Migrationen werden nur angehängt, vorhandene nie geändert.
+MIGRATIONS = [
+    (1, "Anmeldespalten in mitarbeiter", migrate_mitarbeiter_auth_columns),
+    (2, "Keyset-Index auf tickets", migrate_ticket_keyset_index),
+    (3, "FULLTEXT-Indizes auf tickets", migrate_ticket_fulltext_indexes),
+    (4, "Tabelle ticket_historie", migrate_ticket_history_table),
+    (5, "Eindeutige Schlüssel für Ticket-Zuordnungen", migrate_ticket_relation_unique_keys),
+    (6, "Tabelle ticket_statistik", migrate_ticket_statistics_table),
+    (7, "Tabellen ticket_verlauf und ticket_verlauf_stand", migrate_ticket_rollup_tables),
+    (8, "Index auf kommentare für die Kommentarseiten", migrate_comment_thread_index),
+    (9, "Nachlauf für ticket_verlauf_stand", migrate_ticket_rollup_settle_window),
+]
+
+
+class MigrationRunner:
+    """
+    Führt die Schema-Migrationen in der Reihenfolge ihrer Versionen aus und
+    vermerkt jede ausgeführte Version in der Tabelle schema_version.
+    Die Prüfung erfolgt nur einmal pro Prozess und Engine, auch wenn sie fehlschlägt.
+    """
+
+    # Ein Runner je Engine, damit die Prüfung nur einmal pro Prozess erfolgt
+    _runners = {}
+    _runners_lock = threading.Lock()
+
+    def __init__(self, engine, migrations=None):
+        """
+        Initialisiert den Runner.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            migrations: Liste von (Version, Beschreibung, Funktion) (optional, Standard: MIGRATIONS)
+        """
+        self.engine = engine
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda migration: migration[0])
+        self._lock = threading.Lock()
+        self._completed = False
+        self.error = None
+        self.deferred = {}
+
+    @classmethod
+    def for_engine(cls, engine):
+        """
+        Gibt den gemeinsamen Runner für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+
+        Returns:
+            MigrationRunner: Gemeinsamer Runner
+        """
+        with cls._runners_lock:
+            runner = cls._runners.get(engine)
+            if runner is None:
+                runner = cls(engine)
+                cls._runners[engine] = runner
+            return runner
+
+    def _ensure_version_table(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                Version INT PRIMARY KEY,
+                Beschreibung VARCHAR(255),
+                Ausgefuehrt_am DATETIME
+            )
+            """))
+
+    def current_version(self):
+        """
+        Gibt die höchste ausgeführte Migrationsversion zurück.
+
+        Returns:
+            int: Version (0, wenn noch keine Migration ausgeführt wurde)
+        """
+        self._ensure_version_table()
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT COALESCE(MAX(Version), 0) FROM schema_version")).scalar()
+
+    def applied_versions(self):
+        """
+        Gibt alle ausgeführten Migrationsversionen zurück. Zurückgestellte Versionen
+        können unter einer höheren ausgeführten Version fehlen.
+
+        Returns:
+            set: Versionen
+        """
+        self._ensure_version_table()
+        with self.engine.connect() as conn:
+            return {row[0] for row in conn.execute(text("SELECT Version FROM schema_version")).fetchall()}
+
+    def run(self):
+        """
+        Führt alle ausstehenden Migrationen aus. Zurückgestellte Migrationen (MigrationDeferred)
+        werden in deferred vermerkt, ohne die folgenden aufzuhalten. Ein Fehler wird in error
+        gespeichert und weitergegeben; weitere Aufrufe im selben Prozess versuchen es nicht erneut.
+
+        Returns:
+            list: Versionen der in diesem Aufruf ausgeführten Migrationen
+        """
+        if self._completed:
+            return []
+
+        with self._lock:
+            if self._completed:
+                return []
+
+            applied = []
+            try:
+                with self.engine.connect() as lock_conn:
+                    # Auf MySQL andere Prozesse warten lassen, bis die Migrationen durchgelaufen sind
+                    is_mysql = self.engine.dialect.name == "mysql"
+                    if is_mysql:
+                        acquired = lock_conn.execute(
+                            text("SELECT GET_LOCK(:name, :timeout)"),
+                            {"name": MIGRATION_LOCK_NAME, "timeout": MIGRATION_LOCK_TIMEOUT}
+                        ).scalar()
+                        if acquired != 1:
+                            raise RuntimeError(f"Sperre {MIGRATION_LOCK_NAME} nicht erhalten, Migrationen laufen in einem anderen Prozess")
+
+                    try:
+                        done = self.applied_versions()
+                        for version, description, migrate in self.migrations:
+                            if version in done:
+                                continue
+
+                            try:
+                                with self.engine.begin() as conn:
+                                    migrate(conn)
+                                    conn.execute(
+                                        text("INSERT INTO schema_version (Version, Beschreibung, Ausgefuehrt_am) VALUES (:version, :description, CURRENT_TIMESTAMP)"),
+                                        {"version": version, "description": description}
+                                    )
+                            except MigrationDeferred as e:
+                                print(f"Schema-Migration {version} zurückgestellt: {str(e)}")
+                                self.deferred[version] = str(e)
+                                continue
+                            applied.append(version)
+                    finally:
+                        if is_mysql:
+                            lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": MIGRATION_LOCK_NAME})
+            except Exception as e:
+                self.error = e
+                raise
+            finally:
+                self._completed = True
+
+            return applied
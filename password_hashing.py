@@ -0,0 +1,229 @@
+import atexit
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Standard-Parameter der Verfahren (können über die Konstruktoren angepasst werden)
+PBKDF2_ITERATIONS = 600000
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+# Anzahl paralleler Hash-Berechnungen und maximale Anzahl wartender Anfragen
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 32
+
+
+def _encode(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(value):
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+class LegacySha256Hasher:
+    """
+    Bisheriges Verfahren: SHA-256 über Passwort und Salt, Hash als Hex-Text ohne Präfix.
+    Wird nur noch geprüft; neue Hashes werden mit einem KDF erzeugt.
+    """
+
+    name = "sha256"
+
+    def identify(self, stored_hash):
+        return re.fullmatch(r"[0-9a-f]{64}", stored_hash) is not None
+
+    def hash(self, password, salt):
+        return hashlib.sha256((password + salt).encode()).hexdigest()
+
+    def verify(self, password, stored_hash, salt):
+        return hmac.compare_digest(self.hash(password, salt or ""), stored_hash)
+
+    def needs_rehash(self, stored_hash):
+        return True
+
+
+class Pbkdf2Hasher:
+    """
+    PBKDF2-HMAC-SHA256 im Format pbkdf2_sha256$<Iterationen>$<Salt>$<Hash>.
+    """
+
+    name = "pbkdf2_sha256"
+
+    def __init__(self, iterations=PBKDF2_ITERATIONS):
+        self.iterations = iterations
+
+    def identify(self, stored_hash):
+        return stored_hash.startswith(self.name + "$")
+
+    def hash(self, password, salt):
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), self.iterations)
+        return f"{self.name}${self.iterations}${salt}${_encode(digest)}"
+
+    def verify(self, password, stored_hash, salt=None):
+        _, iterations, stored_salt, encoded = stored_hash.split("$", 3)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), stored_salt.encode(), int(iterations))
+        return hmac.compare_digest(digest, _decode(encoded))
+
+    def needs_rehash(self, stored_hash):
+        return int(stored_hash.split("$", 2)[1]) < self.iterations
+
+
+class ScryptHasher:
+    """
+    scrypt im Format scrypt$<n>$<r>$<p>$<Salt>$<Hash>.
+    """
+
+    name = "scrypt"
+
+    def __init__(self, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+        self.n = n
+        self.r = r
+        self.p = p
+
+    def identify(self, stored_hash):
+        return stored_hash.startswith(self.name + "$")
+
+    def _derive(self, password, salt, n, r, p):
+        # maxmem großzügig setzen, damit auch höhere Kostenparameter möglich sind
+        return hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+                              maxmem=256 * n * r * p + 2 ** 20, dklen=32)
+
+    def hash(self, password, salt):
+        digest = self._derive(password, salt, self.n, self.r, self.p)
+        return f"{self.name}${self.n}${self.r}${self.p}${salt}${_encode(digest)}"
+
+    def verify(self, password, stored_hash, salt=None):
+        _, n, r, p, stored_salt, encoded = stored_hash.split("$", 5)
+        digest = self._derive(password, stored_salt, int(n), int(r), int(p))
+        return hmac.compare_digest(digest, _decode(encoded))
+
+    def needs_rehash(self, stored_hash):
+        _, n, r, p, _ = stored_hash.split("$", 4)
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+
+class PasswordHashing:
+    """
+    Erzeugt und prüft Passwort-Hashes mit versionierten Formaten.
+    Neue Hashes verwenden das Standardverfahren; ältere Formate werden weiterhin geprüft
+    und nach erfolgreicher Anmeldung ersetzt (siehe needs_rehash).
+    Die Berechnungen laufen in einem begrenzten Thread-Pool: hashlib gibt bei PBKDF2 und
+    scrypt den GIL frei, sodass parallele Anmeldungen die Oberfläche nicht blockieren.
+    """
+
+    def __init__(self, default=None, hashers=None, max_workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING,
+                 timeout=30):
+        """
+        Initialisiert das Hashing.
+
+        Args:
+            default: Name des Standardverfahrens (optional, Standard: scrypt, falls verfügbar, sonst pbkdf2_sha256)
+            hashers: Liste der unterstützten Verfahren (optional)
+            max_workers: Anzahl paralleler Hash-Berechnungen (optional, Standard: 4)
+            max_pending: Maximale Anzahl gleichzeitig angenommener Berechnungen (optional, Standard: 32)
+            timeout: Maximale Wartezeit auf eine Berechnung in Sekunden (optional, Standard: 30)
+        """
+        if hashers is None:
+            hashers = [Pbkdf2Hasher(), LegacySha256Hasher()]
+            if hasattr(hashlib, "scrypt"):
+                hashers.insert(0, ScryptHasher())
+
+        self.hashers = {hasher.name: hasher for hasher in hashers}
+        self.default = self.hashers[default or hashers[0].name]
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hashing")
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def _identify(self, stored_hash):
+        for hasher in self.hashers.values():
+            if hasher.identify(stored_hash):
+                return hasher
+        raise ValueError("Unbekanntes Hash-Format")
+
+    def _run(self, func, *args):
+        # Höchstens max_pending Berechnungen gleichzeitig annehmen, weitere warten maximal timeout Sekunden
+        if not self._pending.acquire(timeout=self.timeout):
+            raise RuntimeError("Zu viele gleichzeitige Passwortprüfungen")
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._pending.release()
+            raise
+
+        # Erst freigeben, wenn die Berechnung wirklich beendet ist, auch wenn der Aufrufer nicht mehr wartet
+        future.add_done_callback(lambda _: self._pending.release())
+        return future.result(timeout=self.timeout)
+
+    def generate_salt(self):
+        """
+        Generiert einen zufälligen Salt.
+
+        Returns:
+            str: Salt als Hex-Text
+        """
+        return secrets.token_hex(16)
+
+    def hash(self, password, salt=None):
+        """
+        Hasht ein Passwort mit dem Standardverfahren.
+
+        Args:
+            password: Passwort
+            salt: Salt (optional, wird sonst generiert)
+
+        Returns:
+            str: Hash im versionierten Format
+        """
+        return self._run(self.default.hash, password, salt or self.generate_salt())
+
+    def verify(self, password, stored_hash, salt=None):
+        """
+        Prüft ein Passwort gegen einen gespeicherten Hash beliebigen Formats.
+
+        Args:
+            password: Passwort
+            stored_hash: Gespeicherter Hash
+            salt: Salt aus der Datenbank (nur für Legacy-Hashes nötig)
+
+        Returns:
+            bool: Passwort korrekt
+        """
+        if not stored_hash:
+            return False
+        try:
+            hasher = self._identify(stored_hash)
+        except ValueError:
+            return False
+        return self._run(hasher.verify, password, stored_hash, salt)
+
+    def needs_rehash(self, stored_hash):
+        """
+        Gibt an, ob ein Hash nicht dem Standardverfahren mit aktuellen Parametern entspricht.
+
+        Args:
+            stored_hash: Gespeicherter Hash
+
+        Returns:
+            bool: Neu hashen empfohlen
+        """
+        try:
+            hasher = self._identify(stored_hash)
+        except ValueError:
+            return True
+        return hasher is not self.default or hasher.needs_rehash(stored_hash)
+
+    def shutdown(self):
+        """
+        Beendet den Thread-Pool.
+        """
+        self._executor.shutdown(wait=False)
+
+
+# Prozessweite Instanz, damit alle Sitzungen denselben begrenzten Pool nutzen
+password_hashing = PasswordHashing()
+atexit.register(password_hashing.shutdown)
@@ -0,0 +1,97 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.pool import QueuePool
+
+# Obergrenze der Worker-Threads je Engine, unabhängig von der Poolgröße
+DEFAULT_MAX_WORKERS = 8
+
+# Gesetzt innerhalb eines Worker-Threads, damit verschachtelte Aufrufe nicht auf freie Worker warten
+_inside_worker = contextvars.ContextVar("inside_query_worker", default=False)
+
+
+def _run_task(task):
+    _inside_worker.set(True)
+    return task()
+
+
+class QueryExecutor:
+    """
+    Führt voneinander unabhängige Abfragen einer Seite parallel über den Verbindungspool aus,
+    sodass die Ladezeit der langsamsten statt der Summe aller Abfragen entspricht.
+    Jede Aufgabe läuft in einer Kopie des aufrufenden Kontexts, damit die Seitenzuordnung
+    der Abfragemetriken (query_metrics.current_page) erhalten bleibt.
+    """
+
+    # Ein Thread-Pool je Engine, damit alle Sitzungen dieselben Worker nutzen
+    _executors = {}
+    _executors_lock = threading.Lock()
+
+    def __init__(self, engine, max_workers=None):
+        """
+        Initialisiert den Executor.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            max_workers: Anzahl der Worker-Threads (optional, Standard: Poolgröße, höchstens DEFAULT_MAX_WORKERS)
+        """
+        self.engine = engine
+
+        # Pools ohne feste Verbindungsanzahl (z.B. SQLite im Speicher) teilen Verbindungen je Thread
+        # oder gar nicht; dort werden die Aufgaben nacheinander ausgeführt
+        if isinstance(engine.pool, QueuePool):
+            self.max_workers = max_workers or min(DEFAULT_MAX_WORKERS, engine.pool.size())
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="query")
+        else:
+            self.max_workers = 1
+            self._executor = None
+
+    @classmethod
+    def for_engine(cls, engine, max_workers=None):
+        """
+        Gibt den gemeinsamen Executor für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            max_workers: Anzahl der Worker-Threads (optional)
+
+        Returns:
+            QueryExecutor: Gemeinsamer Executor
+        """
+        with cls._executors_lock:
+            executor = cls._executors.get(engine)
+            if executor is None:
+                executor = cls(engine, max_workers)
+                cls._executors[engine] = executor
+            return executor
+
+    def run(self, tasks):
+        """
+        Führt die Aufgaben parallel aus und wartet, bis alle fertig sind.
+        Schlägt eine Aufgabe fehl, wird der erste Fehler nach Abschluss aller Aufgaben weitergegeben.
+
+        Args:
+            tasks: Dictionary Name -> Funktion ohne Argumente (darf keine Streamlit-Elemente ausgeben)
+
+        Returns:
+            dict: Name -> Rückgabewert der Funktion
+        """
+        if self._executor is None or len(tasks) <= 1 or _inside_worker.get():
+            return {name: task() for name, task in tasks.items()}
+
+        futures = {
+            name: self._executor.submit(contextvars.copy_context().run, _run_task, task)
+            for name, task in tasks.items()
+        }
+
+        results = {}
+        error = None
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                error = error or e
+
+        if error is not None:
+            raise error
+        return results
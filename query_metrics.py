@@ -0,0 +1,448 @@
+import contextvars
+import hashlib
+import json
+import logging
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Seite der Benutzeroberfläche, die die aktuellen Abfragen auslöst
+current_page = contextvars.ContextVar("current_page", default="unbekannt")
+
+# Platzhalter und Literale, die beim Normalisieren durch ? ersetzt werden
+_PLACEHOLDER_PATTERN = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|'(?:[^'\\]|\\.|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """
+    Normalisiert eine SQL-Abfrage, sodass Abfragen mit unterschiedlichen Werten zusammengefasst werden.
+
+    Args:
+        statement: SQL-Abfrage (Text oder kompilierte Abfrage des Treibers)
+
+    Returns:
+        str: Abfrage mit ? statt Werten und einheitlichen Leerzeichen
+    """
+    normalized = _PLACEHOLDER_PATTERN.sub("?", str(statement))
+    normalized = _IN_LIST_PATTERN.sub("(?+)", normalized)
+    return _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+
+
+def describe_params(params):
+    """
+    Beschreibt die Struktur der Parameter ohne ihre Werte (z.B. für das Slow-Query-Log).
+
+    Args:
+        params: Parameter der Abfrage (dict, Liste von dicts oder Tupel)
+
+    Returns:
+        str: Parameternamen mit Typen
+    """
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        if params and isinstance(params[0], (dict, list, tuple)):
+            return f"{len(params)} x {describe_params(params[0])}"
+        return "(" + ", ".join(type(value).__name__ for value in params) + ")"
+    return type(params).__name__
+
+
+def estimate_bytes(result):
+    """
+    Schätzt die Größe eines Abfrageergebnisses im Speicher.
+
+    Args:
+        result: pandas.DataFrame oder Liste von Zeilen
+
+    Returns:
+        int: Geschätzte Größe in Bytes
+    """
+    if hasattr(result, "memory_usage"):
+        return int(result.memory_usage(index=False, deep=True).sum())
+    return sum(sys.getsizeof(value) for row in result for value in row)
+
+
+class Histogram:
+    """
+    Histogramm mit festen Buckets im Stil von Prometheus.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Initialisiert das leere Histogramm.
+
+        Args:
+            buckets: Obergrenzen der Buckets (optional, Standard: LATENCY_BUCKETS)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        """
+        Erfasst einen Messwert.
+
+        Args:
+            value: Messwert
+        """
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self):
+        """
+        Gibt die kumulierten Bucket-Zählerstände zurück.
+
+        Returns:
+            list: Liste von (Obergrenze, Anzahl) einschließlich "+Inf"
+        """
+        result = []
+        running = 0
+        for upper, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            running += count
+            result.append((upper, running))
+        return result
+
+    def quantile(self, q):
+        """
+        Schätzt ein Quantil über die Bucket-Obergrenzen.
+
+        Args:
+            q: Quantil zwischen 0 und 1
+
+        Returns:
+            float: Obergrenze des Buckets, in dem das Quantil liegt (None ohne Messwerte)
+        """
+        if not self.count:
+            return None
+        threshold = q * self.count
+        for upper, running in self.cumulative():
+            if running >= threshold:
+                return float("inf") if upper == "+Inf" else upper
+        return float("inf")
+
+
+class QueryStats:
+    """
+    Kennzahlen einer normalisierten Abfrage auf einer Seite.
+    """
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.query_id = hashlib.sha1(sql.encode("utf-8")).hexdigest()[:10]
+        self.latency = Histogram()
+        self.rows = 0
+        self.bytes = 0
+        self.errors = 0
+        self.slow = 0
+        self.max_duration = 0.0
+
+
+class QueryMetrics:
+    """
+    Prozessweite Messung der Datenbankabfragen.
+    Erfasst Laufzeiten, Zeilen, Bytes, Fehler und Wartezeiten auf den Verbindungspool
+    je Seite der Benutzeroberfläche und je normalisierter Abfrage.
+    """
+
+    def __init__(self, slow_query_threshold=0.5):
+        """
+        Initialisiert die Messung.
+
+        Args:
+            slow_query_threshold: Laufzeit in Sekunden, ab der eine Abfrage protokolliert wird
+                                  (optional, Standard: 0.5; None deaktiviert das Protokoll)
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._pool_wait = {}
+        self._observers = []
+        self._instrumented = set()
+
+    @contextmanager
+    def page(self, name):
+        """
+        Ordnet alle Abfragen innerhalb des Blocks einer Seite der Benutzeroberfläche zu.
+
+        Args:
+            name: Name der Seite
+        """
+        token = current_page.set(name)
+        try:
+            yield
+        finally:
+            current_page.reset(token)
+
+    def add_observer(self, callback):
+        """
+        Registriert eine Funktion, die nach jeder gemessenen Abfrage aufgerufen wird.
+
+        Args:
+            callback: Funktion callback(page, sql, duration, rows, error)
+        """
+        with self._lock:
+            self._observers.append(callback)
+
+    def instrument(self, engine):
+        """
+        Hängt die Messung an eine Engine (einmal pro Engine).
+
+        Args:
+            engine: SQLAlchemy-Engine
+        """
+        with self._lock:
+            if id(engine) in self._instrumented:
+                return
+            self._instrumented.add(id(engine))
+
+        # Die Wartezeit auf den Pool misst TimedQueuePool (siehe engine_registry.DEFAULT_POOL_SETTINGS)
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_metrics_start = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_metrics_start", None)
+        if start is None:
+            return
+
+        # Gepufferte MySQL-Cursor kennen nach dem Ausführen die Anzahl der gelesenen bzw. geänderten
+        # Zeilen, unabhängig davon, wie das Ergebnis abgeholt wird. Bei serverseitigen Cursorn ist sie
+        # noch unbekannt, dort zählt record_fetch die Zeilen; SQLite liefert für SELECT -1.
+        rows = 0
+        if not context.execution_options.get("stream_results") and cursor.rowcount and cursor.rowcount > 0:
+            rows = cursor.rowcount
+
+        self.record_query(statement, time.perf_counter() - start, parameters, rows=rows)
+
+    def _handle_error(self, exception_context):
+        context = exception_context.execution_context
+        start = getattr(context, "_query_metrics_start", None)
+        duration = time.perf_counter() - start if start is not None else 0.0
+        self.record_query(exception_context.statement or "", duration, exception_context.parameters, error=True)
+
+    def _get_stats(self, page, sql):
+        key = (page, sql)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = QueryStats(sql)
+            self._stats[key] = stats
+        return stats
+
+    def record_query(self, statement, duration, parameters=None, rows=0, error=False):
+        """
+        Erfasst eine ausgeführte Abfrage.
+
+        Args:
+            statement: SQL-Abfrage
+            duration: Laufzeit in Sekunden
+            parameters: Parameter der Abfrage (optional, nur für das Slow-Query-Log)
+            rows: Anzahl der betroffenen Zeilen (optional)
+            error: Ob die Abfrage fehlgeschlagen ist (optional)
+        """
+        page = current_page.get()
+        sql = normalize_sql(statement)
+        is_slow = self.slow_query_threshold is not None and duration >= self.slow_query_threshold
+
+        with self._lock:
+            stats = self._get_stats(page, sql)
+            stats.latency.observe(duration)
+            stats.rows += rows
+            stats.max_duration = max(stats.max_duration, duration)
+            if error:
+                stats.errors += 1
+            if is_slow:
+                stats.slow += 1
+            observers = list(self._observers)
+
+        if is_slow:
+            logger.warning(
+                "Langsame Abfrage (%.3f s, Seite %s): %s Parameter: %s",
+                duration, page, sql, describe_params(parameters) if parameters is not None else "{}"
+            )
+
+        for callback in observers:
+            try:
+                callback(page, sql, duration, rows, error)
+            except Exception as e:
+                print(f"Fehler im Abfrage-Beobachter: {str(e)}")
+
+    def record_fetch(self, statement, size, rows=0):
+        """
+        Erfasst die abgeholten Bytes einer Abfrage.
+
+        Args:
+            statement: SQL-Abfrage
+            size: Größe in Bytes
+            rows: Anzahl der Zeilen (optional, nur bei serverseitigen Cursorn, deren Zeilen
+                  beim Ausführen noch nicht gezählt werden konnten)
+        """
+        page = current_page.get()
+        sql = normalize_sql(statement)
+        with self._lock:
+            stats = self._get_stats(page, sql)
+            stats.rows += rows
+            stats.bytes += size
+
+    def record_pool_wait(self, duration):
+        """
+        Erfasst die Wartezeit auf eine Verbindung aus dem Pool.
+
+        Args:
+            duration: Wartezeit in Sekunden
+        """
+        page = current_page.get()
+        with self._lock:
+            histogram = self._pool_wait.get(page)
+            if histogram is None:
+                histogram = Histogram()
+                self._pool_wait[page] = histogram
+            histogram.observe(duration)
+
+    def reset(self):
+        """
+        Setzt alle Kennzahlen zurück.
+        """
+        with self._lock:
+            self._stats = {}
+            self._pool_wait = {}
+
+    def snapshot(self):
+        """
+        Gibt alle Kennzahlen als serialisierbares Dictionary zurück.
+
+        Returns:
+            dict: Kennzahlen je Abfrage und Wartezeiten je Seite
+        """
+        with self._lock:
+            queries = []
+            for (page, sql), stats in self._stats.items():
+                queries.append({
+                    "page": page,
+                    "query_id": stats.query_id,
+                    "sql": sql,
+                    "count": stats.latency.count,
+                    "total_seconds": round(stats.latency.total, 6),
+                    "p50_seconds": stats.latency.quantile(0.5),
+                    "p95_seconds": stats.latency.quantile(0.95),
+                    "max_seconds": round(stats.max_duration, 6),
+                    "rows": stats.rows,
+                    "bytes": stats.bytes,
+                    "errors": stats.errors,
+                    "slow": stats.slow,
+                })
+
+            pool_wait = {
+                page: {
+                    "count": histogram.count,
+                    "total_seconds": round(histogram.total, 6),
+                    "p95_seconds": histogram.quantile(0.95),
+                }
+                for page, histogram in self._pool_wait.items()
+            }
+
+        queries.sort(key=lambda item: item["total_seconds"], reverse=True)
+        return {"queries": queries, "pool_wait": pool_wait}
+
+    def to_json(self):
+        """
+        Exportiert die Kennzahlen als JSON.
+
+        Returns:
+            str: JSON-Text
+        """
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2, default=str)
+
+    def to_prometheus(self):
+        """
+        Exportiert die Kennzahlen im Textformat von Prometheus.
+
+        Returns:
+            str: Kennzahlen im Prometheus-Textformat
+        """
+        def labels(**values):
+            escaped = {key: str(value).replace("\\", "\\\\").replace('"', '\\"') for key, value in values.items()}
+            return "{" + ",".join(f'{key}="{value}"' for key, value in escaped.items()) + "}"
+
+        lines = []
+        with self._lock:
+            stats_items = list(self._stats.items())
+            pool_items = list(self._pool_wait.items())
+
+            lines.append("# HELP ticketsystem_query_duration_seconds Laufzeit der Datenbankabfragen")
+            lines.append("# TYPE ticketsystem_query_duration_seconds histogram")
+            for (page, _), stats in stats_items:
+                for upper, running in stats.latency.cumulative():
+                    lines.append(f"ticketsystem_query_duration_seconds_bucket{labels(page=page, query_id=stats.query_id, le=upper)} {running}")
+                lines.append(f"ticketsystem_query_duration_seconds_sum{labels(page=page, query_id=stats.query_id)} {stats.latency.total}")
+                lines.append(f"ticketsystem_query_duration_seconds_count{labels(page=page, query_id=stats.query_id)} {stats.latency.count}")
+
+            for name, attribute, help_text in (
+                ("ticketsystem_query_rows_total", "rows", "Gelesene oder geänderte Zeilen"),
+                ("ticketsystem_query_bytes_total", "bytes", "Abgeholte Bytes (geschätzt)"),
+                ("ticketsystem_query_errors_total", "errors", "Fehlgeschlagene Abfragen"),
+                ("ticketsystem_slow_queries_total", "slow", "Abfragen über dem Schwellwert"),
+            ):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for (page, _), stats in stats_items:
+                    lines.append(f"{name}{labels(page=page, query_id=stats.query_id)} {getattr(stats, attribute)}")
+
+            lines.append("# HELP ticketsystem_pool_wait_seconds Wartezeit auf eine Verbindung aus dem Pool")
+            lines.append("# TYPE ticketsystem_pool_wait_seconds histogram")
+            for page, histogram in pool_items:
+                for upper, running in histogram.cumulative():
+                    lines.append(f"ticketsystem_pool_wait_seconds_bucket{labels(page=page, le=upper)} {running}")
+                lines.append(f"ticketsystem_pool_wait_seconds_sum{labels(page=page)} {histogram.total}")
+                lines.append(f"ticketsystem_pool_wait_seconds_count{labels(page=page)} {histogram.count}")
+
+            # Zuordnung der Abfrage-IDs zum normalisierten SQL
+            lines.append("# HELP ticketsystem_query_info Normalisiertes SQL je Abfrage-ID")
+            lines.append("# TYPE ticketsystem_query_info gauge")
+            seen = set()
+            for (_, sql), stats in stats_items:
+                if stats.query_id not in seen:
+                    seen.add(stats.query_id)
+                    lines.append(f"ticketsystem_query_info{labels(query_id=stats.query_id, sql=sql)} 1")
+
+        return "\n".join(lines) + "\n"
+
+
+# Prozessweite Instanz für alle Engines
+query_metrics = QueryMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool, der die Wartezeit auf eine freie Verbindung an query_metrics meldet.
+    Pool-Ereignisse wie checkout feuern erst nach dem Warten; als Pool-Klasse bleibt
+    die Messung auch nach engine.dispose() erhalten, das einen neuen Pool derselben Klasse anlegt.
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            query_metrics.record_pool_wait(time.perf_counter() - start)
@@ -0,0 +1,177 @@
+import threading
+import time
+from sqlalchemy import text
+
+# Standard-Prioritätsstufen in der Reihenfolge, in der sie angezeigt werden. Weitere Werte aus
+# vorhandenen Tickets folgen alphabetisch, damit auch diese Tickets filterbar bleiben.
+PRIORITAETEN = ["Hoch", "Mittel", "Niedrig"]
+
+# Abfragen für die Nachschlagetabellen (ID und Anzeigename)
+LOOKUP_QUERIES = {
+    "status": "SELECT ID_Status, Name FROM status ORDER BY ID_Status",
+    "mitarbeiter": "SELECT ID_Mitarbeiter, Name FROM mitarbeiter ORDER BY Name",
+    "kunden": "SELECT ID_Kunde, Name FROM kunden ORDER BY Name",
+    "kategorien": "SELECT ID_Kategorie, Name FROM kategorien ORDER BY Name",
+    "prioritaeten": "SELECT DISTINCT Priorität FROM tickets WHERE Priorität IS NOT NULL AND Priorität <> ''",
+}
+
+
+def priority_rows(values):
+    """
+    Ordnet die Prioritäten: zuerst die Standardstufen, danach weitere vorhandene Werte.
+
+    Args:
+        values: In den Tickets vorkommende Prioritäten
+
+    Returns:
+        list: Liste von (Priorität, Priorität)-Tupeln in Anzeigereihenfolge
+    """
+    extra = sorted(set(values) - set(PRIORITAETEN))
+    return [(name, name) for name in PRIORITAETEN + extra]
+
+
+class LookupTable:
+    """
+    Stammdaten einer Nachschlagetabelle mit Zuordnungen in beide Richtungen.
+    """
+
+    def __init__(self, rows, version=0):
+        """
+        Initialisiert die Nachschlagetabelle.
+
+        Args:
+            rows: Liste von (ID, Name)-Tupeln in Anzeigereihenfolge
+            version: Version der Daten beim Laden (optional)
+        """
+        self.version = version
+        self.ids = [row[0] for row in rows]
+        self.names = [row[1] for row in rows]
+        self.id_to_name = {row_id: name for row_id, name in rows}
+
+        # Bei doppelten Namen gilt wie bei list.index() der erste Eintrag
+        self.name_to_id = {}
+        for row_id, name in rows:
+            self.name_to_id.setdefault(name, row_id)
+
+
+class ReferenceDataCache:
+    """
+    Zwischenspeicher für Stammdaten (Status, Mitarbeiter, Kunden, Kategorien, Prioritäten).
+    Jede Tabelle hat eine Versionsnummer, die nach Änderungen erhöht wird und
+    den zwischengespeicherten Stand ungültig macht.
+    """
+
+    # Ein Cache je Engine, damit alle Sitzungen dieselben Stammdaten nutzen
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, engine, ttl=600):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            ttl: Maximales Alter der Daten in Sekunden (optional, Standard: 600),
+                 damit auch Änderungen außerhalb der Anwendung sichtbar werden
+        """
+        self.engine = engine
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Eigene Sperre je Tabelle, damit verschiedene Tabellen parallel geladen werden können
+        self._load_locks = {name: threading.Lock() for name in LOOKUP_QUERIES}
+        self._versions = {name: 0 for name in LOOKUP_QUERIES}
+        self._entries = {}
+
+    @classmethod
+    def for_engine(cls, engine, ttl=600):
+        """
+        Gibt den gemeinsamen Cache für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            ttl: Maximales Alter der Daten in Sekunden (optional, Standard: 600)
+
+        Returns:
+            ReferenceDataCache: Gemeinsamer Cache
+        """
+        with cls._caches_lock:
+            cache = cls._caches.get(engine)
+            if cache is None:
+                cache = cls(engine, ttl)
+                cls._caches[engine] = cache
+            return cache
+
+    def get(self, name):
+        """
+        Gibt die Stammdaten einer Nachschlagetabelle zurück und lädt sie bei Bedarf.
+
+        Args:
+            name: Name der Tabelle (status, mitarbeiter, kunden, kategorien, prioritaeten)
+
+        Returns:
+            LookupTable: Stammdaten
+        """
+        cached = self.get_cached(name)
+        if cached is not None:
+            return cached
+
+        with self._load_locks[name]:
+            entry = self._entries.get(name)
+            if self._is_valid(name, entry):
+                return entry[1]
+
+            version = self._versions[name]
+            with self.engine.connect() as conn:
+                rows = [tuple(row) for row in conn.execute(text(LOOKUP_QUERIES[name])).fetchall()]
+            if name == "prioritaeten":
+                rows = priority_rows(row[0] for row in rows)
+
+            lookup = LookupTable(rows, version)
+            self._entries[name] = (time.monotonic(), lookup)
+            return lookup
+
+    def get_cached(self, name):
+        """
+        Gibt die Stammdaten einer Nachschlagetabelle zurück, ohne sie zu laden.
+
+        Args:
+            name: Name der Tabelle (status, mitarbeiter, kunden, kategorien, prioritaeten)
+
+        Returns:
+            LookupTable: Stammdaten oder None, wenn sie fehlen oder veraltet sind
+        """
+        if name not in LOOKUP_QUERIES:
+            raise ValueError(f"Unbekannte Nachschlagetabelle: {name}")
+
+        entry = self._entries.get(name)
+        return entry[1] if self._is_valid(name, entry) else None
+
+    def _is_valid(self, name, entry):
+        if entry is None:
+            return False
+        loaded_at, lookup = entry
+        return lookup.version == self._versions[name] and time.monotonic() - loaded_at < self.ttl
+
+    def version(self, name):
+        """
+        Gibt die aktuelle Version einer Nachschlagetabelle zurück.
+
+        Args:
+            name: Name der Tabelle
+
+        Returns:
+            int: Versionsnummer
+        """
+        return self._versions.get(name, 0)
+
+    def bump(self, name):
+        """
+        Erhöht die Version einer Nachschlagetabelle, z.B. nach dem Einfügen eines Datensatzes.
+        Unbekannte Tabellennamen werden ignoriert.
+
+        Args:
+            name: Name der Tabelle
+        """
+        with self._lock:
+            if name in self._versions:
+                self._versions[name] += 1
@@ -0,0 +1,211 @@
+import threading
+import time
+from sqlalchemy import text, inspect
+
+
+class SchemaCatalog:
+    """
+    Zwischenspeicher für Schema-Metadaten (Tabellen, Spalten, Typen, Primärschlüssel, Indizes).
+    Die Metadaten werden in einem Durchgang geladen und bis zum Ablauf der TTL
+    oder bis zur expliziten Invalidierung aus dem Speicher bedient.
+    """
+
+    # Ein Katalog je Engine, damit alle Sitzungen denselben Cache nutzen
+    _catalogs = {}
+    _catalogs_lock = threading.Lock()
+
+    def __init__(self, engine, ttl=300):
+        """
+        Initialisiert den Katalog.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            ttl: Gültigkeitsdauer der Metadaten in Sekunden (optional, Standard: 300)
+        """
+        self.engine = engine
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._tables = []
+        self._columns = {}
+        self._primary_keys = {}
+        self._indexed_columns = {}
+
+    @classmethod
+    def for_engine(cls, engine, ttl=300):
+        """
+        Gibt den gemeinsamen Katalog für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            ttl: Gültigkeitsdauer der Metadaten in Sekunden (optional, Standard: 300)
+
+        Returns:
+            SchemaCatalog: Gemeinsamer Katalog
+        """
+        with cls._catalogs_lock:
+            catalog = cls._catalogs.get(engine)
+            if catalog is None:
+                catalog = cls(engine, ttl)
+                cls._catalogs[engine] = catalog
+            return catalog
+
+    def invalidate(self):
+        """
+        Verwirft die zwischengespeicherten Metadaten, z.B. nach einem ALTER TABLE.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+
+            if self.engine.dialect.name == "mysql":
+                tables, columns, primary_keys, indexed_columns = self._load_from_information_schema()
+            else:
+                tables, columns, primary_keys, indexed_columns = self._load_from_inspector()
+
+            self._tables = tables
+            self._columns = columns
+            self._primary_keys = primary_keys
+            self._indexed_columns = indexed_columns
+            self._loaded_at = time.monotonic()
+
+    def _load_from_information_schema(self):
+        # Alle Metadaten des aktuellen Schemas mit vier Abfragen über eine Verbindung laden
+        with self.engine.connect() as conn:
+            table_rows = conn.execute(text("""
+            SELECT TABLE_NAME
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+            ORDER BY TABLE_NAME
+            """)).fetchall()
+
+            column_rows = conn.execute(text("""
+            SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, EXTRA
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """)).fetchall()
+
+            pk_rows = conn.execute(text("""
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_NAME = 'PRIMARY'
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+            """)).fetchall()
+
+            # Nur führende Spalten von B-Tree-Indizes sind für Gleichheits- und Präfixsuchen nutzbar
+            index_rows = conn.execute(text("""
+            SELECT DISTINCT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND SEQ_IN_INDEX = 1 AND INDEX_TYPE = 'BTREE'
+            """)).fetchall()
+
+        tables = [row[0] for row in table_rows]
+
+        columns = {}
+        for table_name, column_name, column_type, extra in column_rows:
+            columns.setdefault(table_name, []).append({
+                "name": column_name,
+                "type": column_type.upper(),
+                "autoincrement": "auto_increment" in (extra or "").lower(),
+            })
+
+        primary_keys = {}
+        for table_name, column_name in pk_rows:
+            primary_keys.setdefault(table_name, []).append(column_name)
+
+        indexed_columns = {}
+        for table_name, column_name in index_rows:
+            indexed_columns.setdefault(table_name, set()).add(column_name)
+
+        return tables, columns, primary_keys, indexed_columns
+
+    def _load_from_inspector(self):
+        # Fallback für Backends ohne information_schema (z.B. SQLite)
+        inspector = inspect(self.engine)
+        tables = inspector.get_table_names()
+
+        columns = {}
+        primary_keys = {}
+        indexed_columns = {}
+        for table_name in tables:
+            pk = inspector.get_pk_constraint(table_name)
+            pk_columns = pk.get("constrained_columns") or []
+            primary_keys[table_name] = pk_columns
+
+            leading_columns = set(pk_columns[:1])
+            for index in inspector.get_indexes(table_name):
+                if index.get("column_names") and index["column_names"][0]:
+                    leading_columns.add(index["column_names"][0])
+            indexed_columns[table_name] = leading_columns
+
+            columns[table_name] = []
+            for col in inspector.get_columns(table_name):
+                type_str = str(col["type"])
+                # Einspaltige Integer-Primärschlüssel werden automatisch hochgezählt
+                autoincrement = col.get("autoincrement") is True or (
+                    pk_columns == [col["name"]] and "INT" in type_str.upper()
+                )
+                columns[table_name].append({
+                    "name": col["name"],
+                    "type": type_str,
+                    "autoincrement": autoincrement,
+                })
+
+        return tables, columns, primary_keys, indexed_columns
+
+    def get_table_names(self):
+        """
+        Gibt die Namen aller Tabellen zurück.
+
+        Returns:
+            list: Liste der Tabellennamen
+        """
+        self._ensure_loaded()
+        return list(self._tables)
+
+    def get_columns(self, table):
+        """
+        Gibt die Spaltenbeschreibungen einer Tabelle zurück.
+
+        Args:
+            table: Name der Tabelle
+
+        Returns:
+            list: Liste von Dictionaries mit name, type und autoincrement
+        """
+        self._ensure_loaded()
+        return list(self._columns.get(table, []))
+
+    def get_primary_key_columns(self, table):
+        """
+        Gibt die Primärschlüsselspalten einer Tabelle zurück.
+
+        Args:
+            table: Name der Tabelle
+
+        Returns:
+            list: Liste der Primärschlüsselspalten
+        """
+        self._ensure_loaded()
+        return list(self._primary_keys.get(table, []))
+
+    def get_indexed_columns(self, table):
+        """
+        Gibt die Spalten zurück, die an erster Stelle eines Index stehen.
+
+        Args:
+            table: Name der Tabelle
+
+        Returns:
+            set: Menge der indizierten Spalten
+        """
+        self._ensure_loaded()
+        return set(self._indexed_columns.get(table, set()))
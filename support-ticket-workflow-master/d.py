@@ -1,14 +1,18 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from sqlalchemy import create_engine, text, inspect
 from datetime import datetime, timedelta
 ##import traceback
 import altair as alt
 import hashlib
+import hmac
+import base64
 import secrets
 import time
 import string
 import random
+import threading
 
 # DB-Konfiguration
 DB_USER = "root"
@@ -17,6 +21,16 @@ DB_HOST = "127.0.0.1"
 DB_PORT = "3306"
 DB_NAME = "ticketsystemabkoo"
 
+# Ticket-Historie: Einträge je Seite und monatliche Partitionierung (nur MySQL).
+# Die Umstellung auf Partitionen baut die Tabelle einmalig um und ist daher standardmäßig aus;
+# eine bereits partitionierte Tabelle erhält unabhängig davon neue Monatspartitionen.
+HISTORY_PAGE_SIZE = 50
+HISTORY_PARTITIONING = False
+HISTORY_PARTITION_MONTHS_AHEAD = 3
+
+# Tickets je Seite in der Ticketauswahl
+TICKET_PICKER_PAGE_SIZE = 50
+
 # SQLAlchemy Engine
 engine = create_engine(f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}")
 
@@ -29,7 +43,43 @@ def get_columns(table):
     except:
         return []
 
-#Hilfsfunktion Historie
+#Hilfsfunktion Historie: mehrere Änderungen in einer bestehenden Transaktion schreiben
+def write_ticket_history(conn, ticket_id, changes, mitarbeiter_id):
+    """
+    Schreibt alle Änderungen (Feldname, alter Wert, neuer Wert) eines Tickets mit einem
+    mehrzeiligen INSERT. Wird mit der Verbindung des Ticket-UPDATEs aufgerufen, damit
+    Ticket und Historie gemeinsam gespeichert oder verworfen werden.
+
+    Returns:
+        int: Anzahl der geschriebenen Einträge
+    """
+    params = {"ticket_id": ticket_id, "geaendert_von": mitarbeiter_id}
+    values = []
+
+    for feldname, alter_wert, neuer_wert in changes:
+        # Typkonvertierung für den Vergleich
+        alter_wert_str = str(alter_wert) if alter_wert is not None else ""
+        neuer_wert_str = str(neuer_wert) if neuer_wert is not None else ""
+
+        # Nur Änderungen speichern
+        if alter_wert_str.strip() == neuer_wert_str.strip():
+            continue
+
+        i = len(values)
+        params[f"feldname_{i}"] = feldname
+        params[f"alter_wert_{i}"] = alter_wert_str
+        params[f"neuer_wert_{i}"] = neuer_wert_str
+        values.append(f"(:ticket_id, :feldname_{i}, :alter_wert_{i}, :neuer_wert_{i}, :geaendert_von, NOW())")
+
+    if values:
+        conn.execute(text(f"""
+            INSERT INTO ticket_historie (ID_Ticket, Feldname, Alter_Wert, Neuer_Wert, Geändert_von, Geändert_am)
+            VALUES {", ".join(values)}
+        """), params)
+
+    return len(values)
+
+#Hilfsfunktion Historie: einzelne Änderung in einer eigenen Transaktion schreiben
 def log_ticket_change(ticket_id, feldname, alter_wert, neuer_wert, mitarbeiter_id):
     # Typkonvertierung für den Vergleich
     alter_wert_str = str(alter_wert) if alter_wert is not None else ""
@@ -45,19 +95,8 @@ def log_ticket_change(ticket_id, feldname, alter_wert, neuer_wert, mitarbeiter_i
 
     while retry_count < max_retries:
         try:
-            insert_query = text("""
-                INSERT INTO ticket_historie (ID_Ticket, Feldname, Alter_Wert, Neuer_Wert, Geändert_von, Geändert_am)
-                VALUES (:ticket_id, :feldname, :alter_wert, :neuer_wert, :geändert_von, NOW())
-            """)
-
             with engine.begin() as conn:
-                conn.execute(insert_query, {
-                    "ticket_id": ticket_id,
-                    "feldname": feldname,
-                    "alter_wert": alter_wert_str,
-                    "neuer_wert": neuer_wert_str,
-                    "geändert_von": mitarbeiter_id
-                })
+                write_ticket_history(conn, ticket_id, [(feldname, alter_wert_str, neuer_wert_str)], mitarbeiter_id)
 
             # Wenn erfolgreich, Schleife beenden
             return True
@@ -74,7 +113,429 @@ def log_ticket_change(ticket_id, feldname, alter_wert, neuer_wert, mitarbeiter_i
                 raise
 
 
+# Hilfsfunktion: Geänderte Zellen zweier DataFrames spaltenweise ermitteln
+def build_change_sets(original_df, edited_df, id_spalte):
+    """
+    Vergleicht Original und bearbeitete Daten spaltenweise mit NumPy-Masken und gruppiert
+    die geänderten Zeilen nach der Menge ihrer geänderten Spalten.
+
+    Returns:
+        list: (Spalten, Liste von (Primärschlüssel, Werte)) je Gruppe
+    """
+    edited_df = edited_df.reindex(original_df.index)
+    spalten = [col for col in original_df.columns if col in edited_df.columns]
+    if original_df.empty or not spalten:
+        return []
+
+    # Eine Spalte der Maske je Tabellenspalte; NaN/None auf beiden Seiten gilt als unverändert
+    masks = []
+    for col in spalten:
+        alt = original_df[col].to_numpy(dtype=object)
+        neu = edited_df[col].to_numpy(dtype=object)
+        alt_na = pd.isna(alt)
+        neu_na = pd.isna(neu)
+        masks.append(np.where(alt_na | neu_na, alt_na != neu_na, alt != neu).astype(bool))
+    changed = np.column_stack(masks)
+
+    changed_rows = np.flatnonzero(changed.any(axis=1))
+    if changed_rows.size == 0:
+        return []
+
+    # Zeilen mit identischem Änderungsmuster zusammenfassen
+    patterns, group_ids = np.unique(changed[changed_rows], axis=0, return_inverse=True)
+    group_ids = group_ids.reshape(-1)
+    keys = original_df[id_spalte].to_numpy(dtype=object)
+
+    change_sets = []
+    for group, pattern in enumerate(patterns):
+        rows = changed_rows[group_ids == group]
+        cols = [col for col, is_changed in zip(spalten, pattern) if is_changed]
+        values = edited_df.iloc[rows][cols]
+        values = values.astype(object).where(values.notna(), None).to_dict("records")
+        # Der ursprüngliche Primärschlüssel identifiziert die Zeile, auch wenn er selbst geändert wurde
+        change_sets.append((cols, list(zip(keys[rows].tolist(), values))))
+    return change_sets
+
+# Hilfsfunktion: Änderungen gruppenweise mit CASE-Updates schreiben
+def apply_change_sets(conn, table, id_spalte, change_sets, chunk_size=500):
+    """
+    Schreibt die Gruppen aus build_change_sets mit je einem UPDATE ... CASE pro Block,
+    sodass auch tausende geänderte Zellen nur wenige Roundtrips benötigen.
+
+    Returns:
+        tuple: (Anzahl geänderter Zeilen, Anzahl ausgeführter Anweisungen)
+    """
+    updated_rows = 0
+    statements = 0
+
+    for cols, rows in change_sets:
+        # Blockgröße so wählen, dass die Anzahl der Parameter begrenzt bleibt
+        block = max(1, min(chunk_size, 60000 // (len(cols) + 1)))
+        for start in range(0, len(rows), block):
+            chunk = rows[start:start + block]
+            params = {}
+            for i, (key, _) in enumerate(chunk):
+                params[f"k{i}"] = key
+
+            # MySQL wertet die Zuweisungen von links nach rechts aus und spätere CASE-Ausdrücke
+            # sehen bereits geänderte Werte: der Primärschlüssel wird daher zuletzt gesetzt,
+            # und ELSE behält den Wert, falls doch kein WHEN zutrifft
+            set_clauses = []
+            for c, col in sorted(enumerate(cols), key=lambda item: item[1] == id_spalte):
+                whens = []
+                for i, (_, values) in enumerate(chunk):
+                    params[f"v{i}_{c}"] = values[col]
+                    whens.append(f"WHEN :k{i} THEN :v{i}_{c}")
+                set_clauses.append(f"{col} = CASE {id_spalte} {' '.join(whens)} ELSE {col} END")
+
+            key_list = ", ".join(f":k{i}" for i in range(len(chunk)))
+            conn.execute(text(
+                f"UPDATE {table} SET {', '.join(set_clauses)} WHERE {id_spalte} IN ({key_list})"
+            ), params)
+            updated_rows += len(chunk)
+            statements += 1
+
+    return updated_rows, statements
+
+
+# Hilfsfunktion: Ansicht wählen, ohne wie st.tabs alle Ansichten auszuführen
+def select_view(labels, key):
+    # segmented_control gibt es erst ab Streamlit 1.40, sonst horizontale Radiobuttons
+    if hasattr(st, "segmented_control"):
+        selected = st.segmented_control("Ansicht", labels, default=labels[0], key=key, label_visibility="collapsed")
+    else:
+        selected = st.radio("Ansicht", labels, key=key, horizontal=True, label_visibility="collapsed")
+    # Abwählen der aktiven Ansicht ist beim segmented_control möglich
+    return selected if selected in labels else labels[0]
+
+# Hilfsfunktion: Versionen der Ansichtsdaten, gemeinsam für alle Sitzungen des Prozesses
+@st.cache_resource(show_spinner=False)
+def view_data_versions():
+    return {"lock": threading.Lock(), "versions": {}}
+
+# Hilfsfunktion: Daten einer Ansicht in der Sitzung zwischenspeichern; eine Änderung in einer
+# beliebigen Sitzung erhöht die gemeinsame Version und lässt alle Sitzungen neu laden
+def cached_view_data(name, loader, ttl=60):
+    version = view_data_versions()["versions"].get(name, 0)
+    cache = st.session_state.setdefault("view_cache", {})
+    entry = cache.get(name)
+    if entry is not None and entry[1] == version and time.monotonic() - entry[0] < ttl:
+        return entry[2]
+    value = loader()
+    cache[name] = (time.monotonic(), version, value)
+    return value
+
+# Hilfsfunktion: Zwischengespeicherte Daten einer Ansicht in allen Sitzungen verwerfen
+def invalidate_view_data(name):
+    shared = view_data_versions()
+    with shared["lock"]:
+        shared["versions"][name] = shared["versions"].get(name, 0) + 1
+
+# Hilfsfunktion: Ansichten verwerfen, die auf einer geänderten Tabelle beruhen
+def invalidate_table_views(table):
+    invalidate_view_data(f"settings_{table}")
+    if table in ("ticket", "status", "mitarbeiter"):
+        invalidate_view_data("statistiken")
+
+
+# Hilfsfunktion: Monatsgrenzen für die Partitionen der Historie
+def history_partition_bounds(first_month, months_ahead):
+    """
+    Ermittelt je Monat ab first_month bis einschließlich months_ahead Monate nach dem
+    aktuellen Monat den Partitionsnamen (pJJJJMM) und die exklusive Obergrenze.
+
+    Returns:
+        list: (Partitionsname, Obergrenze als 'JJJJ-MM-TT')
+    """
+    start = pd.Timestamp(first_month).to_period("M")
+    end = max(start, pd.Timestamp.now().to_period("M") + months_ahead)
+    return [
+        (f"p{month.strftime('%Y%m')}", (month + 1).start_time.strftime("%Y-%m-%d"))
+        for month in pd.period_range(start, end, freq="M")
+    ]
+
+# Hilfsfunktion: Partitionsdefinitionen für ALTER TABLE erzeugen
+def history_partition_clauses(bounds, column_type):
+    # TIMESTAMP-Spalten lassen sich nur über UNIX_TIMESTAMP nach Bereichen partitionieren
+    if column_type.lower() == "timestamp":
+        clauses = [f"PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{bound}'))" for name, bound in bounds]
+    else:
+        clauses = [f"PARTITION {name} VALUES LESS THAN ('{bound}')" for name, bound in bounds]
+    clauses.append("PARTITION p_max VALUES LESS THAN (MAXVALUE)")
+    return ", ".join(clauses)
+
+# Hilfsfunktion: ticket_historie monatlich partitionieren bzw. neue Monatspartitionen anlegen (nur MySQL)
+def partition_ticket_history(months_ahead=HISTORY_PARTITION_MONTHS_AHEAD):
+    """
+    Ist die Tabelle bereits partitioniert, werden aus der Auffangpartition p_max die Partitionen
+    der kommenden Monate abgespalten. Andernfalls wird sie, sofern HISTORY_PARTITIONING gesetzt ist,
+    nach RANGE über Geändert_am umgebaut. MySQL verlangt dafür Geändert_am im Primärschlüssel und
+    erlaubt keine Fremdschlüssel auf partitionierten Tabellen.
+
+    Returns:
+        bool: True, wenn die Tabelle partitioniert ist
+    """
+    with engine.begin() as conn:
+        partitions = [row[0] for row in conn.execute(text("""
+            SELECT PARTITION_NAME FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ticket_historie' AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """)).fetchall()]
+        column_type = conn.execute(text("""
+            SELECT DATA_TYPE FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ticket_historie' AND COLUMN_NAME = 'Geändert_am'
+        """)).scalar() or "datetime"
+
+        if partitions:
+            monthly = [name for name in partitions if name != "p_max"]
+            if "p_max" not in partitions or not monthly:
+                return True
+            new_bounds = [
+                (name, bound) for name, bound in history_partition_bounds(pd.Timestamp.now(), months_ahead)
+                if name > max(monthly)
+            ]
+            if new_bounds:
+                conn.execute(text(
+                    f"ALTER TABLE ticket_historie REORGANIZE PARTITION p_max INTO "
+                    f"({history_partition_clauses(new_bounds, column_type)})"
+                ))
+            return True
+
+        if not HISTORY_PARTITIONING:
+            return False
+
+        if inspect(conn).get_foreign_keys("ticket_historie"):
+            print("Hinweis: ticket_historie hat Fremdschlüssel und wird daher nicht partitioniert.")
+            return False
+        if conn.execute(text("SELECT COUNT(*) FROM ticket_historie WHERE Geändert_am IS NULL")).scalar():
+            print("Hinweis: ticket_historie enthält Einträge ohne Geändert_am und wird daher nicht partitioniert.")
+            return False
+
+        first_month = conn.execute(text("SELECT MIN(Geändert_am) FROM ticket_historie")).scalar() or pd.Timestamp.now()
+        partition_by = "RANGE (UNIX_TIMESTAMP(Geändert_am))" if column_type.lower() == "timestamp" else "RANGE COLUMNS (Geändert_am)"
+
+        # Partitionsspalte muss Teil jedes eindeutigen Schlüssels sein
+        conn.execute(text(f"""
+            ALTER TABLE ticket_historie
+            MODIFY Geändert_am {column_type.upper()} NOT NULL,
+            DROP PRIMARY KEY,
+            ADD PRIMARY KEY (ID_Historie, Geändert_am)
+        """))
+        conn.execute(text(
+            f"ALTER TABLE ticket_historie PARTITION BY {partition_by} "
+            f"({history_partition_clauses(history_partition_bounds(first_month, months_ahead), column_type)})"
+        ))
+        return True
+
+# Hilfsfunktion: Index und Partitionen der Historie einmal je Prozess (und danach täglich) sicherstellen
+@st.cache_resource(ttl=86400, show_spinner=False)
+def ensure_history_schema():
+    try:
+        schema = inspect(engine)
+        if "ticket_historie" not in schema.get_table_names():
+            return False
+
+        # Index für die Anzeige je Ticket, absteigend nach Datum
+        if "idx_historie_ticket_datum" not in {index["name"] for index in schema.get_indexes("ticket_historie")}:
+            with engine.begin() as conn:
+                conn.execute(text("CREATE INDEX idx_historie_ticket_datum ON ticket_historie (ID_Ticket, Geändert_am)"))
+
+        if engine.dialect.name == "mysql":
+            partition_ticket_history()
+        return True
+    except Exception as e:
+        print(f"Fehler beim Einrichten der Ticket-Historie: {str(e)}")
+        return False
+
+# Hilfsfunktion: Filterbedingungen der Historie als SQL
+def history_filter(ticket_id, feldname=None, datum_von=None, datum_bis=None):
+    conditions = ["th.ID_Ticket = :ticket_id"]
+    params = {"ticket_id": ticket_id}
+
+    if feldname:
+        # Teilstring ohne Beachtung der Groß-/Kleinschreibung, Platzhalterzeichen maskiert
+        muster = feldname.lower().replace("!", "!!").replace("%", "!%").replace("_", "!_")
+        conditions.append("LOWER(th.Feldname) LIKE :feldname ESCAPE '!'")
+        params["feldname"] = f"%{muster}%"
+
+    # Datumsgrenzen als Bereich auf der Spalte, damit Index und Partitionen genutzt werden
+    if datum_von:
+        conditions.append("th.Geändert_am >= :datum_von")
+        params["datum_von"] = pd.Timestamp(datum_von).to_pydatetime()
+    if datum_bis:
+        conditions.append("th.Geändert_am < :datum_bis")
+        params["datum_bis"] = (pd.Timestamp(datum_bis) + pd.Timedelta(days=1)).to_pydatetime()
+
+    return conditions, params
+
+# Hilfsfunktion: Eine Seite der Historie laden (neueste zuerst)
+def load_ticket_history(ticket_id, feldname=None, datum_von=None, datum_bis=None, cursor=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Lädt bis zu limit Historieneinträge eines Tickets. Geblättert wird über den Cursor
+    (Geändert_am, ID_Historie) des letzten Eintrags der vorherigen Seite statt über OFFSET.
+
+    Returns:
+        tuple: (DataFrame der Seite, Cursor für die nächste Seite oder None)
+    """
+    conditions, params = history_filter(ticket_id, feldname, datum_von, datum_bis)
+    if cursor is not None:
+        conditions.append(
+            "(th.Geändert_am < :cursor_datum OR (th.Geändert_am = :cursor_datum AND th.ID_Historie < :cursor_id))"
+        )
+        params["cursor_datum"], params["cursor_id"] = cursor
+    params["limit"] = limit + 1
+
+    query = text(f"""
+        SELECT th.ID_Historie, th.Feldname, th.Alter_Wert, th.Neuer_Wert,
+               th.Geändert_am, m.Name as Mitarbeiter_Name
+        FROM ticket_historie th
+        LEFT JOIN mitarbeiter m ON th.Geändert_von = m.ID_Mitarbeiter
+        WHERE {' AND '.join(conditions)}
+        ORDER BY th.Geändert_am DESC, th.ID_Historie DESC
+        LIMIT :limit
+    """)
+    with engine.connect() as conn:
+        result = conn.execute(query, params)
+        history_df = pd.DataFrame(result.fetchall(), columns=result.keys())
+
+    next_cursor = None
+    if len(history_df) > limit:
+        history_df = history_df.iloc[:limit]
+        last = history_df.iloc[-1]
+        next_cursor = (pd.Timestamp(last["Geändert_am"]).to_pydatetime(), int(last["ID_Historie"]))
+    return history_df, next_cursor
+
+# Hilfsfunktion: Anzahl der Historieneinträge für die gesetzten Filter
+def count_ticket_history(ticket_id, feldname=None, datum_von=None, datum_bis=None):
+    conditions, params = history_filter(ticket_id, feldname, datum_von, datum_bis)
+    with engine.connect() as conn:
+        return conn.execute(text(
+            f"SELECT COUNT(*) FROM ticket_historie th WHERE {' AND '.join(conditions)}"
+        ), params).scalar() or 0
+
+# Hilfsfunktion: Historie seitenweise mit Blättern-Schaltflächen anzeigen
+def paged_ticket_history(key, ticket_id, feldname=None, datum_von=None, datum_bis=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Lädt die aktuelle Seite der Historie und zeigt die Schaltflächen zum Blättern.
+    Die Cursor der bisherigen Seiten liegen in st.session_state, sodass auch zurückgeblättert
+    werden kann; bei anderem Ticket oder anderen Filtern beginnt die Anzeige wieder vorne.
 
+    Returns:
+        DataFrame: Einträge der aktuellen Seite
+    """
+    state = st.session_state.setdefault(key, {})
+    filters = (ticket_id, feldname or "", datum_von, datum_bis)
+    if state.get("filters") != filters:
+        state.clear()
+        state.update(filters=filters, cursors=[None])
+    cursors = state["cursors"]
+
+    history_df, next_cursor = load_ticket_history(ticket_id, feldname, datum_von, datum_bis, cursors[-1], page_size)
+
+    if len(cursors) > 1 or next_cursor is not None:
+        total = count_ticket_history(ticket_id, feldname, datum_von, datum_bis)
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("◀ Neuere", key=f"{key}_newer", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with col2:
+            st.caption(f"Seite {len(cursors)} von {max(1, -(-total // page_size))} ({total} Einträge)")
+        with col3:
+            if st.button("Ältere ▶", key=f"{key}_older", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+
+    return history_df
+
+# Hilfsfunktion: Beschriftungen für Ticket-Auswahlfelder einmal pro DataFrame aufbauen
+def build_ticket_labels(tickets_df, detail_column=None):
+    """
+    Erzeugt ein Dictionary ID_Ticket -> "#ID - Titel" (optional mit Detail in Klammern),
+    damit format_func je Option nur nachschlägt statt den DataFrame zu durchsuchen.
+
+    Returns:
+        dict: Beschriftung je Ticket-ID in der Reihenfolge des DataFrames
+    """
+    labels = "#" + tickets_df["ID_Ticket"].astype(str) + " - " + tickets_df["Titel"].fillna("").astype(str)
+    if detail_column:
+        labels = labels + " (" + tickets_df[detail_column].fillna("-").astype(str) + ")"
+    return dict(zip(tickets_df["ID_Ticket"].tolist(), labels.tolist()))
+
+# Hilfsfunktion: Durchsuchbare, seitenweise Ticketauswahl für große Datenbestände
+def ticket_picker(key, label="Ticket auswählen:", page_size=TICKET_PICKER_PAGE_SIZE):
+    """
+    Zeigt ein Suchfeld (ID oder Titel) und ein Auswahlfeld mit einer Seite passender Tickets,
+    die neuesten zuerst. Geblättert wird per Keyset auf ID_Ticket, die Cursor der bisherigen
+    Seiten liegen in st.session_state.
+
+    Returns:
+        int: ID des ausgewählten Tickets oder None
+    """
+    state = st.session_state.setdefault(key, {"term": "", "cursors": [None]})
+
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        term = st.text_input("Ticket suchen (ID oder Titel):", "", key=f"{key}_term").strip()
+    if term != state["term"]:
+        state.update(term=term, cursors=[None])
+    cursors = state["cursors"]
+
+    conditions = []
+    params = {"limit": page_size + 1}
+    if term:
+        # Reine Zahlen suchen wie bisher die Ticket-ID, alles andere im Titel
+        if term.isdigit():
+            conditions.append("t.ID_Ticket = :ticket_id")
+            params["ticket_id"] = int(term)
+        else:
+            conditions.append("t.Titel LIKE :term")
+            params["term"] = f"%{term}%"
+    if cursors[-1] is not None:
+        conditions.append("t.ID_Ticket < :cursor")
+        params["cursor"] = cursors[-1]
+
+    try:
+        query = text(f"""
+            SELECT t.ID_Ticket, t.Titel, s.Name as Status
+            FROM ticket t
+            LEFT JOIN status s ON t.ID_Status = s.ID_Status
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY t.ID_Ticket DESC
+            LIMIT :limit
+        """)
+        with engine.connect() as conn:
+            result = conn.execute(query, params)
+            tickets_df = pd.DataFrame(result.fetchall(), columns=result.keys())
+    except Exception as e:
+        st.error(f"Fehler beim Laden der Tickets: {str(e)}")
+        return None
+
+    # Eine Zeile mehr geladen, um zu erkennen, ob es eine weitere Seite gibt
+    has_more = len(tickets_df) > page_size
+    tickets_df = tickets_df.head(page_size)
+
+    with col1:
+        if tickets_df.empty:
+            st.info("Keine Tickets gefunden.")
+            return None
+        labels = build_ticket_labels(tickets_df, "Status")
+        selected_ticket_id = st.selectbox(label, options=list(labels), format_func=labels.get, key=f"{key}_select")
+
+    if len(cursors) > 1 or has_more:
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+        with nav_col1:
+            if st.button("◀ Neuere", key=f"{key}_newer", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with nav_col2:
+            st.caption(f"Seite {len(cursors)}")
+        with nav_col3:
+            if st.button("Ältere ▶", key=f"{key}_older", disabled=not has_more):
+                cursors.append(int(tickets_df["ID_Ticket"].iloc[-1]))
+                st.rerun()
+
+    return selected_ticket_id
 
 # Hilfsfunktion: Primärschlüssel einer Tabelle ermitteln
 def get_primary_key(table):
@@ -228,9 +689,23 @@ def hash_password(password, salt):
     return password_hash
 
 def verify_password(password, stored_hash, salt):
-    """Überprüft, ob das eingegebene Passwort korrekt ist."""
-    calculated_hash = hash_password(password, salt)
-    return calculated_hash == stored_hash
+    """
+    Überprüft, ob das eingegebene Passwort korrekt ist. Neben SHA-256 werden auch die
+    Formate pbkdf2_sha256$… und scrypt$… gelesen, die die Hauptanwendung (password_hashing.py)
+    bei der Anmeldung in dieselbe Tabelle mitarbeiter schreibt.
+    """
+    stored_hash = stored_hash or ""
+    if stored_hash.startswith("pbkdf2_sha256$"):
+        _, iterations, stored_salt, encoded = stored_hash.split("$", 3)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), stored_salt.encode(), int(iterations))
+    elif stored_hash.startswith("scrypt$"):
+        _, n, r, p, stored_salt, encoded = stored_hash.split("$", 5)
+        n, r, p = int(n), int(r), int(p)
+        digest = hashlib.scrypt(password.encode(), salt=stored_salt.encode(), n=n, r=r, p=p,
+                                maxmem=256 * n * r * p + 2 ** 20, dklen=32)
+    else:
+        return hmac.compare_digest(hash_password(password, salt), stored_hash)
+    return hmac.compare_digest(digest, base64.b64decode(encoded + "=" * (-len(encoded) % 4)))
 
 # Funktion zur Generierung eines temporären Passworts
 def generate_temp_password(length=12):
@@ -272,7 +747,8 @@ def authenticate_user(username_or_email, password):
 
         # Falls kein Salt vorhanden ist (Altdaten), Passwort direkt vergleichen
         # und bei Erfolg ein Salt generieren und das Passwort hashen
-        if not salt:
+        # (versionierte Hashes der Hauptanwendung enthalten ihren Salt selbst)
+        if not salt and "$" not in (stored_hash or ""):
             if password == stored_hash:
                 # Passwort ist korrekt, aber ungehasht - jetzt hashen und speichern
                 new_salt = generate_salt()
@@ -558,6 +1034,7 @@ def main():
 
     # Sicherstellen, dass die erforderlichen Spalten existieren
     ensure_required_columns_exist()
+    ensure_history_schema()
 
     # Session-State initialisieren
     if "logged_in" not in st.session_state:
@@ -629,28 +1106,15 @@ def show_main_application():
 def show_ticket_system():
     st.title("🎫 Ticketsystem")
 
-    # Tabs für verschiedene Funktionen
-    ticket_tabs = st.tabs(["📋 Ticketübersicht", "✏️ Ticket bearbeiten", "➕ Neues Ticket", "📊 Statistiken", "⚙️ Einstellungen"])
-
-    # Tab: Ticketübersicht
-    with ticket_tabs[0]:
-        show_ticket_overview()
-
-    # Tab: Ticket bearbeiten (NEU)
-    with ticket_tabs[1]:
-        show_ticket_edit_tab()
-
-    # Tab: Neues Ticket
-    with ticket_tabs[2]:
-        show_new_ticket_form()
-
-    # Tab: Statistiken
-    with ticket_tabs[3]:
-        show_ticket_statistics()
-
-    # Tab: Einstellungen
-    with ticket_tabs[4]:
-        show_settings()
+    # Ansichten: nur die gewählte Ansicht wird ausgeführt und lädt Daten
+    views = {
+        "📋 Ticketübersicht": show_ticket_overview,
+        "✏️ Ticket bearbeiten": show_ticket_edit_tab,
+        "➕ Neues Ticket": show_new_ticket_form,
+        "📊 Statistiken": show_ticket_statistics,
+        "⚙️ Einstellungen": show_settings,
+    }
+    views[select_view(list(views), "ticket_view")]()
 
 # Ticketübersicht anzeigen
 def show_ticket_overview():
@@ -769,11 +1233,12 @@ def show_ticket_overview():
         if "selected_ticket_id" not in st.session_state:
             st.session_state.selected_ticket_id = None
 
-        # Ticket auswählen
+        # Ticket auswählen (Beschriftungen einmal aufbauen statt je Option zu filtern)
+        ticket_labels = build_ticket_labels(tickets_df)
         selected_ticket = st.selectbox(
             "Ticket auswählen",
-            tickets_df["ID_Ticket"].tolist(),
-            format_func=lambda x: f"#{x} - {tickets_df[tickets_df['ID_Ticket'] == x]['Titel'].iloc[0]}"
+            list(ticket_labels),
+            format_func=ticket_labels.get
         )
 
         if selected_ticket:
@@ -889,72 +1354,29 @@ def show_ticket_details(ticket_id):
         st.subheader("🕘 Änderungshistorie")
 
         try:
-            historie_query = """
-            SELECT th.Feldname, th.Alter_Wert, th.Neuer_Wert, m.Name AS Geändert_von, th.Geändert_am
-            FROM ticket_historie th
-            LEFT JOIN mitarbeiter m ON th.Geändert_von = m.ID_Mitarbeiter
-            WHERE th.ID_Ticket = :ticket_id
-            ORDER BY th.Geändert_am DESC
-            """
-            with engine.connect() as conn:
-                result = conn.execute(text(historie_query), {"ticket_id": ticket_id})
-                history_entries = result.fetchall()
+            history_df = paged_ticket_history(f"details_history_{ticket_id}", ticket_id)
         except Exception as e:
             st.error(f"Fehler beim Abrufen der Historie: {str(e)}")
-            history_entries = []
+            history_df = pd.DataFrame()
 
-        if not history_entries:
+        if history_df.empty:
             st.info("Keine Änderungen protokolliert.")
         else:
-            for eintrag in history_entries:
+            for eintrag in history_df.itertuples(index=False):
                 st.markdown(f"""
                 🔹 **{eintrag.Feldname}** geändert von **{eintrag.Alter_Wert}** zu **{eintrag.Neuer_Wert}**  
-                🧑‍💼 Durch: *{eintrag.Geändert_von}* am *{eintrag.Geändert_am}*
+                🧑‍💼 Durch: *{eintrag.Mitarbeiter_Name}* am *{eintrag.Geändert_am}*
                 """)
 
 # Ticket-Bearbeitungstab anzeigen (NEU)
 def show_ticket_edit_tab():
     st.subheader("✏️ Ticket bearbeiten")
 
-    # Alle Tickets laden für die Auswahl
-    try:
-        query = text("""
-            SELECT t.ID_Ticket, t.Titel, s.Name as Status
-            FROM ticket t
-            LEFT JOIN status s ON t.ID_Status = s.ID_Status
-            ORDER BY t.ID_Ticket DESC
-        """)
-        with engine.connect() as conn:
-            result = conn.execute(query)
-            tickets_df = pd.DataFrame(result.fetchall(), columns=result.keys())
-    except Exception as e:
-        st.error(f"Fehler beim Laden der Tickets: {str(e)}")
-        return
-
-    if tickets_df.empty:
-        st.info("Keine Tickets gefunden.")
+    # Ticket-Auswahl: Suche und seitenweise Liste statt aller Tickets in einem Auswahlfeld
+    selected_ticket_id = ticket_picker("edit_ticket_picker")
+    if selected_ticket_id is None:
         return
 
-    # Ticket-Auswahl
-    col1, col2 = st.columns([3, 1])
-
-    with col1:
-        ticket_options = [f"#{row['ID_Ticket']} - {row['Titel']} ({row['Status']})" for _, row in tickets_df.iterrows()]
-        selected_ticket_option = st.selectbox("Ticket auswählen:", options=ticket_options)
-
-        # Ticket-ID aus der Auswahl extrahieren
-        selected_ticket_id = int(selected_ticket_option.split("#")[1].split(" - ")[0])
-
-    with col2:
-        search_term = st.text_input("Ticket-ID suchen:", "")
-        if search_term and search_term.isdigit():
-            search_id = int(search_term)
-            if search_id in tickets_df["ID_Ticket"].values:
-                selected_ticket_id = search_id
-                st.success(f"Ticket #{search_id} gefunden!")
-            else:
-                st.error(f"Ticket #{search_id} nicht gefunden!")
-
     # Tabs für Bearbeitung, Historie und Kommentare
     tab1, tab2, tab3 = st.tabs(["📝 Bearbeiten", "📜 Historie", "💬 Kommentare"])
 
@@ -1141,17 +1563,17 @@ def show_ticket_edit_tab():
                             WHERE ID_Ticket = :ticket_id
                         """)
 
-                        with engine.connect() as conn:
-                            with conn.begin():
-                                conn.execute(update_query, {
-                                    "titel": titel,
-                                    "beschreibung": beschreibung,
-                                    "prioritaet": prioritaet,
-                                    "status": selected_status["ID_Status"],
-                                    "mitarbeiter": selected_mitarbeiter["ID_Mitarbeiter"],
-                                    "kunde": selected_kunde["ID_Kunde"],
-                                    "ticket_id": selected_ticket_id
-                                })
+                        # Ticket, Kategorie und Historie in einer Transaktion speichern
+                        with engine.begin() as conn:
+                            conn.execute(update_query, {
+                                "titel": titel,
+                                "beschreibung": beschreibung,
+                                "prioritaet": prioritaet,
+                                "status": selected_status["ID_Status"],
+                                "mitarbeiter": selected_mitarbeiter["ID_Mitarbeiter"],
+                                "kunde": selected_kunde["ID_Kunde"],
+                                "ticket_id": selected_ticket_id
+                            })
 
                             # Kategorie aktualisieren
                             if current_kategorie_id != selected_kategorie["ID_Kategorie"]:
@@ -1171,16 +1593,15 @@ def show_ticket_edit_tab():
                                     "kategorie_id": selected_kategorie["ID_Kategorie"]
                                 })
 
-                            # Änderungen in der Historie protokollieren
-                            for change in changes:
-                                log_ticket_change(
-                                    selected_ticket_id,
-                                    change["display"],
-                                    change["old"],
-                                    change["new"],
-                                    st.session_state.user_id
-                                )
+                            # Änderungen in der Historie protokollieren (ein INSERT für alle Felder)
+                            write_ticket_history(
+                                conn,
+                                selected_ticket_id,
+                                [(change["display"], change["old"], change["new"]) for change in changes],
+                                st.session_state.user_id
+                            )
 
+                        invalidate_view_data("statistiken")
                         st.success("Ticket erfolgreich aktualisiert!")
                         st.rerun()
                     else:
@@ -1205,19 +1626,11 @@ def show_ticket_edit_tab():
             with col3:
                 filter_date_to = st.date_input("Bis Datum:", value=None)
 
-        # Historie laden
+        # Historie seitenweise laden, Filter werden in der Abfrage angewendet
         try:
-            query = text("""
-                SELECT th.ID_Historie, th.Feldname, th.Alter_Wert, th.Neuer_Wert, 
-                       th.Geändert_am, m.Name as Mitarbeiter_Name
-                FROM ticket_historie th
-                LEFT JOIN mitarbeiter m ON th.Geändert_von = m.ID_Mitarbeiter
-                WHERE th.ID_Ticket = :ticket_id
-                ORDER BY th.Geändert_am DESC
-            """)
-            with engine.connect() as conn:
-                result = conn.execute(query, {"ticket_id": selected_ticket_id})
-                history_df = pd.DataFrame(result.fetchall(), columns=result.keys())
+            history_df = paged_ticket_history(
+                "edit_history", selected_ticket_id, filter_field.strip(), filter_date_from, filter_date_to
+            )
         except Exception as e:
             st.error(f"Fehler beim Laden der Ticket-Historie: {str(e)}")
             history_df = pd.DataFrame()
@@ -1225,20 +1638,8 @@ def show_ticket_edit_tab():
         if history_df.empty:
             st.info("Keine Historieneinträge für dieses Ticket gefunden.")
         else:
-            # Filter anwenden
-            filtered_df = history_df.copy()
-
-            if filter_field:
-                filtered_df = filtered_df[filtered_df["Feldname"].str.contains(filter_field, case=False)]
-
-            if filter_date_from:
-                filtered_df = filtered_df[filtered_df["Geändert_am"].dt.date >= filter_date_from]
-
-            if filter_date_to:
-                filtered_df = filtered_df[filtered_df["Geändert_am"].dt.date <= filter_date_to]
-
             # Formatierte Anzeige der Historie
-            for _, row in filtered_df.iterrows():
+            for _, row in history_df.iterrows():
                 with st.container():
                     col1, col2 = st.columns([1, 3])
 
@@ -1397,6 +1798,7 @@ def show_new_ticket_form():
                     # Automatische Einträge in ticket_mitarbeiter und ticket_kategorie
                     create_ticket_relations(ticket_id, ID_Mitarbeiter)
 
+                invalidate_view_data("statistiken")
                 st.success(f"Ticket #{ticket_id} erfolgreich erstellt!")
             except Exception as e:
                 st.error(f"Fehler beim Erstellen des Tickets: {str(e)}")
@@ -1414,7 +1816,6 @@ def show_ticket_statistics():
         JOIN status s ON t.ID_Status = s.ID_Status
         GROUP BY s.Name
         """
-        status_stats_df = pd.read_sql(status_query, con=engine)
 
         # Tickets nach Priorität
         prioritaet_query = """
@@ -1422,7 +1823,6 @@ def show_ticket_statistics():
         FROM ticket
         GROUP BY Priorität
         """
-        prioritaet_stats_df = pd.read_sql(prioritaet_query, con=engine)
 
         # Tickets nach Mitarbeiter
         mitarbeiter_query = """
@@ -1431,7 +1831,13 @@ def show_ticket_statistics():
         JOIN mitarbeiter m ON t.ID_Mitarbeiter = m.ID_Mitarbeiter
         GROUP BY m.Name
         """
-        mitarbeiter_stats_df = pd.read_sql(mitarbeiter_query, con=engine)
+
+        # Alle drei Abfragen gemeinsam kurz in der Sitzung zwischenspeichern
+        status_stats_df, prioritaet_stats_df, mitarbeiter_stats_df = cached_view_data(
+            "statistiken",
+            lambda: tuple(pd.read_sql(query, con=engine) for query in (status_query, prioritaet_query, mitarbeiter_query)),
+            ttl=30
+        )
 
         # Statistiken anzeigen
         if not status_stats_df.empty and not prioritaet_stats_df.empty and not mitarbeiter_stats_df.empty:
@@ -1489,15 +1895,16 @@ def show_ticket_statistics():
 def show_settings():
     st.subheader("⚙️ Einstellungen")
 
-    # Tabs für verschiedene Einstellungen
-    settings_tabs = st.tabs(["👤 Mitarbeiter", "🏢 Kunden", "🏷️ Kategorien", "📋 Status"])
+    # Unteransichten: nur die gewählte Stammdatentabelle wird geladen
+    settings_labels = ["👤 Mitarbeiter", "🏢 Kunden", "🏷️ Kategorien", "📋 Status"]
+    settings_view = select_view(settings_labels, "settings_view")
 
     # Tab: Mitarbeiter
-    with settings_tabs[0]:
+    if settings_view == settings_labels[0]:
         st.subheader("Mitarbeiter verwalten")
 
         # Mitarbeiter anzeigen
-        mitarbeiter_df = pd.read_sql("SELECT ID_Mitarbeiter, Name, Email FROM mitarbeiter ORDER BY Name", con=engine)
+        mitarbeiter_df = cached_view_data("settings_mitarbeiter", lambda: pd.read_sql("SELECT ID_Mitarbeiter, Name, Email FROM mitarbeiter ORDER BY Name", con=engine))
         st.dataframe(mitarbeiter_df, use_container_width=True)
 
         # Neuen Mitarbeiter hinzufügen
@@ -1530,17 +1937,18 @@ def show_settings():
                                 "salt": salt
                             })
 
+                        invalidate_view_data("settings_mitarbeiter")
                         st.success(f"Mitarbeiter '{name}' erfolgreich hinzugefügt!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Fehler beim Hinzufügen des Mitarbeiters: {str(e)}")
 
     # Tab: Kunden
-    with settings_tabs[1]:
+    if settings_view == settings_labels[1]:
         st.subheader("Kunden verwalten")
 
         # Kunden anzeigen
-        kunden_df = pd.read_sql("SELECT ID_Kunde, Name, Kontaktperson, Email, Telefon FROM kunde ORDER BY Name", con=engine)
+        kunden_df = cached_view_data("settings_kunde", lambda: pd.read_sql("SELECT ID_Kunde, Name, Kontaktperson, Email, Telefon FROM kunde ORDER BY Name", con=engine))
         st.dataframe(kunden_df, use_container_width=True)
 
         # Neuen Kunden hinzufügen
@@ -1570,17 +1978,18 @@ def show_settings():
                                 "telefon": telefon
                             })
 
+                        invalidate_view_data("settings_kunde")
                         st.success(f"Kunde '{name}' erfolgreich hinzugefügt!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Fehler beim Hinzufügen des Kunden: {str(e)}")
 
     # Tab: Kategorien
-    with settings_tabs[2]:
+    if settings_view == settings_labels[2]:
         st.subheader("Kategorien verwalten")
 
         # Kategorien anzeigen
-        kategorien_df = pd.read_sql("SELECT ID_Kategorie, Name, Beschreibung FROM kategorie ORDER BY Name", con=engine)
+        kategorien_df = cached_view_data("settings_kategorie", lambda: pd.read_sql("SELECT ID_Kategorie, Name, Beschreibung FROM kategorie ORDER BY Name", con=engine))
         st.dataframe(kategorien_df, use_container_width=True)
 
         # Neue Kategorie hinzufügen
@@ -1606,17 +2015,18 @@ def show_settings():
                                 "beschreibung": beschreibung
                             })
 
+                        invalidate_view_data("settings_kategorie")
                         st.success(f"Kategorie '{name}' erfolgreich hinzugefügt!")
                         st.rerun()
                     except Exception as e:
                         st.error(f"Fehler beim Hinzufügen der Kategorie: {str(e)}")
 
     # Tab: Status
-    with settings_tabs[3]:
+    if settings_view == settings_labels[3]:
         st.subheader("Status verwalten")
 
         # Status anzeigen
-        status_df = pd.read_sql("SELECT ID_Status, Name, Beschreibung FROM status ORDER BY ID_Status", con=engine)
+        status_df = cached_view_data("settings_status", lambda: pd.read_sql("SELECT ID_Status, Name, Beschreibung FROM status ORDER BY ID_Status", con=engine))
         st.dataframe(status_df, use_container_width=True)
 
         # Neuen Status hinzufügen
@@ -1642,6 +2052,7 @@ def show_settings():
                                 "beschreibung": beschreibung
                             })
 
+                        invalidate_view_data("settings_status")
                         st.success(f"Status '{name}' erfolgreich hinzugefügt!")
                         st.rerun()
                     except Exception as e:
@@ -1766,32 +2177,19 @@ def show_database_management():
                 if st.button("💾 Änderungen speichern"):
                     df = st.session_state.original_df
                     edited_df = st.session_state.edited_df
-                    delta = df.compare(edited_df, keep_shape=True, keep_equal=True)
-                    rows_to_update = delta.dropna(how="all").index.tolist()
+                    change_sets = build_change_sets(df, edited_df, id_spalte)
 
-                    if not rows_to_update:
+                    if not change_sets:
                         st.info("Keine Änderungen erkannt.")
                     else:
                         try:
                             with engine.begin() as conn:
-                                for idx in rows_to_update:
-                                    row = edited_df.loc[idx]
-                                    original_row = df.loc[idx]
-
-                                    update_fields = {}
-                                    for col in spalten:
-                                        if row[col] != original_row[col]:
-                                            update_fields[col] = row[col]
-
-                                    if update_fields:
-                                        set_clause = ", ".join([f"{col} = :{col}" for col in update_fields])
-                                        query = text(
-                                            f"UPDATE {table_choice_edit} SET {set_clause} WHERE {id_spalte} = :id_value"
-                                        )
-                                        update_fields["id_value"] = row[id_spalte]
-                                        conn.execute(query, update_fields)
-
-                            st.success("✅ Änderungen erfolgreich gespeichert.")
+                                updated_rows, statements = apply_change_sets(
+                                    conn, table_choice_edit, id_spalte, change_sets
+                                )
+                            invalidate_table_views(table_choice_edit)
+
+                            st.success(f"✅ {updated_rows} Zeilen mit {statements} Anweisungen gespeichert.")
                             # Daten neu laden
                             df = pd.read_sql(f"SELECT * FROM {table_choice_edit}", con=engine)
                             st.session_state.original_df = df.copy()
@@ -1871,6 +2269,7 @@ def show_database_management():
                                 # Standard-Kategorie (ID 1) verwenden
                                 create_ticket_relations(ticket_id, ID_Mitarbeiter, 1)
 
+                        invalidate_table_views(table_choice)
                         st.success(f"✅ Datensatz in '{table_choice}' eingefügt!")
                     except Exception as e:
                         st.error("❌ Fehler beim Einfügen:")
@@ -1964,6 +2363,7 @@ def show_database_management():
                                         st.error(f"Fehler beim Einfügen von Zeile {_+1}: {str(e)}")
 
                             if success_count > 0:
+                                invalidate_table_views(table_choice)
                                 st.success(f"✅ {success_count} Datensätze erfolgreich eingefügt!")
                                 # Leeren DataFrame für neue Eingaben erstellen
                                 empty_df = pd.DataFrame(columns=spalten)
@@ -2015,6 +2415,7 @@ def show_database_management():
                                 result = conn.execute(query, {"value": selected_id_to_delete})
 
                                 if result.rowcount > 0:
+                                    invalidate_table_views(table_choice_delete)
                                     st.success(f"✅ Datensatz mit {id_spalte_delete} = {selected_id_to_delete} gelöscht.")
                                 else:
                                     st.warning(f"⚠️ Kein Datensatz gelöscht. Möglicherweise wurde er bereits entfernt.")
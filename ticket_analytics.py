@@ -0,0 +1,480 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import text
+
+ROLLUP_TABLE = "ticket_verlauf"
+WATERMARK_TABLE = "ticket_verlauf_stand"
+PROCESSED_TABLE = "ticket_verlauf_verarbeitet"
+
+# Quellen der Rollups: Tabelle und Primärschlüssel
+SOURCES = {"tickets": "ID_Ticket", "ticket_historie": "ID_Historie"}
+
+# Auto-Increment-IDs werden vor dem Commit vergeben: Eine Transaktion mit kleinerer ID kann
+# nach einer Aktualisierung noch committen. IDs oberhalb des Stands werden daher einzeln als
+# verarbeitet vermerkt, und der Stand rückt erst auf eine ID vor, die seit SETTLE_SECONDS bekannt ist.
+SETTLE_SECONDS = 600
+
+# Zeiträume der Rollups
+GRANULARITIES = ("hour", "day", "week")
+
+# Kennzahlen: neue Tickets, Wechsel in einen Erledigt-Status und Wiedereröffnungen
+METRICS = ("erstellt", "erledigt", "wiedereroeffnet")
+
+# Statusnamen, die als erledigt gelten (ohne Beachtung der Groß-/Kleinschreibung)
+RESOLVED_STATUS_NAMES = ("gelöst", "geschlossen", "erledigt", "abgeschlossen")
+
+# Feldnamen, unter denen Statuswechsel in ticket_historie protokolliert werden
+STATUS_FIELDS = ("Status", "Status_ID", "ID_Status")
+
+ROLLUP_COLUMNS = ["Granularitaet", "Zeitraum", "Kennzahl", "Status_ID", "Priorität", "Mitarbeiter_ID", "Anzahl"]
+
+
+def hour_bucket(dialect_name, column):
+    """
+    Gibt den SQL-Ausdruck für den Stundenbeginn eines Zeitstempels zurück.
+
+    Args:
+        dialect_name: Name des SQLAlchemy-Dialekts
+        column: Spalte oder Ausdruck
+
+    Returns:
+        str: SQL-Ausdruck mit Ergebnis "JJJJ-MM-TT HH:00:00"
+    """
+    if dialect_name == "mysql":
+        return f"DATE_FORMAT({column}, '%Y-%m-%d %H:00:00')"
+    return f"strftime('%Y-%m-%d %H:00:00', {column})"
+
+
+def create_rollup_tables(conn):
+    """
+    Legt die Tabellen für die Rollups und deren Verarbeitungsstand an, falls sie fehlen.
+
+    Args:
+        conn: Offene Verbindung
+    """
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+        Granularitaet VARCHAR(4) NOT NULL,
+        Zeitraum DATETIME NOT NULL,
+        Kennzahl VARCHAR(20) NOT NULL,
+        Status_ID INT NOT NULL DEFAULT 0,
+        Priorität VARCHAR(20) NOT NULL DEFAULT '',
+        Mitarbeiter_ID INT NOT NULL DEFAULT 0,
+        Anzahl INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (Granularitaet, Zeitraum, Kennzahl, Status_ID, Priorität, Mitarbeiter_ID)
+    )
+    """))
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+        Quelle VARCHAR(20) PRIMARY KEY,
+        Letzte_ID INT NOT NULL DEFAULT 0,
+        Kandidat_ID INT NOT NULL DEFAULT 0,
+        Kandidat_Zeit DATETIME NULL
+    )
+    """))
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS {PROCESSED_TABLE} (
+        Quelle VARCHAR(20) NOT NULL,
+        ID INT NOT NULL,
+        PRIMARY KEY (Quelle, ID)
+    )
+    """))
+
+
+def expand_granularities(hourly):
+    """
+    Verdichtet Stundenwerte zusätzlich zu Tages- und Wochenwerten (Woche ab Montag).
+
+    Args:
+        hourly: DataFrame mit Zeitraum (Stundenbeginn), Kennzahl, Status_ID, Priorität, Mitarbeiter_ID, Anzahl
+
+    Returns:
+        pandas.DataFrame: Zeilen mit den Spalten ROLLUP_COLUMNS
+    """
+    if hourly.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    hourly = hourly.copy()
+    hourly["Zeitraum"] = pd.to_datetime(hourly["Zeitraum"])
+    keys = ["Zeitraum", "Kennzahl", "Status_ID", "Priorität", "Mitarbeiter_ID"]
+
+    frames = []
+    for granularity in GRANULARITIES:
+        frame = hourly.copy()
+        if granularity == "day":
+            frame["Zeitraum"] = frame["Zeitraum"].dt.floor("D")
+        elif granularity == "week":
+            frame["Zeitraum"] = frame["Zeitraum"].dt.to_period("W-SUN").dt.start_time
+        frame = frame.groupby(keys, as_index=False)["Anzahl"].sum()
+        frame.insert(0, "Granularitaet", granularity)
+        frames.append(frame)
+
+    rollup = pd.concat(frames, ignore_index=True)
+    rollup["Zeitraum"] = rollup["Zeitraum"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return rollup[ROLLUP_COLUMNS]
+
+
+class TicketAnalytics:
+    """
+    Zeitreihen zu Tickets aus vorverdichteten Rollups (Stunde, Tag, Woche).
+    Die Rollups werden inkrementell aus tickets und ticket_historie fortgeschrieben:
+    Je Quelle wird ein Stand gespeichert, bis zu dem alle IDs verarbeitet sind, sodass eine
+    Aktualisierung nur neuere Zeilen über den Primärschlüssel liest. Darüber liegende IDs werden
+    in ticket_verlauf_verarbeitet vermerkt, damit spät committete Zeilen nachgeholt und keine
+    doppelt gezählt werden (siehe SETTLE_SECONDS).
+    """
+
+    # Eine Instanz je Engine, damit alle Sitzungen denselben Aktualisierungsstand teilen
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, engine, refresh_interval=60):
+        """
+        Initialisiert die Auswertung.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            refresh_interval: Mindestabstand der Aktualisierungen beim Lesen in Sekunden (optional, Standard: 60)
+        """
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refreshed_at = None
+
+    @classmethod
+    def for_engine(cls, engine, refresh_interval=60):
+        """
+        Gibt die gemeinsame Auswertung für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            refresh_interval: Mindestabstand der Aktualisierungen in Sekunden (optional, Standard: 60)
+
+        Returns:
+            TicketAnalytics: Gemeinsame Auswertung
+        """
+        with cls._instances_lock:
+            analytics = cls._instances.get(engine)
+            if analytics is None:
+                analytics = cls(engine, refresh_interval)
+                cls._instances[engine] = analytics
+            return analytics
+
+    # Fortschreiben
+
+    def _resolved_status_ids(self, conn):
+        placeholders = ", ".join(f":name_{i}" for i in range(len(RESOLVED_STATUS_NAMES)))
+        params = {f"name_{i}": name for i, name in enumerate(RESOLVED_STATUS_NAMES)}
+        result = conn.execute(text(f"SELECT ID_Status FROM status WHERE LOWER(Name) IN ({placeholders})"), params)
+        return [str(row[0]) for row in result.fetchall()]
+
+    def _watermark(self, conn, source):
+        # Auf MySQL die Zeile sperren, damit parallele Aktualisierungen nicht doppelt zählen
+        lock_clause = " FOR UPDATE" if conn.dialect.name == "mysql" else ""
+        row = conn.execute(
+            text(f"SELECT Letzte_ID, Kandidat_ID, Kandidat_Zeit FROM {WATERMARK_TABLE} WHERE Quelle = :source{lock_clause}"),
+            {"source": source}
+        ).fetchone()
+        if row is None:
+            conn.execute(text(f"INSERT INTO {WATERMARK_TABLE} (Quelle, Letzte_ID) VALUES (:source, 0)"), {"source": source})
+            return 0, 0, None
+        last_id, candidate_id, candidate_time = row
+        return last_id, candidate_id, None if candidate_time is None else pd.Timestamp(candidate_time).to_pydatetime()
+
+    def _advance_watermark(self, conn, source, last_id, candidate_id, candidate_time, upper_id):
+        # Der Kandidat wird zum Stand, sobald er SETTLE_SECONDS bekannt ist: Transaktionen mit
+        # kleineren IDs hatten dann Zeit zu committen und sind bereits einzeln verarbeitet
+        now = datetime.now()
+        if candidate_time is None or now - candidate_time >= timedelta(seconds=SETTLE_SECONDS):
+            last_id = max(last_id, candidate_id)
+            candidate_id, candidate_time = upper_id, now
+
+        conn.execute(
+            text(f"""
+            UPDATE {WATERMARK_TABLE} SET Letzte_ID = :last_id, Kandidat_ID = :candidate_id, Kandidat_Zeit = :candidate_time
+            WHERE Quelle = :source
+            """),
+            {"source": source, "last_id": last_id, "candidate_id": candidate_id,
+             "candidate_time": candidate_time.strftime("%Y-%m-%d %H:%M:%S")}
+        )
+        conn.execute(
+            text(f"DELETE FROM {PROCESSED_TABLE} WHERE Quelle = :source AND ID <= :last_id"),
+            {"source": source, "last_id": last_id}
+        )
+
+    def _unprocessed(self, alias, source):
+        # Bedingung für IDs oberhalb des Stands, die noch nicht verarbeitet wurden
+        key = f"{alias}.{SOURCES[source]}"
+        return f"""{key} > :last_id AND {key} <= :upper_id AND NOT EXISTS (
+            SELECT 1 FROM {PROCESSED_TABLE} v WHERE v.Quelle = '{source}' AND v.ID = {key}
+        )"""
+
+    def _mark_processed(self, conn, source, last_id, upper_id):
+        key = SOURCES[source]
+        conn.execute(text(f"""
+        INSERT INTO {PROCESSED_TABLE} (Quelle, ID)
+        SELECT '{source}', s.{key} FROM {source} s WHERE {self._unprocessed("s", source)}
+        """), {"last_id": last_id, "upper_id": upper_id})
+
+    def _created_rows(self, conn, last_id, upper_id):
+        bucket = hour_bucket(conn.dialect.name, "t.Erstellt_am")
+        result = conn.execute(text(f"""
+        SELECT {bucket} AS Zeitraum, COALESCE(t.Priorität, '') AS Prio, COALESCE(t.Mitarbeiter_ID, 0) AS Mitarbeiter, COUNT(*)
+        FROM tickets t
+        WHERE {self._unprocessed("t", "tickets")} AND t.Erstellt_am IS NOT NULL
+        GROUP BY Zeitraum, Prio, Mitarbeiter
+        """), {"last_id": last_id, "upper_id": upper_id})
+        return [
+            {"Zeitraum": zeitraum, "Kennzahl": "erstellt", "Status_ID": 0, "Priorität": prioritaet,
+             "Mitarbeiter_ID": mitarbeiter_id, "Anzahl": anzahl}
+            for zeitraum, prioritaet, mitarbeiter_id, anzahl in result.fetchall()
+        ]
+
+    def _status_change_rows(self, conn, last_id, upper_id, resolved_ids):
+        if not resolved_ids:
+            return []
+
+        bucket = hour_bucket(conn.dialect.name, "h.Geändert_am")
+        resolved = ", ".join(f":resolved_{i}" for i in range(len(resolved_ids)))
+        fields = ", ".join(f":field_{i}" for i in range(len(STATUS_FIELDS)))
+        params = {"last_id": last_id, "upper_id": upper_id}
+        params.update({f"resolved_{i}": value for i, value in enumerate(resolved_ids)})
+        params.update({f"field_{i}": value for i, value in enumerate(STATUS_FIELDS)})
+
+        # Wechsel in einen Erledigt-Status zählen als erledigt, Wechsel heraus als Wiedereröffnung.
+        # Der Durchsatz wird dem ändernden Mitarbeiter zugerechnet, sonst dem zuständigen.
+        result = conn.execute(text(f"""
+        SELECT {bucket} AS Zeitraum,
+               CASE WHEN h.Neuer_Wert IN ({resolved}) THEN 'erledigt' ELSE 'wiedereroeffnet' END AS Kennzahl,
+               h.Neuer_Wert AS Status,
+               COALESCE(t.Priorität, '') AS Prio,
+               COALESCE(h.Geändert_von, t.Mitarbeiter_ID, 0) AS Mitarbeiter,
+               COUNT(*)
+        FROM ticket_historie h
+        LEFT JOIN tickets t ON t.ID_Ticket = h.ID_Ticket
+        WHERE {self._unprocessed("h", "ticket_historie")}
+          AND h.Feldname IN ({fields})
+          AND h.Geändert_am IS NOT NULL
+          AND (
+              (h.Neuer_Wert IN ({resolved}) AND (h.Alter_Wert IS NULL OR h.Alter_Wert NOT IN ({resolved})))
+              OR (h.Alter_Wert IN ({resolved}) AND h.Neuer_Wert NOT IN ({resolved}))
+          )
+        GROUP BY Zeitraum, Kennzahl, Status, Prio, Mitarbeiter
+        """), params)
+
+        rows = []
+        for zeitraum, kennzahl, status, prioritaet, mitarbeiter_id, anzahl in result.fetchall():
+            try:
+                status_id = int(status)
+            except (TypeError, ValueError):
+                status_id = 0
+            rows.append({"Zeitraum": zeitraum, "Kennzahl": kennzahl, "Status_ID": status_id,
+                         "Priorität": prioritaet, "Mitarbeiter_ID": mitarbeiter_id, "Anzahl": anzahl})
+        return rows
+
+    def _upsert_query(self, dialect_name):
+        columns = ", ".join(ROLLUP_COLUMNS)
+        values = ", ".join(f":p{i}" for i in range(len(ROLLUP_COLUMNS)))
+        if dialect_name == "mysql":
+            return f"""
+            INSERT INTO {ROLLUP_TABLE} ({columns}) VALUES ({values})
+            ON DUPLICATE KEY UPDATE Anzahl = Anzahl + VALUES(Anzahl)
+            """
+        return f"""
+        INSERT INTO {ROLLUP_TABLE} ({columns}) VALUES ({values})
+        ON CONFLICT (Granularitaet, Zeitraum, Kennzahl, Status_ID, Priorität, Mitarbeiter_ID)
+        DO UPDATE SET Anzahl = Anzahl + excluded.Anzahl
+        """
+
+    def update(self, conn):
+        """
+        Schreibt die Rollups mit allen Tickets und Historieneinträgen seit der letzten Aktualisierung fort.
+        Muss innerhalb einer Transaktion aufgerufen werden.
+
+        Args:
+            conn: Offene Verbindung innerhalb einer Transaktion
+
+        Returns:
+            int: Anzahl der geschriebenen Rollup-Zeilen
+        """
+        states = {source: self._watermark(conn, source) for source in SOURCES}
+
+        # Obergrenzen vorab festlegen, damit parallel eingefügte Zeilen beim nächsten Mal folgen
+        upper = {
+            source: conn.execute(text(f"SELECT COALESCE(MAX({key}), 0) FROM {source}")).scalar()
+            for source, key in SOURCES.items()
+        }
+
+        rows = []
+        last_ticket, last_history = states["tickets"][0], states["ticket_historie"][0]
+        if upper["tickets"] > last_ticket:
+            rows.extend(self._created_rows(conn, last_ticket, upper["tickets"]))
+        if upper["ticket_historie"] > last_history:
+            rows.extend(self._status_change_rows(conn, last_history, upper["ticket_historie"],
+                                                 self._resolved_status_ids(conn)))
+
+        rollup = expand_granularities(pd.DataFrame(rows, columns=ROLLUP_COLUMNS[1:]))
+        if not rollup.empty:
+            # Feste Reihenfolge, damit parallele Transaktionen die Zeilen gleich sperren
+            rollup = rollup.sort_values(ROLLUP_COLUMNS[:-1])
+            params = [
+                {f"p{i}": value for i, value in enumerate(record)}
+                for record in rollup.astype(object).itertuples(index=False, name=None)
+            ]
+            conn.execute(text(self._upsert_query(conn.dialect.name)), params)
+
+        for source, (last_id, candidate_id, candidate_time) in states.items():
+            if upper[source] > last_id:
+                self._mark_processed(conn, source, last_id, upper[source])
+            self._advance_watermark(conn, source, last_id, candidate_id, candidate_time, max(last_id, upper[source]))
+        return len(rollup)
+
+    def refresh(self, force=False):
+        """
+        Aktualisiert die Rollups, höchstens einmal je refresh_interval.
+
+        Args:
+            force: Unabhängig vom Intervall aktualisieren (optional)
+        """
+        if not force and self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+
+        with self._lock:
+            if not force and self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            with self.engine.begin() as conn:
+                self.update(conn)
+            self._refreshed_at = time.monotonic()
+
+    def refresh_in_background(self):
+        """
+        Startet eine fällige Aktualisierung der Rollups im Hintergrund, ohne darauf zu warten.
+        Bis zu ihrem Abschluss lesen die Auswertungen den bisherigen Stand.
+        """
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+
+        # Läuft bereits eine Aktualisierung, keine zweite starten
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                with self.engine.begin() as conn:
+                    self.update(conn)
+                self._refreshed_at = time.monotonic()
+            except Exception as e:
+                print(f"Fehler beim Aktualisieren der Ticket-Rollups: {str(e)}")
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name="ticket-analytics", daemon=True).start()
+
+    def rebuild(self):
+        """
+        Berechnet alle Rollups neu, z.B. nach Korrekturen an älteren Tickets.
+        """
+        with self._lock:
+            with self.engine.begin() as conn:
+                conn.execute(text(f"DELETE FROM {ROLLUP_TABLE}"))
+                conn.execute(text(f"DELETE FROM {WATERMARK_TABLE}"))
+                conn.execute(text(f"DELETE FROM {PROCESSED_TABLE}"))
+                self.update(conn)
+            self._refreshed_at = time.monotonic()
+
+    # Auswertungen
+
+    def _range(self, start, end):
+        end = end or datetime.now()
+        return {"start": start.strftime("%Y-%m-%d %H:%M:%S"), "end": end.strftime("%Y-%m-%d %H:%M:%S")}
+
+    def _read(self, query, params):
+        self.refresh_in_background()
+        with self.engine.connect() as conn:
+            result = conn.execute(text(query), params)
+            return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+    def get_created_resolved(self, granularity, start, end=None):
+        """
+        Gibt neue, erledigte und wiedereröffnete Tickets je Zeitraum zurück.
+
+        Args:
+            granularity: "hour", "day" oder "week"
+            start: Beginn des Zeitraums (datetime)
+            end: Ende des Zeitraums (optional, Standard: jetzt)
+
+        Returns:
+            pandas.DataFrame: Spalten Zeitraum, erstellt, erledigt, wiedereroeffnet
+        """
+        params = {"granularity": granularity, **self._range(start, end)}
+        df = self._read(f"""
+        SELECT Zeitraum, Kennzahl, SUM(Anzahl) AS Anzahl
+        FROM {ROLLUP_TABLE}
+        WHERE Granularitaet = :granularity AND Zeitraum >= :start AND Zeitraum < :end
+        GROUP BY Zeitraum, Kennzahl
+        """, params)
+
+        if df.empty:
+            return pd.DataFrame(columns=["Zeitraum", *METRICS])
+
+        df["Zeitraum"] = pd.to_datetime(df["Zeitraum"])
+        pivot = df.pivot_table(index="Zeitraum", columns="Kennzahl", values="Anzahl", aggfunc="sum", fill_value=0)
+        return pivot.reindex(columns=list(METRICS), fill_value=0).reset_index().rename_axis(columns=None)
+
+    def get_backlog(self, granularity, start, end=None, series=None):
+        """
+        Gibt den Bestand offener Tickets am Ende jedes Zeitraums zurück
+        (alle neuen minus erledigte plus wiedereröffnete Tickets bis dahin).
+
+        Args:
+            granularity: "hour", "day" oder "week"
+            start: Beginn des Zeitraums (datetime)
+            end: Ende des Zeitraums (optional, Standard: jetzt)
+            series: Ergebnis von get_created_resolved für denselben Zeitraum (optional, spart eine Abfrage)
+
+        Returns:
+            pandas.DataFrame: Spalten Zeitraum, Offen
+        """
+        if series is None:
+            series = self.get_created_resolved(granularity, start, end)
+
+        # Anfangsbestand aus allen Zeiträumen vor dem Beginn
+        opening = self._read(f"""
+        SELECT Kennzahl, SUM(Anzahl) AS Anzahl
+        FROM {ROLLUP_TABLE}
+        WHERE Granularitaet = :granularity AND Zeitraum < :start
+        GROUP BY Kennzahl
+        """, {"granularity": granularity, "start": self._range(start, end)["start"]})
+        totals = dict(zip(opening["Kennzahl"], opening["Anzahl"])) if not opening.empty else {}
+        opening_backlog = totals.get("erstellt", 0) - totals.get("erledigt", 0) + totals.get("wiedereroeffnet", 0)
+
+        if series.empty:
+            return pd.DataFrame(columns=["Zeitraum", "Offen"])
+
+        delta = series["erstellt"] - series["erledigt"] + series["wiedereroeffnet"]
+        return pd.DataFrame({"Zeitraum": series["Zeitraum"], "Offen": opening_backlog + delta.cumsum()})
+
+    def get_throughput(self, granularity, start, end=None):
+        """
+        Gibt die erledigten Tickets je Mitarbeiter und Zeitraum zurück.
+
+        Args:
+            granularity: "hour", "day" oder "week"
+            start: Beginn des Zeitraums (datetime)
+            end: Ende des Zeitraums (optional, Standard: jetzt)
+
+        Returns:
+            pandas.DataFrame: Spalten Zeitraum, Mitarbeiter_ID, Anzahl
+        """
+        params = {"granularity": granularity, **self._range(start, end)}
+        df = self._read(f"""
+        SELECT Zeitraum, Mitarbeiter_ID, SUM(Anzahl) AS Anzahl
+        FROM {ROLLUP_TABLE}
+        WHERE Granularitaet = :granularity AND Kennzahl = 'erledigt' AND Zeitraum >= :start AND Zeitraum < :end
+        GROUP BY Zeitraum, Mitarbeiter_ID
+        """, params)
+        if not df.empty:
+            df["Zeitraum"] = pd.to_datetime(df["Zeitraum"])
+        return df
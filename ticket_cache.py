@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+
+
+class TicketDetailCache:
+    """
+    Zwischenspeicher für Ticketdetails und Kommentare je Ticket (LRU).
+    Ein Eintrag gilt, solange das Ticket nicht geändert wurde: Kennt der Aufrufer den aktuellen
+    Wert von Geändert_am (z.B. aus der Ticketübersicht), wird er mit dem gespeicherten verglichen.
+    Schreibzugriffe der Anwendung (Kommentare, Ticketänderungen) verwerfen den Eintrag direkt;
+    Änderungen außerhalb der Anwendung werden spätestens nach ttl Sekunden sichtbar.
+    """
+
+    # Ein Cache je Engine, damit alle Sitzungen dieselben Einträge nutzen
+    _caches = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self, max_entries=1000, ttl=300):
+        """
+        Initialisiert den Cache.
+
+        Args:
+            max_entries: Maximale Anzahl zwischengespeicherter Tickets (optional, Standard: 1000)
+            ttl: Maximales Alter eines Eintrags in Sekunden (optional, Standard: 300)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_engine(cls, engine, max_entries=1000, ttl=300):
+        """
+        Gibt den gemeinsamen Cache für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            max_entries: Maximale Anzahl zwischengespeicherter Tickets (optional)
+            ttl: Maximales Alter eines Eintrags in Sekunden (optional)
+
+        Returns:
+            TicketDetailCache: Gemeinsamer Cache
+        """
+        with cls._caches_lock:
+            cache = cls._caches.get(engine)
+            if cache is None:
+                cache = cls(max_entries, ttl)
+                cls._caches[engine] = cache
+            return cache
+
+    @staticmethod
+    def _normalize(modified):
+        if modified is None or pd.isna(modified):
+            return None
+        return pd.Timestamp(modified)
+
+    def get(self, ticket_id, modified=None):
+        """
+        Gibt die zwischengespeicherten Details eines Tickets zurück.
+
+        Args:
+            ticket_id: ID des Tickets
+            modified: Bekannter Wert von Geändert_am (optional); weicht er ab, gilt der Eintrag als veraltet
+
+        Returns:
+            dict: Gespeicherte Daten oder None
+        """
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is None:
+                return None
+
+            stored_at, stored_modified, data = entry
+            modified = self._normalize(modified)
+            if time.monotonic() - stored_at > self.ttl or (modified is not None and modified != stored_modified):
+                del self._entries[ticket_id]
+                return None
+
+            self._entries.move_to_end(ticket_id)
+            return data
+
+    def put(self, ticket_id, modified, data):
+        """
+        Speichert die Details eines Tickets.
+
+        Args:
+            ticket_id: ID des Tickets
+            modified: Geändert_am des geladenen Tickets
+            data: Zu speichernde Daten (werden nicht kopiert und dürfen nicht verändert werden)
+        """
+        with self._lock:
+            self._entries[ticket_id] = (time.monotonic(), self._normalize(modified), data)
+            self._entries.move_to_end(ticket_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, ticket_id=None):
+        """
+        Verwirft die Details eines oder aller Tickets.
+
+        Args:
+            ticket_id: ID des Tickets (optional, sonst alle)
+        """
+        with self._lock:
+            if ticket_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticket_id, None)
@@ -0,0 +1,317 @@
+import io
+import os
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from reference_data import PRIORITAETEN
+
+# Spalten der Tabelle tickets, die beim Import geschrieben werden
+TICKET_COLUMNS = ["Titel", "Beschreibung", "Priorität", "Status_ID", "Kunde_ID", "Mitarbeiter_ID", "Erstellt_am", "Geändert_am"]
+
+# Namensspalten in der Importdatei und die Nachschlagetabelle, über die sie in IDs aufgelöst werden
+NAME_COLUMNS = {
+    "Status": ("status", "Status_ID"),
+    "Kunde": ("kunden", "Kunde_ID"),
+    "Mitarbeiter": ("mitarbeiter", "Mitarbeiter_ID"),
+}
+
+# Alternative Spaltennamen in Importdateien
+COLUMN_ALIASES = {
+    "Prioritaet": "Priorität",
+    "Priority": "Priorität",
+    "Title": "Titel",
+    "Description": "Beschreibung",
+}
+
+MAX_TITLE_LENGTH = 255
+DEFAULT_BATCH_SIZE = 1000
+
+
+def read_ticket_file(source, file_format=None):
+    """
+    Liest eine Importdatei im Format CSV, JSON oder Parquet.
+
+    Args:
+        source: Dateipfad oder Datei-Objekt (z.B. aus st.file_uploader)
+        file_format: "csv", "json" oder "parquet" (optional, sonst aus der Dateiendung)
+
+    Returns:
+        pandas.DataFrame: Eingelesene Zeilen
+    """
+    if file_format is None:
+        name = getattr(source, "name", source if isinstance(source, str) else "")
+        file_format = os.path.splitext(str(name))[1].lstrip(".").lower()
+
+    if file_format == "csv":
+        # Trennzeichen (Komma oder Semikolon) automatisch erkennen
+        return pd.read_csv(source, sep=None, engine="python", dtype=str, keep_default_na=False, na_values=[""])
+    if file_format in ("json", "jsonl"):
+        content = source.read() if hasattr(source, "read") else open(source, "rb").read()
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        lines = file_format == "jsonl" or not content.lstrip().startswith("[")
+        return pd.read_json(io.StringIO(content), orient="records", lines=lines, dtype=False)
+    if file_format == "parquet":
+        # Benötigt pyarrow oder fastparquet
+        return pd.read_parquet(source)
+
+    raise ValueError(f"Nicht unterstütztes Dateiformat: {file_format}")
+
+
+class ImportReport:
+    """
+    Ergebnis eines Ticket-Imports mit Durchsatz und Fehlern je Zeile.
+    """
+
+    def __init__(self, total_rows):
+        self.total_rows = total_rows
+        self.imported = 0
+        self.batches = 0
+        self.duration = 0.0
+        self.warnings = []
+        self.errors = pd.DataFrame(columns=["Zeile", "Fehler"])
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def rows_per_second(self):
+        return self.imported / self.duration if self.duration > 0 else 0.0
+
+    def add_errors(self, rows, message):
+        """
+        Vermerkt Fehler für mehrere Zeilen.
+
+        Args:
+            rows: Zeilennummern
+            message: Fehlermeldung (Text oder Liste je Zeile)
+        """
+        new_errors = pd.DataFrame({"Zeile": list(rows), "Fehler": message})
+        self.errors = new_errors if self.errors.empty else pd.concat([self.errors, new_errors], ignore_index=True)
+
+
+class TicketImporter:
+    """
+    Massenimport von Tickets: vektorisierte Prüfung mit pandas, Auflösung der Namen
+    über den Stammdaten-Cache und Einfügen in Blöcken per executemany oder LOAD DATA LOCAL INFILE.
+    """
+
+    def __init__(self, db, batch_size=DEFAULT_BATCH_SIZE, use_load_data=False, create_relations=True):
+        """
+        Initialisiert den Import.
+
+        Args:
+            db: DatabaseManager
+            batch_size: Anzahl der Tickets pro Block (optional, Standard: 1000)
+            use_load_data: LOAD DATA LOCAL INFILE statt executemany verwenden (optional, nur MySQL;
+                           der Server muss local_infile erlauben, der Treiber wird entsprechend verbunden)
+            create_relations: Einträge in ticket_mitarbeiter und ticket_kategorie anlegen (optional)
+        """
+        self.db = db
+        self.batch_size = max(int(batch_size), 1)
+        self.use_load_data = use_load_data and db.engine.dialect.name == "mysql"
+        self.engine = db.get_bulk_load_engine() if self.use_load_data else db.engine
+        self.create_relations = create_relations
+
+    def prepare(self, df):
+        """
+        Prüft die Zeilen und bereitet sie für die Tabelle tickets vor.
+
+        Args:
+            df: pandas.DataFrame aus der Importdatei
+
+        Returns:
+            tuple: (DataFrame mit gültigen Zeilen und den Spalten TICKET_COLUMNS sowie Kategorie_ID,
+                    Series mit Fehlermeldungen je ungültiger Zeile)
+        """
+        df = df.rename(columns=COLUMN_ALIASES).reset_index(drop=True)
+        # Zeilennummern wie in der Datei (Zeile 1 = erste Datenzeile)
+        df.index = df.index + 1
+
+        prepared = pd.DataFrame(index=df.index)
+        checks = []
+
+        def flag(mask, message):
+            # Fehlende Werte (pd.NA) in der Maske gelten als gültig
+            mask = mask.fillna(False).to_numpy(dtype=bool)
+            checks.append(pd.Series(np.where(mask, message, None), index=df.index))
+
+        # Titel ist Pflicht
+        titel = df["Titel"].astype("string").str.strip() if "Titel" in df.columns else pd.Series(pd.NA, index=df.index, dtype="string")
+        flag(titel.isna() | (titel == ""), "Titel fehlt")
+        flag(titel.str.len() > MAX_TITLE_LENGTH, f"Titel länger als {MAX_TITLE_LENGTH} Zeichen")
+        prepared["Titel"] = titel
+
+        prepared["Beschreibung"] = df["Beschreibung"].astype("string") if "Beschreibung" in df.columns else ""
+
+        # Priorität: Standard "Mittel", sonst nur die bekannten Stufen
+        if "Priorität" in df.columns:
+            prioritaet = df["Priorität"].astype("string").str.strip().fillna("Mittel")
+            flag(~prioritaet.isin(PRIORITAETEN), "Unbekannte Priorität")
+        else:
+            prioritaet = pd.Series("Mittel", index=df.index)
+        prepared["Priorität"] = prioritaet
+
+        # Namen über je eine Nachschlagetabelle in IDs auflösen, IDs direkt übernehmen
+        for name_column, (lookup_name, id_column) in NAME_COLUMNS.items():
+            lookup = self.db.get_lookup(lookup_name)
+            if id_column in df.columns:
+                provided = df[id_column].notna()
+                ids = pd.to_numeric(df[id_column], errors="coerce").astype("Int64")
+                flag(provided & ~ids.isin(lookup.ids), f"Unbekannte {id_column}")
+            elif name_column in df.columns:
+                names = df[name_column].astype("string").str.strip()
+                provided = names.notna() & (names != "")
+                ids = names.map(lookup.name_to_id).astype("Int64")
+                flag(provided & ids.isna(), f"Unbekannter {name_column}")
+            else:
+                provided = pd.Series(False, index=df.index)
+                ids = pd.Series(pd.NA, index=df.index, dtype="Int64")
+            prepared[id_column] = ids
+
+            # Status ist Pflicht, Kunde und Mitarbeiter dürfen leer bleiben
+            if name_column == "Status":
+                flag(~provided, "Status fehlt")
+
+        # Erstellungsdatum: Standard jetzt, sonst gültiges Datum
+        now = pd.Timestamp(datetime.now().replace(microsecond=0))
+        if "Erstellt_am" in df.columns:
+            erstellt = pd.to_datetime(df["Erstellt_am"], errors="coerce")
+            flag(df["Erstellt_am"].notna() & erstellt.isna(), "Ungültiges Erstellungsdatum")
+            erstellt = erstellt.fillna(now)
+        else:
+            erstellt = pd.Series(now, index=df.index)
+        prepared["Erstellt_am"] = erstellt
+        prepared["Geändert_am"] = erstellt
+
+        kategorie = pd.to_numeric(df["Kategorie_ID"], errors="coerce") if "Kategorie_ID" in df.columns else pd.Series(1, index=df.index)
+        prepared["Kategorie_ID"] = kategorie.fillna(1).astype("Int64")
+
+        # Meldungen je Zeile zusammenfassen
+        messages = pd.concat(checks, axis=1).stack().dropna().groupby(level=0).agg("; ".join) if checks else pd.Series(dtype=str)
+        valid = prepared.drop(index=messages.index)
+        return valid, messages
+
+    def _to_records(self, batch):
+        # In Python-Typen umwandeln, damit der Treiber keine NumPy-Werte erhält
+        batch = batch[TICKET_COLUMNS].copy()
+        for column in ["Erstellt_am", "Geändert_am"]:
+            batch[column] = batch[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+        batch = batch.astype(object).where(batch.notna(), None)
+        return batch.to_dict("records")
+
+    def _insert_executemany(self, conn, batch):
+        placeholders = ", ".join(f":p{i}" for i in range(len(TICKET_COLUMNS)))
+        query = text(f"INSERT INTO tickets ({', '.join(TICKET_COLUMNS)}) VALUES ({placeholders})")
+        records = [
+            {f"p{i}": record[column] for i, column in enumerate(TICKET_COLUMNS)}
+            for record in self._to_records(batch)
+        ]
+        conn.execute(query, records)
+
+    def _insert_load_data(self, conn, batch):
+        # Block als CSV schreiben und mit einem LOAD DATA einlesen
+        csv_batch = batch[TICKET_COLUMNS].copy()
+        for column in ["Erstellt_am", "Geändert_am"]:
+            csv_batch[column] = csv_batch[column].dt.strftime("%Y-%m-%d %H:%M:%S")
+
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8", newline="") as f:
+                csv_batch.to_csv(f, header=False, index=False, na_rep="NULL", lineterminator="\n")
+
+            conn.execute(text(f"""
+            LOAD DATA LOCAL INFILE '{path.replace(os.sep, "/")}'
+            INTO TABLE tickets CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({', '.join(TICKET_COLUMNS)})
+            """))
+        finally:
+            os.remove(path)
+
+    def _insert_batch(self, batch, report):
+        with self.engine.begin() as conn:
+            max_id_before = conn.execute(text("SELECT COALESCE(MAX(ID_Ticket), 0) FROM tickets")).scalar()
+
+            if self.use_load_data:
+                self._insert_load_data(conn, batch)
+            else:
+                self._insert_executemany(conn, batch)
+
+            # Statistik in derselben Transaktion fortschreiben
+            self.db.ticket_statistics.record_changes(conn, added=zip(
+                batch["Status_ID"], batch["Priorität"], batch["Mitarbeiter_ID"]
+            ))
+
+            new_ids = [row[0] for row in conn.execute(
+                text("SELECT ID_Ticket FROM tickets WHERE ID_Ticket > :max_id ORDER BY ID_Ticket"),
+                {"max_id": max_id_before}
+            ).fetchall()]
+
+        report.imported += len(batch)
+        report.batches += 1
+
+        if not self.create_relations:
+            return
+
+        # Neue IDs nur zuordnen, wenn niemand parallel Tickets angelegt hat
+        if len(new_ids) != len(batch):
+            report.warnings.append(
+                f"Block {report.batches}: Zuordnungen übersprungen, da parallel weitere Tickets angelegt wurden"
+            )
+            return
+
+        relations = [
+            (ticket_id, None if pd.isna(mitarbeiter_id) else int(mitarbeiter_id), int(kategorie_id))
+            for ticket_id, mitarbeiter_id, kategorie_id in zip(new_ids, batch["Mitarbeiter_ID"], batch["Kategorie_ID"])
+        ]
+        if not self.db.create_ticket_relations_bulk(relations):
+            report.warnings.append(f"Block {report.batches}: Zuordnungen konnten nicht angelegt werden")
+
+    def _insert_rows_individually(self, batch, report):
+        # Nach einem fehlgeschlagenen Block die fehlerhaften Zeilen einzeln ermitteln
+        for row_number in batch.index:
+            try:
+                self._insert_batch(batch.loc[[row_number]], report)
+            except Exception as e:
+                report.add_errors([row_number], str(e).splitlines()[0])
+
+    def import_dataframe(self, df, progress_callback=None):
+        """
+        Prüft und importiert Tickets aus einem DataFrame.
+
+        Args:
+            df: pandas.DataFrame aus der Importdatei
+            progress_callback: Funktion progress_callback(verarbeitet, gesamt) (optional)
+
+        Returns:
+            ImportReport: Ergebnis des Imports
+        """
+        report = ImportReport(len(df))
+        start = time.perf_counter()
+
+        valid, messages = self.prepare(df)
+        if not messages.empty:
+            report.add_errors(messages.index, messages.values)
+
+        processed = 0
+        for batch_start in range(0, len(valid), self.batch_size):
+            batch = valid.iloc[batch_start:batch_start + self.batch_size]
+            try:
+                self._insert_batch(batch, report)
+            except Exception as e:
+                print(f"Fehler beim Importieren eines Blocks: {str(e)}")
+                self._insert_rows_individually(batch, report)
+
+            processed += len(batch)
+            if progress_callback:
+                progress_callback(processed, len(valid))
+
+        report.duration = time.perf_counter() - start
+        report.errors = report.errors.sort_values("Zeile").reset_index(drop=True)
+        return report
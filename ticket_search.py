@@ -0,0 +1,331 @@
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy import text
+
+# FULLTEXT-Indizes auf tickets und die Suchfelder, die sie abdecken
+FULLTEXT_INDEXES = {
+    "Alle Felder": ("idx_tickets_volltext", ["Titel", "Beschreibung"]),
+    "Titel": ("idx_tickets_volltext_titel", ["Titel"]),
+    "Beschreibung": ("idx_tickets_volltext_beschreibung", ["Beschreibung"]),
+}
+
+# Zeichen mit Sonderbedeutung im BOOLEAN MODE von MySQL
+BOOLEAN_MODE_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Standardwert von innodb_ft_min_token_size
+MIN_TOKEN_LENGTH = 3
+
+
+def tokenize(value):
+    """
+    Zerlegt einen Text in kleingeschriebene Suchbegriffe.
+
+    Args:
+        value: Text (None wird als leerer Text behandelt)
+
+    Returns:
+        list: Liste der Suchbegriffe
+    """
+    if not value:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(str(value).lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+class InvertedIndex:
+    """
+    In-Process-Volltextindex über Titel und Beschreibung der Tickets.
+    Wird verwendet, wenn das Datenbank-Backend keine FULLTEXT-Indizes unterstützt.
+    """
+
+    # Gewichtung der Felder bei der Relevanzberechnung
+    FIELD_WEIGHTS = {"Titel": 2.0, "Beschreibung": 1.0}
+
+    def __init__(self):
+        """
+        Initialisiert den leeren Index.
+        """
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._sorted_terms = None
+
+    def __len__(self):
+        return len(self._documents)
+
+    def add(self, ticket_id, titel, beschreibung):
+        """
+        Fügt ein Ticket hinzu oder ersetzt seinen bisherigen Eintrag.
+
+        Args:
+            ticket_id: ID des Tickets
+            titel: Titel des Tickets
+            beschreibung: Beschreibung des Tickets
+        """
+        self.remove(ticket_id)
+
+        fields = {"Titel": tokenize(titel), "Beschreibung": tokenize(beschreibung)}
+        terms = set()
+        for field, tokens in fields.items():
+            for token in tokens:
+                field_counts = self._postings[token].setdefault(ticket_id, {})
+                field_counts[field] = field_counts.get(field, 0) + 1
+                terms.add(token)
+
+        self._documents[ticket_id] = terms
+        self._sorted_terms = None
+
+    def remove(self, ticket_id):
+        """
+        Entfernt ein Ticket aus dem Index.
+
+        Args:
+            ticket_id: ID des Tickets
+        """
+        for token in self._documents.pop(ticket_id, ()):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(ticket_id, None)
+                if not postings:
+                    del self._postings[token]
+        self._sorted_terms = None
+
+    def _expand_prefix(self, prefix):
+        # Alle Begriffe, die mit dem Präfix beginnen (für Eingaben während des Tippens)
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings.keys())
+
+        terms = self._sorted_terms
+        low, high = 0, len(terms)
+        while low < high:
+            mid = (low + high) // 2
+            if terms[mid] < prefix:
+                low = mid + 1
+            else:
+                high = mid
+
+        matches = []
+        while low < len(terms) and terms[low].startswith(prefix):
+            matches.append(terms[low])
+            low += 1
+        return matches
+
+    def search(self, search_term, fields=None, limit=None):
+        """
+        Sucht Tickets, die alle Begriffe enthalten (der letzte Begriff als Präfix).
+
+        Args:
+            search_term: Suchbegriff
+            fields: Zu durchsuchende Felder (optional, Standard: Titel und Beschreibung)
+            limit: Maximale Anzahl der Treffer (optional)
+
+        Returns:
+            list: Liste von (ID_Ticket, Relevanz), absteigend nach Relevanz sortiert
+        """
+        tokens = tokenize(search_term)
+        if not tokens:
+            return []
+
+        fields = fields or list(self.FIELD_WEIGHTS.keys())
+        document_count = max(len(self._documents), 1)
+        scores = None
+
+        for position, token in enumerate(tokens):
+            is_last = position == len(tokens) - 1
+            terms = self._expand_prefix(token) if is_last else [token]
+
+            token_scores = {}
+            for term in terms:
+                postings = self._postings.get(term, {})
+                idf = math.log(1 + document_count / (1 + len(postings)))
+                for ticket_id, field_counts in postings.items():
+                    weight = sum(self.FIELD_WEIGHTS[field] * count for field, count in field_counts.items() if field in fields)
+                    if weight:
+                        token_scores[ticket_id] = token_scores.get(ticket_id, 0.0) + (1 + math.log(weight)) * idf
+
+            # Alle Begriffe müssen vorkommen
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {ticket_id: score + token_scores[ticket_id] for ticket_id, score in scores.items() if ticket_id in token_scores}
+
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit] if limit else ranked
+
+
+class TicketSearchEngine:
+    """
+    Volltextsuche über Titel und Beschreibung der Tickets.
+    Nutzt MATCH ... AGAINST auf MySQL und einen In-Process-Index auf anderen Backends.
+    """
+
+    # Eine Suchmaschine je Engine, damit der Fallback-Index nur einmal aufgebaut wird
+    _engines = {}
+    _engines_lock = threading.Lock()
+
+    def __init__(self, engine, index_ttl=300):
+        """
+        Initialisiert die Suchmaschine.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            index_ttl: Maximales Alter des Fallback-Index in Sekunden (optional, Standard: 300)
+        """
+        self.engine = engine
+        self.index_ttl = index_ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_built_at = None
+
+    @classmethod
+    def for_engine(cls, engine, index_ttl=300):
+        """
+        Gibt die gemeinsame Suchmaschine für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            index_ttl: Maximales Alter des Fallback-Index in Sekunden (optional, Standard: 300)
+
+        Returns:
+            TicketSearchEngine: Gemeinsame Suchmaschine
+        """
+        with cls._engines_lock:
+            search_engine = cls._engines.get(engine)
+            if search_engine is None:
+                search_engine = cls(engine, index_ttl)
+                cls._engines[engine] = search_engine
+            return search_engine
+
+    @property
+    def supports_fulltext(self):
+        """
+        Gibt an, ob das Backend FULLTEXT-Indizes unterstützt.
+        """
+        return self.engine.dialect.name == "mysql"
+
+    def _boolean_query(self, search_term):
+        # Jeder Begriff ist Pflicht, der letzte wird als Präfix gesucht
+        tokens = tokenize(BOOLEAN_MODE_OPERATORS.sub(" ", search_term))
+        if not tokens:
+            return None
+        return " ".join(f"+{token}" for token in tokens[:-1]) + f" +{tokens[-1]}*"
+
+    def search(self, search_term, search_field="Alle Felder", conditions=None, params=None, limit=500):
+        """
+        Sucht Tickets per Volltextsuche und sortiert sie nach Relevanz.
+
+        Args:
+            search_term: Suchbegriff
+            search_field: "Alle Felder", "Titel" oder "Beschreibung" (optional)
+            conditions: Zusätzliche WHERE-Bedingungen auf den Alias t (optional)
+            params: Parameter für die zusätzlichen Bedingungen (optional)
+            limit: Maximale Anzahl der Treffer (optional, Standard: 500)
+
+        Returns:
+            list: Liste von (ID_Ticket, Relevanz) oder None, wenn der Suchbegriff
+                  keine durchsuchbaren Wörter enthält
+        """
+        conditions = list(conditions or [])
+        params = dict(params or {})
+        _, columns = FULLTEXT_INDEXES.get(search_field, FULLTEXT_INDEXES["Alle Felder"])
+
+        if self.supports_fulltext:
+            boolean_query = self._boolean_query(search_term)
+            if boolean_query is None:
+                return None
+
+            match = f"MATCH({', '.join('t.' + col for col in columns)}) AGAINST (:fulltext_query IN BOOLEAN MODE)"
+            query = f"SELECT t.ID_Ticket, {match} AS Relevanz FROM tickets t WHERE " + " AND ".join([match] + conditions)
+            query += " ORDER BY Relevanz DESC, t.ID_Ticket DESC LIMIT :limit"
+            params.update({"fulltext_query": boolean_query, "limit": limit})
+
+            with self.engine.connect() as conn:
+                return [(row[0], float(row[1])) for row in conn.execute(text(query), params).fetchall()]
+
+        if not tokenize(search_term):
+            return None
+
+        ranked = self._search_index(search_term, columns)
+        if not conditions:
+            return ranked[:limit]
+
+        return self._apply_conditions(ranked, conditions, params, limit)
+
+    def _apply_conditions(self, ranked, conditions, params, limit, chunk_size=500):
+        # Filter des Fallback-Index in der Datenbank prüfen, Reihenfolge beibehalten
+        results = []
+        with self.engine.connect() as conn:
+            for start in range(0, len(ranked), chunk_size):
+                chunk = ranked[start:start + chunk_size]
+                chunk_params = dict(params)
+                placeholders = []
+                for i, (ticket_id, _) in enumerate(chunk):
+                    chunk_params[f"ticket_id_{i}"] = ticket_id
+                    placeholders.append(f":ticket_id_{i}")
+
+                query = f"SELECT t.ID_Ticket FROM tickets t WHERE t.ID_Ticket IN ({', '.join(placeholders)}) AND " + " AND ".join(conditions)
+                matching = {row[0] for row in conn.execute(text(query), chunk_params).fetchall()}
+
+                results.extend(item for item in chunk if item[0] in matching)
+                if len(results) >= limit:
+                    return results[:limit]
+
+        return results
+
+    def _search_index(self, search_term, fields):
+        # Unter der Sperre suchen, da index_ticket und remove_ticket den Index sonst während der Suche ändern
+        with self._lock:
+            if self._index is None or time.monotonic() - self._index_built_at > self.index_ttl:
+                self._index = self._build_index()
+                self._index_built_at = time.monotonic()
+            return self._index.search(search_term, fields)
+
+    def _build_index(self, chunk_size=5000):
+        index = InvertedIndex()
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(
+                text("SELECT ID_Ticket, Titel, Beschreibung FROM tickets")
+            )
+            for rows in result.partitions(chunk_size):
+                for ticket_id, titel, beschreibung in rows:
+                    index.add(ticket_id, titel, beschreibung)
+        return index
+
+    def index_ticket(self, ticket_id, titel, beschreibung):
+        """
+        Aktualisiert den Fallback-Index nach dem Anlegen oder Ändern eines Tickets.
+        Auf MySQL pflegt die Datenbank den FULLTEXT-Index selbst.
+
+        Args:
+            ticket_id: ID des Tickets
+            titel: Titel des Tickets
+            beschreibung: Beschreibung des Tickets
+        """
+        with self._lock:
+            if self._index is not None:
+                self._index.add(ticket_id, titel, beschreibung)
+
+    def remove_ticket(self, ticket_id):
+        """
+        Entfernt ein Ticket aus dem Fallback-Index.
+
+        Args:
+            ticket_id: ID des Tickets
+        """
+        with self._lock:
+            if self._index is not None:
+                self._index.remove(ticket_id)
+
+    def invalidate_index(self):
+        """
+        Verwirft den Fallback-Index, z.B. nach einem Massenimport. Er wird bei der
+        nächsten Suche neu aufgebaut.
+        """
+        with self._lock:
+            self._index = None
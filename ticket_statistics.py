@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import Counter
+import pandas as pd
+from sqlalchemy import text
+
+# Dimensionen der Statistik und die zugehörige Spalte in tickets
+DIMENSIONS = {
+    "status": "Status_ID",
+    "prioritaet": "Priorität",
+    "mitarbeiter": "Mitarbeiter_ID",
+}
+
+STATISTICS_TABLE = "ticket_statistik"
+
+
+def statistics_key(value):
+    """
+    Wandelt einen Spaltenwert in den Schlüssel der Statistiktabelle um.
+
+    Args:
+        value: Wert aus tickets (ID oder Priorität)
+
+    Returns:
+        str: Schlüssel oder None für leere Werte
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        return value
+    return str(int(value))
+
+
+def create_statistics_table(conn):
+    """
+    Legt die Tabelle ticket_statistik an, falls sie fehlt.
+
+    Args:
+        conn: Offene Verbindung
+    """
+    conn.execute(text(f"""
+    CREATE TABLE IF NOT EXISTS {STATISTICS_TABLE} (
+        Dimension VARCHAR(20) NOT NULL,
+        Schluessel VARCHAR(100) NOT NULL,
+        Anzahl INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (Dimension, Schluessel)
+    )
+    """))
+
+
+def rebuild_statistics(conn):
+    """
+    Berechnet alle Zähler aus der Tabelle tickets neu.
+
+    Args:
+        conn: Offene Verbindung innerhalb einer Transaktion
+    """
+    # Zuerst löschen: Das sperrt alle Zeilen der Statistik (auf MySQL samt Lücken, auf SQLite die
+    # Datenbank) bis zum Commit. Schreibende Transaktionen mit record_changes warten daher, bis die
+    # Neuberechnung abgeschlossen ist, und die Zählung sieht alle zuvor committeten Tickets.
+    conn.execute(text(f"DELETE FROM {STATISTICS_TABLE}"))
+
+    rows = []
+    for dimension, column in DIMENSIONS.items():
+        result = conn.execute(text(
+            f"SELECT {column}, COUNT(*) FROM tickets WHERE {column} IS NOT NULL GROUP BY {column}"
+        ))
+        rows.extend(
+            {"dimension": dimension, "key": statistics_key(value), "count": count}
+            for value, count in result.fetchall()
+        )
+
+    if rows:
+        conn.execute(text(
+            f"INSERT INTO {STATISTICS_TABLE} (Dimension, Schluessel, Anzahl) VALUES (:dimension, :key, :count)"
+        ), rows)
+
+
+class TicketStatistics:
+    """
+    Vorberechnete Ticketzähler je Status, Priorität und Mitarbeiter in der Tabelle ticket_statistik.
+    Neue, geänderte und gelöschte Tickets passen die Zähler in derselben Transaktion an; Änderungen
+    außerhalb der Anwendung werden durch eine regelmäßige Neuberechnung im Hintergrund übernommen.
+    """
+
+    # Eine Statistik je Engine, damit alle Sitzungen denselben Stand verwenden
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, engine, refresh_interval=3600):
+        """
+        Initialisiert die Statistik.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            refresh_interval: Abstand der Neuberechnungen in Sekunden (optional, Standard: 3600)
+        """
+        self.engine = engine
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refreshed_at = time.monotonic()
+
+    @classmethod
+    def for_engine(cls, engine, refresh_interval=3600):
+        """
+        Gibt die gemeinsame Statistik für eine Engine zurück.
+
+        Args:
+            engine: SQLAlchemy-Engine
+            refresh_interval: Abstand der Neuberechnungen in Sekunden (optional, Standard: 3600)
+
+        Returns:
+            TicketStatistics: Gemeinsame Statistik
+        """
+        with cls._instances_lock:
+            statistics = cls._instances.get(engine)
+            if statistics is None:
+                statistics = cls(engine, refresh_interval)
+                cls._instances[engine] = statistics
+            return statistics
+
+    def _upsert_query(self):
+        if self.engine.dialect.name == "mysql":
+            return f"""
+            INSERT INTO {STATISTICS_TABLE} (Dimension, Schluessel, Anzahl) VALUES (:dimension, :key, :delta)
+            ON DUPLICATE KEY UPDATE Anzahl = Anzahl + VALUES(Anzahl)
+            """
+        return f"""
+        INSERT INTO {STATISTICS_TABLE} (Dimension, Schluessel, Anzahl) VALUES (:dimension, :key, :delta)
+        ON CONFLICT (Dimension, Schluessel) DO UPDATE SET Anzahl = Anzahl + excluded.Anzahl
+        """
+
+    def record_changes(self, conn, added=(), removed=()):
+        """
+        Passt die Zähler für neue, geänderte oder gelöschte Tickets an.
+        Muss in der Transaktion aufgerufen werden, die die Tickets schreibt.
+
+        Args:
+            conn: Offene Verbindung innerhalb der Transaktion
+            added: Neue Stände als (Status_ID, Priorität, Mitarbeiter_ID)-Tupel
+            removed: Alte Stände als (Status_ID, Priorität, Mitarbeiter_ID)-Tupel
+        """
+        deltas = Counter()
+        for sign, tickets in ((1, added), (-1, removed)):
+            for values in tickets:
+                for dimension, value in zip(DIMENSIONS, values):
+                    key = statistics_key(value)
+                    if key is not None:
+                        deltas[(dimension, key)] += sign
+
+        # Feste Reihenfolge, damit parallele Transaktionen die Zeilen gleich sperren
+        rows = [
+            {"dimension": dimension, "key": key, "delta": delta}
+            for (dimension, key), delta in sorted(deltas.items()) if delta
+        ]
+        if rows:
+            conn.execute(text(self._upsert_query()), rows)
+
+    def refresh(self):
+        """
+        Berechnet alle Zähler aus der Tabelle tickets neu.
+        """
+        with self._lock:
+            with self.engine.begin() as conn:
+                rebuild_statistics(conn)
+            self._refreshed_at = time.monotonic()
+
+    def _refresh_in_background(self):
+        # Läuft bereits eine Neuberechnung, nicht warten und keine zweite starten
+        if not self._lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                with self.engine.begin() as conn:
+                    rebuild_statistics(conn)
+                self._refreshed_at = time.monotonic()
+            except Exception as e:
+                print(f"Fehler beim Neuberechnen der Ticketstatistik: {str(e)}")
+            finally:
+                self._lock.release()
+
+        threading.Thread(target=run, name="ticket-statistics", daemon=True).start()
+
+    def get_counts(self):
+        """
+        Gibt die aktuellen Zähler zurück. Ist eine Neuberechnung fällig, läuft sie im Hintergrund,
+        und bis zu ihrem Abschluss werden die bisherigen Zähler geliefert.
+
+        Returns:
+            dict: Dimension -> {Schlüssel: Anzahl}
+        """
+        if time.monotonic() - self._refreshed_at > self.refresh_interval:
+            self._refresh_in_background()
+
+        counts = {dimension: {} for dimension in DIMENSIONS}
+        with self.engine.connect() as conn:
+            result = conn.execute(text(
+                f"SELECT Dimension, Schluessel, Anzahl FROM {STATISTICS_TABLE} WHERE Anzahl > 0"
+            ))
+            for dimension, key, count in result.fetchall():
+                if dimension in counts:
+                    counts[dimension][key] = count
+        return counts
@@ -5,6 +5,35 @@ import traceback
 from datetime import datetime
 import time
 from database_manager import DatabaseManager
+from ticket_import import read_ticket_file, DEFAULT_BATCH_SIZE
+from view_router import ViewRouter
+
+# Maximales Alter der Ansichts-Caches in Sekunden
+STATISTICS_CACHE_TTL = 30
+SETTINGS_CACHE_TTL = 300
+
+# Auflösungen der Verlaufsdiagramme
+TREND_GRANULARITIES = {"hour": "Stunde", "day": "Tag", "week": "Woche"}
+
+# Adressen der Reverse-Proxys, deren X-Forwarded-For-Angaben übernommen werden (z.B. {"127.0.0.1"}).
+# Ohne Eintrag zählt nur die Adresse der direkten Verbindung, da der Header frei gesetzt werden kann.
+TRUSTED_PROXIES = set()
+
+
+def build_ticket_labels(tickets_df):
+    """
+    Erzeugt die Beschriftungen für ein Ticket-Auswahlfeld in einem Durchlauf.
+    format_func schlägt je Option nur im Dictionary nach, statt den DataFrame zu durchsuchen.
+    
+    Args:
+        tickets_df: DataFrame mit den Spalten ID_Ticket und Titel
+        
+    Returns:
+        dict: ID_Ticket -> "#ID - Titel" in der Reihenfolge des DataFrames
+    """
+    labels = "#" + tickets_df["ID_Ticket"].astype(str) + " - " + tickets_df["Titel"].fillna("").astype(str)
+    return dict(zip(tickets_df["ID_Ticket"].tolist(), labels.tolist()))
+
 
 class TicketSystemUI:
     """
@@ -32,8 +61,8 @@ class TicketSystemUI:
             db_name="ticketsystemabkoo"
         )
         
-        # Sicherstellen, dass die erforderlichen Spalten existieren
-        self.db.ensure_required_columns_exist()
+        # Ausstehende Schema-Migrationen ausführen (nur einmal pro Prozess)
+        self.db.run_migrations()
         
         # Session-State initialisieren
         if "logged_in" not in st.session_state:
@@ -50,10 +79,12 @@ class TicketSystemUI:
         if not st.session_state.logged_in:
             # Passwort-Wiederherstellung anzeigen, falls angefordert
             if "show_password_reset" in st.session_state and st.session_state.show_password_reset:
-                self.show_password_reset_page()
+                with self.db.metrics.page("Passwort zurücksetzen"):
+                    self.show_password_reset_page()
             else:
                 # Ansonsten Login-Seite anzeigen
-                self.show_login_page()
+                with self.db.metrics.page("Anmeldung"):
+                    self.show_login_page()
         else:
             # Passwortänderung anzeigen, falls erforderlich
             if "password_change_required" in st.session_state and st.session_state.password_change_required and not st.session_state.get("password_changed", False):
@@ -83,10 +114,15 @@ class TicketSystemUI:
             submit = st.form_submit_button("Anmelden")
         
         if submit:
+            source = self.get_client_address()
+            retry_after = self.db.get_login_retry_after(username, source) if username else 0
+            
             if not username or not password:
                 st.error("Bitte geben Sie Benutzername und Passwort ein.")
+            elif retry_after > 0:
+                st.error(f"Zu viele fehlgeschlagene Anmeldeversuche. Bitte versuchen Sie es in {retry_after} Sekunden erneut.")
             else:
-                success, user_id, password_change_required = self.db.authenticate_user(username, password)
+                success, user_id, password_change_required = self.db.authenticate_user(username, password, source)
                 if success:
                     st.session_state.logged_in = True
                     st.session_state.user_id = user_id
@@ -107,6 +143,29 @@ class TicketSystemUI:
             st.session_state.show_password_reset = True
             st.rerun()
     
+    def get_client_address(self):
+        """
+        Ermittelt die IP-Adresse des Browsers für den Schutz vor Brute-Force-Angriffen.
+        
+        Returns:
+            str: IP-Adresse oder None, wenn sie nicht ermittelt werden kann
+        """
+        try:
+            address = getattr(st.context, "ip_address", None)
+            forwarded_for = st.context.headers.get("X-Forwarded-For")
+            if address not in TRUSTED_PROXIES or not forwarded_for:
+                return address
+            
+            # Von rechts lesen: Jeder vertrauenswürdige Proxy hängt die Adresse seines Gegenübers an,
+            # die erste nicht vertrauenswürdige ist der Browser (weiter links kann alles gefälscht sein)
+            for hop in reversed([hop.strip() for hop in forwarded_for.split(",") if hop.strip()]):
+                address = hop
+                if hop not in TRUSTED_PROXIES:
+                    break
+            return address
+        except Exception:
+            return None
+    
     def show_password_reset_page(self):
         """
         Zeigt die Passwort-Wiederherstellungsseite an.
@@ -212,12 +271,46 @@ class TicketSystemUI:
                 "Modus wählen:",
                 ["Ticketsystem", "Datenbankverwaltung"]
             )
+            
+            # Abfragemetriken der bisherigen Seitenaufrufe
+            self.show_query_metrics()
         
         # Hauptinhalt basierend auf dem gewählten Modus
         if app_mode == "Ticketsystem":
             self.show_ticket_system()
         else:  # app_mode == "Datenbankverwaltung"
-            self.show_database_management()
+            with self.db.metrics.page("Datenbankverwaltung"):
+                self.show_database_management()
+    
+    def show_query_metrics(self):
+        """
+        Zeigt die Kennzahlen der Datenbankabfragen je Seite an.
+        """
+        with st.expander("📈 Abfragemetriken"):
+            snapshot = self.db.metrics.snapshot()
+            
+            if not snapshot["queries"]:
+                st.info("Noch keine Abfragen gemessen.")
+                return
+            
+            queries_df = pd.DataFrame(snapshot["queries"])
+            
+            # Gesamtlaufzeit je Seite
+            per_page = queries_df.groupby("page")[["count", "total_seconds", "rows", "bytes", "slow"]].sum()
+            st.dataframe(per_page.sort_values("total_seconds", ascending=False), use_container_width=True)
+            
+            # Teuerste Abfragen
+            st.dataframe(
+                queries_df[["page", "sql", "count", "total_seconds", "p95_seconds", "rows", "errors", "slow"]].head(20),
+                use_container_width=True
+            )
+            
+            if snapshot["pool_wait"]:
+                st.write("Wartezeit auf Verbindungen")
+                st.dataframe(pd.DataFrame(snapshot["pool_wait"]).T, use_container_width=True)
+            
+            st.download_button("Prometheus-Export", self.db.metrics.to_prometheus(), file_name="metrics.txt")
+            st.download_button("JSON-Export", self.db.metrics.to_json(), file_name="metrics.json")
     
     def show_ticket_system(self):
         """
@@ -225,24 +318,15 @@ class TicketSystemUI:
         """
         st.title("🎫 Ticketsystem")
         
-        # Tabs für verschiedene Funktionen
-        ticket_tabs = st.tabs(["📋 Ticketübersicht", "➕ Neues Ticket", "📊 Statistiken", "⚙️ Einstellungen"])
-        
-        # Tab: Ticketübersicht
-        with ticket_tabs[0]:
-            self.show_ticket_overview()
-        
-        # Tab: Neues Ticket
-        with ticket_tabs[1]:
-            self.show_new_ticket_form()
-        
-        # Tab: Statistiken
-        with ticket_tabs[2]:
-            self.show_ticket_statistics()
-        
-        # Tab: Einstellungen
-        with ticket_tabs[3]:
-            self.show_settings()
+        # Ansichten: nur die gewählte Ansicht wird ausgeführt und lädt Daten
+        self.ticket_router = ViewRouter("ticket_view", [
+            ("📋 Ticketübersicht", self.show_ticket_overview, "Ticketübersicht"),
+            ("➕ Neues Ticket", self.show_new_ticket_form, "Neues Ticket"),
+            ("📥 Import", self.show_ticket_import, "Import"),
+            ("📊 Statistiken", self.show_ticket_statistics, "Statistiken"),
+            ("⚙️ Einstellungen", self.show_settings, "Einstellungen"),
+        ], metrics=self.db.metrics)
+        self.ticket_router.render()
     
     def show_ticket_overview(self):
         """
@@ -272,71 +356,60 @@ class TicketSystemUI:
             status_filter = st.selectbox("Status", status_options)
         
         with col2:
-            priority_options = ["Alle", "Hoch", "Mittel", "Niedrig"]
+            priority_options = ["Alle"] + self.db.get_prioritaeten_options()
             priority_filter = st.selectbox("Priorität", priority_options)
         
         with col3:
             mitarbeiter_options = ["Alle"] + self.db.get_mitarbeiter_options()
             mitarbeiter_filter = st.selectbox("Mitarbeiter", mitarbeiter_options)
         
-        # SQL-Query mit dynamischen Filtern
-        query = """
-        SELECT t.ID_Ticket, t.Titel, t.Beschreibung, t.Priorität, 
-               s.Name as Status, m.Name as Mitarbeiter, k.Name as Kunde,
-               t.Erstellt_am, t.Geändert_am
-        FROM tickets t
-        LEFT JOIN status s ON t.Status_ID = s.ID_Status
-        LEFT JOIN mitarbeiter m ON t.Mitarbeiter_ID = m.ID_Mitarbeiter
-        LEFT JOIN kunden k ON t.Kunde_ID = k.ID_Kunde
-        WHERE 1=1
-        """
-        
-        params = {}
+        # Filter zusammenstellen (Namen über den Stammdaten-Cache in IDs auflösen)
+        filters = {"search_term": search_term, "search_field": search_field}
         
-        # Filter anwenden
         if status_filter != "Alle":
-            query += " AND s.Name = :status"
-            params["status"] = status_filter
+            filters["status_id"] = self.db.get_lookup("status").name_to_id.get(status_filter)
         
         if priority_filter != "Alle":
-            query += " AND t.Priorität = :priority"
-            params["priority"] = priority_filter
+            filters["prioritaet"] = priority_filter
         
         if mitarbeiter_filter != "Alle":
-            query += " AND m.Name = :mitarbeiter"
-            params["mitarbeiter"] = mitarbeiter_filter
-        
-        # Suchbegriff anwenden
-        if search_term:
-            if search_field == "Alle Felder":
-                query += """ AND (
-                    t.Titel LIKE :search_term OR 
-                    t.Beschreibung LIKE :search_term OR 
-                    k.Name LIKE :search_term OR 
-                    m.Name LIKE :search_term
-                )"""
-                params["search_term"] = f"%{search_term}%"
-            elif search_field == "Titel":
-                query += " AND t.Titel LIKE :search_term"
-                params["search_term"] = f"%{search_term}%"
-            elif search_field == "Beschreibung":
-                query += " AND t.Beschreibung LIKE :search_term"
-                params["search_term"] = f"%{search_term}%"
-            elif search_field == "Kunde":
-                query += " AND k.Name LIKE :search_term"
-                params["search_term"] = f"%{search_term}%"
-            elif search_field == "Mitarbeiter":
-                query += " AND m.Name LIKE :search_term"
-                params["search_term"] = f"%{search_term}%"
-        
-        # Sortierung
-        query += " ORDER BY t.Erstellt_am DESC"
-        
-        # Tickets abrufen
-        tickets_df = self.db.execute_query_to_df(query, params)
+            filters["mitarbeiter_id"] = self.db.get_lookup("mitarbeiter").name_to_id.get(mitarbeiter_filter)
+        
+        page_size = st.selectbox("Tickets pro Seite", [25, 50, 100, 200], index=1)
+        
+        # Paginierung zurücksetzen, sobald sich Filter oder Seitengröße ändern
+        filter_key = (tuple(sorted(filters.items())), page_size)
+        pagination = st.session_state.get("ticket_pagination")
+        if pagination is None or pagination["filter_key"] != filter_key:
+            pagination = {"filter_key": filter_key, "cursor": None, "direction": "next", "page": 1}
+            st.session_state.ticket_pagination = pagination
+        
+        # Volltextsuche: Treffer einmal pro Suchanfrage nach Relevanz sortiert laden
+        if search_term and "ranked" not in pagination:
+            pagination["ranked"] = self.db.search_tickets(filters)
+        ranked = pagination.get("ranked")
+        
+        if ranked is not None:
+            # Seite aus der Trefferliste schneiden
+            start = (pagination["page"] - 1) * page_size
+            page_items = ranked[start:start + page_size]
+            tickets_df = self.db.get_tickets_by_ids([ticket_id for ticket_id, _ in page_items])
+            if not tickets_df.empty:
+                tickets_df.insert(1, "Relevanz", tickets_df["ID_Ticket"].map(dict(page_items)).round(3))
+            has_more = start + page_size < len(ranked)
+            total, is_estimate = len(ranked), False
+        else:
+            # Aktuelle Seite und Gesamtanzahl abrufen
+            tickets_df, has_more = self.db.get_ticket_page(
+                filters,
+                page_size=page_size,
+                cursor=pagination["cursor"],
+                direction=pagination["direction"]
+            )
+            total, is_estimate = self.db.count_tickets(filters)
         
         # Anzeige der Tickets
-        st.write(f"**{len(tickets_df)} Tickets gefunden**")
+        st.write(f"**{'ca. ' if is_estimate else ''}{total} Tickets gefunden**")
         
         if tickets_df.empty:
             if search_term:
@@ -347,41 +420,67 @@ class TicketSystemUI:
             # Ticket-Tabelle anzeigen
             st.dataframe(tickets_df, use_container_width=True)
             
+            # Navigation zwischen den Seiten
+            has_previous = pagination["page"] > 1
+            has_next = has_more if ranked is not None or pagination["direction"] == "next" else True
+            
+            nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+            
+            with nav_col1:
+                if st.button("◀ Zurück", disabled=not has_previous, key="ticket_page_prev"):
+                    pagination["page"] -= 1
+                    if ranked is None:
+                        if pagination["page"] == 1:
+                            pagination["cursor"] = None
+                            pagination["direction"] = "next"
+                        else:
+                            first_row = tickets_df.iloc[0]
+                            pagination["cursor"] = (pd.Timestamp(first_row["Erstellt_am"]).to_pydatetime(), int(first_row["ID_Ticket"]))
+                            pagination["direction"] = "prev"
+                    st.rerun()
+            
+            with nav_col2:
+                pages = max(1, -(-total // page_size))
+                st.write(f"Seite {pagination['page']} von {'ca. ' if is_estimate else ''}{pages}")
+            
+            with nav_col3:
+                if st.button("Weiter ▶", disabled=not has_next, key="ticket_page_next"):
+                    pagination["page"] += 1
+                    if ranked is None:
+                        last_row = tickets_df.iloc[-1]
+                        pagination["cursor"] = (pd.Timestamp(last_row["Erstellt_am"]).to_pydatetime(), int(last_row["ID_Ticket"]))
+                        pagination["direction"] = "next"
+                    st.rerun()
+            
             # Ticket-Details anzeigen
             if "selected_ticket_id" not in st.session_state:
                 st.session_state.selected_ticket_id = None
             
-            # Ticket auswählen
+            # Ticket auswählen (Beschriftungen einmal je Seite aufbauen statt je Option zu filtern)
+            tickets_by_id = tickets_df.set_index("ID_Ticket")
+            ticket_labels = build_ticket_labels(tickets_df)
             selected_ticket = st.selectbox(
                 "Ticket auswählen",
-                tickets_df["ID_Ticket"].tolist(),
-                format_func=lambda x: f"#{x} - {tickets_df[tickets_df['ID_Ticket'] == x]['Titel'].iloc[0]}"
+                list(ticket_labels),
+                format_func=ticket_labels.get
             )
             
             if selected_ticket:
                 st.session_state.selected_ticket_id = selected_ticket
-                self.show_ticket_details(selected_ticket)
+                # Geändert_am aus der Übersicht prüft den Cache ohne zusätzliche Abfrage
+                modified = tickets_by_id.at[selected_ticket, "Geändert_am"]
+                self.show_ticket_details(selected_ticket, modified)
     
-    def show_ticket_details(self, ticket_id):
+    def show_ticket_details(self, ticket_id, modified=None):
         """
         Zeigt die Details eines Tickets an.
         
         Args:
             ticket_id: ID des Tickets
+            modified: Geändert_am aus der Ticketübersicht (optional, für den Detail-Cache)
         """
-        # Ticket-Details abrufen
-        query = """
-        SELECT t.ID_Ticket, t.Titel, t.Beschreibung, t.Priorität, 
-               s.Name as Status, m.Name as Mitarbeiter, k.Name as Kunde,
-               t.Erstellt_am, t.Geändert_am
-        FROM tickets t
-        LEFT JOIN status s ON t.Status_ID = s.ID_Status
-        LEFT JOIN mitarbeiter m ON t.Mitarbeiter_ID = m.ID_Mitarbeiter
-        LEFT JOIN kunden k ON t.Kunde_ID = k.ID_Kunde
-        WHERE t.ID_Ticket = :ticket_id
-        """
-        
-        ticket_df = self.db.execute_query_to_df(query, {"ticket_id": ticket_id})
+        # Ticket-Details und neueste Kommentare abrufen (aus dem Cache, solange sich das Ticket nicht ändert)
+        ticket_df, comments_df, comment_count = self.db.get_ticket_details(ticket_id, modified)
         
         if not ticket_df.empty:
             ticket = ticket_df.iloc[0]
@@ -407,31 +506,44 @@ class TicketSystemUI:
             st.write("**Beschreibung:**")
             st.write(ticket['Beschreibung'])
             
-            # Kommentare abrufen
+            # Kommentare
             st.markdown("---")
             st.subheader("Kommentare")
             
-            comments_query = """
-            SELECT k.ID_Kommentar, k.Kommentar, m.Name AS Mitarbeiter, k.Erstellt_am
-            FROM kommentare k
-            JOIN mitarbeiter m ON k.Mitarbeiter_ID = m.ID_Mitarbeiter
-            WHERE k.Ticket_ID = :ticket_id
-            ORDER BY k.Erstellt_am DESC
-            """
-            
-            comments_df = self.db.execute_query_to_df(comments_query, {"ticket_id": ticket_id})
+            # Ältere Seiten werden erst auf Anforderung geladen und bleiben in der Sitzung,
+            # bis sich die Anzahl der Kommentare ändert
+            thread_key = f"comment_thread_{ticket_id}"
+            thread = st.session_state.get(thread_key)
+            if thread is None or thread["count"] != comment_count:
+                thread = {"count": comment_count, "pages": []}
+                st.session_state[thread_key] = thread
             
             if comments_df.empty:
                 st.info("Keine Kommentare vorhanden.")
             else:
-                for _, comment in comments_df.iterrows():
-                    st.markdown(f"""
-                    **{comment['Mitarbeiter']}** - {comment['Erstellt_am']}
-                    
-                    {comment['Kommentar']}
-                    
-                    ---
-                    """)
+                for page_df in [comments_df] + thread["pages"]:
+                    for _, comment in page_df.iterrows():
+                        st.markdown(f"""
+                        **{comment['Mitarbeiter']}** - {comment['Erstellt_am']}
+                        
+                        {comment['Kommentar']}
+                        
+                        ---
+                        """)
+                
+                loaded = len(comments_df) + sum(len(page_df) for page_df in thread["pages"])
+                if loaded < comment_count:
+                    st.caption(f"{loaded} von {comment_count} Kommentaren")
+                    if st.button("Ältere Kommentare laden", key=f"older_comments_{ticket_id}"):
+                        last_row = (thread["pages"] or [comments_df])[-1].iloc[-1]
+                        cursor = (pd.Timestamp(last_row["Erstellt_am"]).to_pydatetime(), int(last_row["ID_Kommentar"]))
+                        older_df, _ = self.db.get_ticket_comments(ticket_id, cursor=cursor)
+                        if older_df.empty:
+                            # Anzahl veraltet (Kommentare zwischenzeitlich gelöscht), neu zählen
+                            self.db.invalidate_ticket_details(ticket_id)
+                        else:
+                            thread["pages"].append(older_df)
+                        st.rerun()
             
             # Neuen Kommentar hinzufügen
             st.subheader("Neuer Kommentar")
@@ -444,17 +556,8 @@ class TicketSystemUI:
                 if not comment_text:
                     st.error("Bitte geben Sie einen Kommentar ein.")
                 else:
-                    # Kommentar hinzufügen
-                    insert_query = """
-                    INSERT INTO kommentare (Ticket_ID, Mitarbeiter_ID, Kommentar, Erstellt_am)
-                    VALUES (:ticket_id, :mitarbeiter_id, :kommentar, NOW())
-                    """
-                    
-                    success = self.db.execute_query(insert_query, {
-                        "ticket_id": ticket_id,
-                        "mitarbeiter_id": st.session_state.user_id,
-                        "kommentar": comment_text
-                    })
+                    # Kommentar hinzufügen (verwirft die zwischengespeicherten Details)
+                    success = self.db.add_ticket_comment(ticket_id, st.session_state.user_id, comment_text)
                     
                     if success:
                         st.success("Kommentar erfolgreich hinzugefügt!")
@@ -468,6 +571,12 @@ class TicketSystemUI:
         """
         st.subheader("➕ Neues Ticket erstellen")
         
+        # Status, Kunden und Mitarbeiter aus dem Stammdaten-Cache, fehlende Tabellen parallel laden
+        lookups = self.db.get_lookups(["status", "kunden", "mitarbeiter"])
+        status_lookup = lookups["status"]
+        kunden_lookup = lookups["kunden"]
+        mitarbeiter_lookup = lookups["mitarbeiter"]
+        
         # Formular zum Erstellen eines neuen Tickets
         with st.form("new_ticket_form"):
             # Titel und Beschreibung
@@ -478,32 +587,12 @@ class TicketSystemUI:
             col1, col2 = st.columns(2)
             
             with col1:
-                prioritaet = st.selectbox("Priorität", ["Hoch", "Mittel", "Niedrig"])
-                
-                # Status abrufen
-                status_query = "SELECT ID_Status, Name FROM status ORDER BY ID_Status"
-                status_df = self.db.execute_query_to_df(status_query)
-                status_options = status_df["Name"].tolist()
-                status_ids = status_df["ID_Status"].tolist()
-                
-                status = st.selectbox("Status", status_options)
+                prioritaet = st.selectbox("Priorität", self.db.get_prioritaeten_options())
+                status = st.selectbox("Status", status_lookup.names)
             
             with col2:
-                # Kunden abrufen
-                kunden_query = "SELECT ID_Kunde, Name FROM kunden ORDER BY Name"
-                kunden_df = self.db.execute_query_to_df(kunden_query)
-                kunden_options = kunden_df["Name"].tolist()
-                kunden_ids = kunden_df["ID_Kunde"].tolist()
-                
-                kunde = st.selectbox("Kunde", kunden_options)
-                
-                # Mitarbeiter abrufen
-                mitarbeiter_query = "SELECT ID_Mitarbeiter, Name FROM mitarbeiter ORDER BY Name"
-                mitarbeiter_df = self.db.execute_query_to_df(mitarbeiter_query)
-                mitarbeiter_options = mitarbeiter_df["Name"].tolist()
-                mitarbeiter_ids = mitarbeiter_df["ID_Mitarbeiter"].tolist()
-                
-                mitarbeiter = st.selectbox("Mitarbeiter", mitarbeiter_options)
+                kunde = st.selectbox("Kunde", kunden_lookup.names)
+                mitarbeiter = st.selectbox("Mitarbeiter", mitarbeiter_lookup.names)
             
             # Submit-Button
             submit = st.form_submit_button("Ticket erstellen")
@@ -513,75 +602,99 @@ class TicketSystemUI:
                 st.error("Bitte füllen Sie alle Pflichtfelder aus.")
             else:
                 # IDs ermitteln
-                status_id = status_ids[status_options.index(status)]
-                kunde_id = kunden_ids[kunden_options.index(kunde)]
-                mitarbeiter_id = mitarbeiter_ids[mitarbeiter_options.index(mitarbeiter)]
+                status_id = status_lookup.name_to_id[status]
+                kunde_id = kunden_lookup.name_to_id[kunde]
+                mitarbeiter_id = mitarbeiter_lookup.name_to_id[mitarbeiter]
                 
-                # Ticket erstellen
-                insert_query = """
-                INSERT INTO tickets (Titel, Beschreibung, Priorität, Status_ID, Kunde_ID, Mitarbeiter_ID, Erstellt_am, Geändert_am)
-                VALUES (:titel, :beschreibung, :prioritaet, :status_id, :kunde_id, :mitarbeiter_id, NOW(), NOW())
-                """
+                # Ticket erstellen (inkl. Zuordnungen, Statistik und Volltextsuche)
+                ticket_id = self.db.create_ticket(titel, beschreibung, prioritaet, status_id, kunde_id, mitarbeiter_id)
                 
-                try:
-                    result = self.db.execute_transaction(insert_query, {
-                        "titel": titel,
-                        "beschreibung": beschreibung,
-                        "prioritaet": prioritaet,
-                        "status_id": status_id,
-                        "kunde_id": kunde_id,
-                        "mitarbeiter_id": mitarbeiter_id
-                    })
-                    
-                    if result:
-                        # Ticket-ID abrufen
-                        ticket_id = result.lastrowid
-                        
-                        # Automatische Einträge in ticket_mitarbeiter und ticket_kategorie
-                        self.db.create_ticket_relations(ticket_id, mitarbeiter_id)
-                        
-                        st.success(f"Ticket #{ticket_id} erfolgreich erstellt!")
-                    else:
-                        st.error("Fehler beim Erstellen des Tickets.")
-                except Exception as e:
-                    st.error(f"Fehler beim Erstellen des Tickets: {str(e)}")
+                if ticket_id:
+                    self.ticket_router.invalidate("Statistiken")
+                    st.success(f"Ticket #{ticket_id} erfolgreich erstellt!")
+                else:
+                    st.error("Fehler beim Erstellen des Tickets.")
     
-    def show_ticket_statistics(self):
+    def show_ticket_import(self):
         """
-        Zeigt Statistiken zu den Tickets an.
+        Zeigt den Massenimport von Tickets aus CSV-, JSON- oder Parquet-Dateien an.
         """
-        st.subheader("📊 Ticket-Statistiken")
+        st.subheader("📥 Tickets importieren")
+        st.caption(
+            "Spalten: Titel, Beschreibung, Priorität, Status, Kunde, Mitarbeiter "
+            "(Namen oder Status_ID, Kunde_ID, Mitarbeiter_ID), Kategorie_ID, Erstellt_am"
+        )
         
-        # Statistiken abrufen
+        uploaded_file = st.file_uploader("Importdatei", type=["csv", "json", "jsonl", "parquet"], key="ticket_import_file")
+        if uploaded_file is None:
+            return
         
-        # Tickets nach Status
-        status_query = """
-        SELECT s.Name AS Status, COUNT(*) AS Anzahl
-        FROM tickets t
-        JOIN status s ON t.Status_ID = s.ID_Status
-        GROUP BY s.Name
-        """
+        try:
+            df = read_ticket_file(uploaded_file)
+        except ImportError:
+            st.error("Für Parquet-Dateien wird pyarrow oder fastparquet benötigt.")
+            return
+        except Exception as e:
+            st.error(f"Fehler beim Lesen der Datei: {str(e)}")
+            return
         
-        status_stats_df = self.db.execute_query_to_df(status_query)
-        
-        # Tickets nach Priorität
-        prioritaet_query = """
-        SELECT Priorität, COUNT(*) AS Anzahl
-        FROM tickets
-        GROUP BY Priorität
-        """
+        st.write(f"{len(df)} Zeilen gelesen. Vorschau:")
+        st.dataframe(df.head(20))
         
-        prioritaet_stats_df = self.db.execute_query_to_df(prioritaet_query)
+        col1, col2 = st.columns(2)
+        with col1:
+            batch_size = st.number_input("Blockgröße", min_value=1, max_value=50000, value=DEFAULT_BATCH_SIZE, step=500)
+        with col2:
+            use_load_data = st.checkbox(
+                "LOAD DATA LOCAL INFILE verwenden",
+                disabled=self.db.engine.dialect.name != "mysql",
+                help="Schneller für große Dateien; der MySQL-Server muss local_infile erlauben."
+            )
         
-        # Tickets nach Mitarbeiter
-        mitarbeiter_query = """
-        SELECT m.Name AS Mitarbeiter, COUNT(*) AS Anzahl
-        FROM tickets t
-        JOIN mitarbeiter m ON t.Mitarbeiter_ID = m.ID_Mitarbeiter
-        GROUP BY m.Name
+        if st.button("Import starten", key="ticket_import_start"):
+            progress = st.progress(0.0)
+            report = self.db.import_tickets(
+                df, batch_size=int(batch_size), use_load_data=use_load_data,
+                progress_callback=lambda done, total: progress.progress(done / total if total else 1.0)
+            )
+            progress.progress(1.0)
+            if report.imported:
+                self.ticket_router.invalidate("Statistiken")
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Importiert", report.imported)
+            col2.metric("Fehlerhaft", report.failed)
+            col3.metric("Zeilen/s", f"{report.rows_per_second:,.0f}")
+            st.caption(f"{report.batches} Blöcke in {report.duration:.2f} s")
+            
+            for warning in report.warnings:
+                st.warning(warning)
+            
+            if report.failed:
+                st.error(f"{report.failed} Zeilen wurden nicht importiert:")
+                st.dataframe(report.errors)
+                st.download_button(
+                    "Fehler als CSV herunterladen",
+                    report.errors.to_csv(index=False),
+                    file_name="import_fehler.csv",
+                    mime="text/csv"
+                )
+            elif report.imported:
+                st.success("Alle Zeilen wurden importiert.")
+    
+    def show_ticket_statistics(self):
         """
+        Zeigt Statistiken zu den Tickets an.
+        """
+        st.subheader("📊 Ticket-Statistiken")
         
-        mitarbeiter_stats_df = self.db.execute_query_to_df(mitarbeiter_query)
+        # Statistiken abrufen (Tickets nach Status, Priorität und Mitarbeiter), kurz in der Sitzung zwischengespeichert
+        statistics = self.ticket_router.cached(
+            "Statistiken", "zaehler", self.db.get_ticket_statistics, ttl=STATISTICS_CACHE_TTL
+        )
+        status_stats_df = statistics["status"]
+        prioritaet_stats_df = statistics["prioritaet"]
+        mitarbeiter_stats_df = statistics["mitarbeiter"]
         
         # Statistiken anzeigen
         if not status_stats_df.empty and not prioritaet_stats_df.empty and not mitarbeiter_stats_df.empty:
@@ -632,31 +745,109 @@ class TicketSystemUI:
                 st.altair_chart(prioritaet_chart, use_container_width=True)
         else:
             st.info("Keine Statistiken verfügbar. Erstellen Sie zuerst einige Tickets.")
+        
+        self.show_ticket_trends()
     
-    def show_settings(self):
+    def show_ticket_trends(self):
         """
-        Zeigt die Einstellungsseite an.
+        Zeigt den zeitlichen Verlauf der Tickets aus den vorverdichteten Rollups an.
         """
-        st.subheader("⚙️ Einstellungen")
+        st.subheader("📈 Verlauf")
         
-        # Tabs für verschiedene Einstellungen
-        settings_tabs = st.tabs(["👤 Mitarbeiter", "🏢 Kunden", "🏷️ Kategorien", "📋 Status"])
+        col1, col2 = st.columns(2)
+        with col1:
+            granularity = st.selectbox(
+                "Auflösung", list(TREND_GRANULARITIES), index=1,
+                format_func=lambda key: TREND_GRANULARITIES[key], key="trend_granularity"
+            )
+        with col2:
+            days = st.selectbox(
+                "Zeitraum", [7, 30, 90, 365], index=1,
+                format_func=lambda value: f"Letzte {value} Tage", key="trend_days"
+            )
         
-        # Tab: Mitarbeiter
-        with settings_tabs[0]:
-            self.show_mitarbeiter_settings()
+        # Stundenwerte über ein Jahr wären zu viele Punkte für ein Diagramm
+        if granularity == "hour" and days > 30:
+            st.info("Stündliche Auflösung ist auf 30 Tage begrenzt.")
+            days = 30
         
-        # Tab: Kunden
-        with settings_tabs[1]:
-            self.show_kunden_settings()
+        trends = self.ticket_router.cached(
+            "Statistiken", f"verlauf_{granularity}_{days}",
+            lambda: self.db.get_ticket_trends(granularity, days), ttl=STATISTICS_CACHE_TTL
+        )
         
-        # Tab: Kategorien
-        with settings_tabs[2]:
-            self.show_kategorien_settings()
+        if trends["verlauf"].empty:
+            st.info("Für diesen Zeitraum liegen keine Daten vor.")
+            return
         
-        # Tab: Status
-        with settings_tabs[3]:
-            self.show_status_settings()
+        # Neue und erledigte Tickets je Zeitraum
+        verlauf_df = trends["verlauf"].melt(
+            id_vars="Zeitraum", value_vars=["erstellt", "erledigt"], var_name="Kennzahl", value_name="Anzahl"
+        )
+        verlauf_chart = alt.Chart(verlauf_df).mark_line(point=True).encode(
+            x=alt.X("Zeitraum:T", title=None),
+            y=alt.Y("Anzahl:Q"),
+            color=alt.Color("Kennzahl:N", title=None),
+            tooltip=["Zeitraum:T", "Kennzahl:N", "Anzahl:Q"]
+        ).properties(height=300, title="Neue und erledigte Tickets")
+        st.altair_chart(verlauf_chart, use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Offene Tickets am Ende jedes Zeitraums
+            bestand_chart = alt.Chart(trends["bestand"]).mark_area(opacity=0.6).encode(
+                x=alt.X("Zeitraum:T", title=None),
+                y=alt.Y("Offen:Q"),
+                tooltip=["Zeitraum:T", "Offen:Q"]
+            ).properties(height=300, title="Offene Tickets")
+            st.altair_chart(bestand_chart, use_container_width=True)
+        
+        with col2:
+            # Erledigte Tickets je Mitarbeiter
+            durchsatz_df = trends["durchsatz"]
+            if durchsatz_df.empty:
+                st.info("Im Zeitraum wurden keine Tickets erledigt.")
+            else:
+                durchsatz_chart = alt.Chart(durchsatz_df).mark_bar().encode(
+                    x=alt.X("Zeitraum:T", title=None),
+                    y=alt.Y("sum(Anzahl):Q", title="Erledigt"),
+                    color=alt.Color("Mitarbeiter:N"),
+                    tooltip=["Zeitraum:T", "Mitarbeiter:N", "Anzahl:Q"]
+                ).properties(height=300, title="Durchsatz je Mitarbeiter")
+                st.altair_chart(durchsatz_chart, use_container_width=True)
+    
+    def show_settings(self):
+        """
+        Zeigt die Einstellungsseite an.
+        """
+        st.subheader("⚙️ Einstellungen")
+        
+        # Unteransichten: nur die gewählte Stammdatentabelle wird geladen
+        self.settings_router = ViewRouter("settings_view", [
+            ("👤 Mitarbeiter", self.show_mitarbeiter_settings),
+            ("🏢 Kunden", self.show_kunden_settings),
+            ("🏷️ Kategorien", self.show_kategorien_settings),
+            ("📋 Status", self.show_status_settings),
+        ])
+        self.settings_router.render()
+    
+    def load_settings_table(self, table, query):
+        """
+        Lädt eine Stammdatentabelle für die Einstellungen aus dem Cache der Ansicht.
+        Nach Änderungen über invalidate_reference_data wird sie neu geladen.
+        
+        Args:
+            table: Name der Tabelle
+            query: SQL-Abfrage für die Anzeige
+            
+        Returns:
+            pandas.DataFrame: Inhalt der Tabelle
+        """
+        return self.settings_router.cached(
+            table, "tabelle", lambda: self.db.execute_query_to_df(query),
+            version=self.db.get_reference_data_version(table), ttl=SETTINGS_CACHE_TTL
+        )
     
     def show_mitarbeiter_settings(self):
         """
@@ -666,7 +857,7 @@ class TicketSystemUI:
         
         # Mitarbeiter abrufen
         mitarbeiter_query = "SELECT ID_Mitarbeiter, Name, Email FROM mitarbeiter ORDER BY Name"
-        mitarbeiter_df = self.db.execute_query_to_df(mitarbeiter_query)
+        mitarbeiter_df = self.load_settings_table("mitarbeiter", mitarbeiter_query)
         
         # Mitarbeiter anzeigen
         if not mitarbeiter_df.empty:
@@ -705,6 +896,7 @@ class TicketSystemUI:
                 })
                 
                 if success:
+                    self.db.invalidate_reference_data("mitarbeiter")
                     st.success(f"Mitarbeiter {name} erfolgreich hinzugefügt!")
                     st.rerun()
                 else:
@@ -718,7 +910,7 @@ class TicketSystemUI:
         
         # Kunden abrufen
         kunden_query = "SELECT ID_Kunde, Name, Email, Telefon FROM kunden ORDER BY Name"
-        kunden_df = self.db.execute_query_to_df(kunden_query)
+        kunden_df = self.load_settings_table("kunden", kunden_query)
         
         # Kunden anzeigen
         if not kunden_df.empty:
@@ -752,6 +944,7 @@ class TicketSystemUI:
                 })
                 
                 if success:
+                    self.db.invalidate_reference_data("kunden")
                     st.success(f"Kunde {name} erfolgreich hinzugefügt!")
                     st.rerun()
                 else:
@@ -765,7 +958,7 @@ class TicketSystemUI:
         
         # Kategorien abrufen
         kategorien_query = "SELECT ID_Kategorie, Name, Beschreibung FROM kategorien ORDER BY Name"
-        kategorien_df = self.db.execute_query_to_df(kategorien_query)
+        kategorien_df = self.load_settings_table("kategorien", kategorien_query)
         
         # Kategorien anzeigen
         if not kategorien_df.empty:
@@ -797,6 +990,7 @@ class TicketSystemUI:
                 })
                 
                 if success:
+                    self.db.invalidate_reference_data("kategorien")
                     st.success(f"Kategorie {name} erfolgreich hinzugefügt!")
                     st.rerun()
                 else:
@@ -810,7 +1004,7 @@ class TicketSystemUI:
         
         # Status abrufen
         status_query = "SELECT ID_Status, Name, Beschreibung FROM status ORDER BY ID_Status"
-        status_df = self.db.execute_query_to_df(status_query)
+        status_df = self.load_settings_table("status", status_query)
         
         # Status anzeigen
         if not status_df.empty:
@@ -842,6 +1036,7 @@ class TicketSystemUI:
                 })
                 
                 if success:
+                    self.db.invalidate_reference_data("status")
                     st.success(f"Status {name} erfolgreich hinzugefügt!")
                     st.rerun()
                 else:
@@ -875,11 +1070,12 @@ class TicketSystemUI:
             if 'search_results' in st.session_state and st.session_state.search_results is not None:
                 data_df = st.session_state.search_results
             else:
-                query = f"SELECT * FROM {selected_table}"
-                data_df = self.db.execute_query_to_df(query)
+                # Nur die aktuelle Seite vom Server laden
+                data_df = self.show_table_browser(selected_table, primary_key)
             
             if not data_df.empty:
-                st.dataframe(data_df, use_container_width=True)
+                if 'search_results' in st.session_state and st.session_state.search_results is not None:
+                    st.dataframe(data_df, use_container_width=True)
                 
                 if primary_key and primary_key in data_df.columns:
                     record_id = st.selectbox(
@@ -887,13 +1083,14 @@ class TicketSystemUI:
                         data_df[primary_key].tolist()
                     )
                     
-                    if record_id:
-                        record = data_df[data_df[primary_key] == record_id].iloc[0]
-                        
+                    # Datensatz erst bei Auswahl über den Primärschlüssel laden
+                    record = self.db.get_record(selected_table, primary_key, record_id) if record_id else None
+                    
+                    if record is not None:
                         with st.form(f"edit_{selected_table}_form"):
                             edited_values = {}
                             
-                            for col in data_df.columns:
+                            for col in record.index:
                                 if col != primary_key:  # Primärschlüssel nicht bearbeiten
                                     edited_values[col] = st.text_input(col, value=str(record[col]) if pd.notna(record[col]) else "")
                             
@@ -905,35 +1102,28 @@ class TicketSystemUI:
                                 if value == "":
                                     edited_values[key] = None
                             
-                            # Update-Query erstellen
-                            set_clauses = [f"{col} = :{col}" for col in edited_values.keys()]
-                            
-                            query = f"UPDATE {selected_table} SET {', '.join(set_clauses)} WHERE {primary_key} = :primary_key"
-                            
-                            # Parameter für die Query
-                            params = {**edited_values, "primary_key": record_id}
-                            
-                            try:
-                                self.db.execute_query(query, params)
+                            # Bei Tickets passt update_record die Statistikzähler mit an
+                            if self.db.update_record(selected_table, primary_key, record_id, edited_values,
+                                                     changed_by=st.session_state.get("user_id")):
+                                self.db.invalidate_reference_data(selected_table)
                                 st.success("Datensatz erfolgreich aktualisiert!")
                                 st.rerun()
-                            except Exception as e:
-                                st.error(f"Fehler beim Aktualisieren des Datensatzes: {str(e)}")
+                            else:
+                                st.error("Fehler beim Aktualisieren des Datensatzes.")
             else:
                 st.info(f"Keine Daten in der Tabelle {selected_table}.")
             
             # Neuen Datensatz hinzufügen
             st.subheader("Neuen Datensatz hinzufügen")
             
-            # Spalten und Typen ermitteln
+            # Spalten ermitteln
             columns = self.db.get_columns(selected_table)
-            column_types = self.db.get_column_types(selected_table)
             
             with st.form(f"add_{selected_table}_form"):
                 new_values = {}
                 
                 for col in columns:
-                    if primary_key and col == primary_key and "auto_increment" in column_types.get(col, "").lower():
+                    if primary_key and col == primary_key and self.db.is_auto_increment(selected_table, col):
                         continue  # Auto-Increment-Primärschlüssel überspringen
                     
                     new_values[col] = st.text_input(f"Neuer Wert für {col}")
@@ -946,21 +1136,15 @@ class TicketSystemUI:
                     if value == "":
                         new_values[key] = None
                 
-                # Insert-Query erstellen
-                cols = list(new_values.keys())
-                placeholders = [f":{col}" for col in cols]
-                
-                query = f"INSERT INTO {selected_table} ({', '.join(cols)}) VALUES ({', '.join(placeholders)})"
-                
-                try:
-                    self.db.execute_query(query, new_values)
+                if self.db.insert_record(selected_table, new_values, primary_key):
+                    self.db.invalidate_reference_data(selected_table)
                     st.success("Datensatz erfolgreich hinzugefügt!")
                     # Suchergebnisse zurücksetzen, um aktualisierte Daten zu sehen
                     if 'search_results' in st.session_state:
                         st.session_state.search_results = None
                     st.rerun()
-                except Exception as e:
-                    st.error(f"Fehler beim Hinzufügen des Datensatzes: {str(e)}")
+                else:
+                    st.error("Fehler beim Hinzufügen des Datensatzes.")
             
             # Datensatz löschen
             st.subheader("Datensatz löschen")
@@ -974,20 +1158,116 @@ class TicketSystemUI:
                 
                 if delete_record_id:
                     if st.button("🗑️ Löschen"):
-                        try:
-                            query = f"DELETE FROM {selected_table} WHERE {primary_key} = :value"
-                            self.db.execute_query(query, {"value": delete_record_id})
+                        if self.db.delete_record(selected_table, primary_key, delete_record_id):
+                            self.db.invalidate_reference_data(selected_table)
                             st.success(f"Datensatz mit {primary_key} = {delete_record_id} gelöscht.")
                             # Suchergebnisse zurücksetzen, um aktualisierte Daten zu sehen
                             if 'search_results' in st.session_state:
                                 st.session_state.search_results = None
                             st.rerun()
-                        except Exception as e:
-                            st.error("Fehler beim Löschen:")
-                            st.exception(e)
+                        else:
+                            st.error("Fehler beim Löschen des Datensatzes.")
             else:
                 st.info(f"Keine Daten in der Tabelle {selected_table} oder kein Primärschlüssel gefunden.")
     
+    def show_table_browser(self, table_name, primary_key):
+        """
+        Zeigt eine Tabelle seitenweise mit serverseitiger Sortierung und Filterung an.
+        
+        Args:
+            table_name: Name der Tabelle
+            primary_key: Primärschlüsselspalte (kann None sein)
+            
+        Returns:
+            pandas.DataFrame: Datensätze der aktuellen Seite
+        """
+        columns = self.db.get_columns(table_name)
+        if not columns:
+            return pd.DataFrame()
+        
+        col1, col2, col3, col4 = st.columns([2, 1, 2, 2])
+        
+        with col1:
+            sort_options = ([primary_key] if primary_key else []) + [col for col in columns if col != primary_key]
+            sort_column = st.selectbox("Sortieren nach", sort_options, key=f"browse_sort_{table_name}")
+        
+        with col2:
+            descending = st.checkbox("Absteigend", key=f"browse_desc_{table_name}")
+        
+        with col3:
+            filter_column = st.selectbox("Filtern nach", ["Kein Filter"] + columns, key=f"browse_filter_col_{table_name}")
+        
+        with col4:
+            filter_value = st.text_input("Filterwert", key=f"browse_filter_val_{table_name}",
+                                         disabled=filter_column == "Kein Filter")
+        
+        if filter_column == "Kein Filter":
+            filter_column, filter_value = None, None
+        
+        page_size = st.selectbox("Datensätze pro Seite", [25, 50, 100, 200], index=1, key=f"browse_size_{table_name}")
+        
+        # Paginierung je Tabelle zurücksetzen, sobald sich Sortierung, Filter oder Seitengröße ändern
+        filter_key = (sort_column, descending, filter_column, filter_value, page_size)
+        all_pagination = st.session_state.setdefault("table_pagination", {})
+        pagination = all_pagination.get(table_name)
+        if pagination is None or pagination["filter_key"] != filter_key:
+            pagination = {"filter_key": filter_key, "cursor": None, "direction": "next", "page": 1}
+            all_pagination[table_name] = pagination
+        
+        keyset = self.db.uses_table_keyset(table_name, primary_key, sort_column)
+        page_df, has_more = self.db.get_table_page(
+            table_name,
+            primary_key,
+            page_size=page_size,
+            sort_column=sort_column,
+            descending=descending,
+            filter_column=filter_column,
+            filter_value=filter_value,
+            cursor=pagination["cursor"],
+            direction=pagination["direction"],
+            offset=(pagination["page"] - 1) * page_size
+        )
+        total, is_estimate = self.db.count_table_rows(table_name, filter_column, filter_value)
+        
+        st.write(f"**{'ca. ' if is_estimate else ''}{total} Datensätze**")
+        
+        if page_df.empty:
+            return page_df
+        
+        st.dataframe(page_df, use_container_width=True)
+        
+        # Navigation zwischen den Seiten
+        has_previous = pagination["page"] > 1
+        has_next = has_more if not keyset or pagination["direction"] == "next" else True
+        
+        nav_col1, nav_col2, nav_col3 = st.columns([1, 2, 1])
+        
+        with nav_col1:
+            if st.button("◀ Zurück", disabled=not has_previous, key=f"browse_prev_{table_name}"):
+                pagination["page"] -= 1
+                if keyset:
+                    if pagination["page"] == 1:
+                        pagination["cursor"] = None
+                        pagination["direction"] = "next"
+                    else:
+                        pagination["cursor"] = page_df[primary_key].tolist()[0]
+                        pagination["direction"] = "prev"
+                st.rerun()
+        
+        with nav_col2:
+            pages = max(1, -(-total // page_size))
+            st.write(f"Seite {pagination['page']} von {'ca. ' if is_estimate else ''}{pages}")
+        
+        with nav_col3:
+            if st.button("Weiter ▶", disabled=not has_next, key=f"browse_next_{table_name}"):
+                pagination["page"] += 1
+                if keyset:
+                    pagination["cursor"] = page_df[primary_key].tolist()[-1]
+                    pagination["direction"] = "next"
+                st.rerun()
+        
+        return page_df
+    
     def show_table_search(self, table_name):
         """
         Zeigt die Suchfunktion für eine Tabelle an.
@@ -1017,6 +1297,7 @@ class TicketSystemUI:
         with col3:
             # Erweiterte Suchoptionen
             exact_match = st.checkbox("Exakte Übereinstimmung", key=f"exact_match_{table_name}")
+            prefix_match = st.checkbox("Nur Wortanfang (schneller)", key=f"prefix_match_{table_name}")
             case_sensitive = st.checkbox("Groß-/Kleinschreibung beachten", key=f"case_sensitive_{table_name}")
         
         # Suchbutton
@@ -1027,11 +1308,13 @@ class TicketSystemUI:
                 search_term=search_term,
                 search_columns=selected_columns if selected_columns else None,
                 exact_match=exact_match,
-                case_sensitive=case_sensitive
+                case_sensitive=case_sensitive,
+                prefix_match=prefix_match
             )
             
-            # Ergebnisse in Session speichern
+            # Ergebnisse und Suchplan in Session speichern
             st.session_state.search_results = results
+            st.session_state.search_plan = self.db.last_search_plan
             
             # Ergebnisse anzeigen
             if results.empty:
@@ -1047,6 +1330,16 @@ class TicketSystemUI:
             
             # Anzeige, dass Suchergebnisse aktiv sind
             st.info(f"Es werden Suchergebnisse angezeigt. Anzahl: {len(st.session_state.search_results)}")
+            
+            # Verwendeten Suchplan anzeigen
+            plan = st.session_state.get("search_plan")
+            if plan:
+                with st.expander("Suchplan"):
+                    st.write(f"**Strategie:** {plan['strategy']} ({plan['mode']})")
+                    st.write(f"**Über Index:** {', '.join(plan['indexed']) or '-'}")
+                    st.write(f"**Ohne Index:** {', '.join(plan['scanned']) or '-'}")
+                    st.write(f"**Übersprungen:** {', '.join(plan['skipped']) or '-'}")
+                    st.code(plan["sql"] or "", language="sql")
         
         # Trennlinie
         st.markdown("---")
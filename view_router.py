@@ -0,0 +1,100 @@
+import time
+import streamlit as st
+
+
+class ViewRouter:
+    """
+    Ersatz für st.tabs, bei dem nur die ausgewählte Ansicht ausgeführt wird.
+    st.tabs rendert bei jedem Rerun alle Tabs und führt damit auch deren Abfragen aus;
+    hier wählt ein Steuerelement die Ansicht, und nur deren Funktion läuft.
+    Zusätzlich hält der Router je Ansicht einen Daten-Cache in der Sitzung.
+    """
+
+    def __init__(self, key, views, metrics=None):
+        """
+        Initialisiert den Router.
+
+        Args:
+            key: Eindeutiger Schlüssel für Steuerelement und Cache in st.session_state
+            views: Liste von (Beschriftung, Funktion) oder (Beschriftung, Funktion, Seitenname)
+            metrics: QueryMetrics, um die Abfragen je Ansicht unter dem Seitennamen zu erfassen (optional)
+        """
+        self.key = key
+        self.views = {}
+        for view in views:
+            label, render = view[0], view[1]
+            page_name = view[2] if len(view) > 2 else None
+            self.views[label] = (render, page_name)
+        self.labels = list(self.views)
+        self.metrics = metrics
+
+    def _select(self):
+        # segmented_control gibt es erst ab Streamlit 1.40, sonst horizontale Radiobuttons
+        if hasattr(st, "segmented_control"):
+            selected = st.segmented_control(
+                "Ansicht", self.labels, default=self.labels[0], key=self.key, label_visibility="collapsed"
+            )
+        else:
+            selected = st.radio("Ansicht", self.labels, key=self.key, horizontal=True, label_visibility="collapsed")
+
+        # Abwählen der aktiven Ansicht ist beim segmented_control möglich
+        return selected if selected in self.views else self.labels[0]
+
+    def render(self):
+        """
+        Zeigt das Auswahl-Steuerelement und führt nur die gewählte Ansicht aus.
+
+        Returns:
+            str: Beschriftung der angezeigten Ansicht
+        """
+        selected = self._select()
+        render, page_name = self.views[selected]
+
+        if self.metrics is not None and page_name:
+            with self.metrics.page(page_name):
+                render()
+        else:
+            render()
+        return selected
+
+    def _cache(self):
+        return st.session_state.setdefault(f"{self.key}_cache", {})
+
+    def cached(self, view, name, loader, version=None, ttl=None):
+        """
+        Gibt Daten einer Ansicht aus dem Sitzungs-Cache zurück und lädt sie bei Bedarf.
+
+        Args:
+            view: Beschriftung oder Name der Ansicht
+            name: Name der Daten innerhalb der Ansicht
+            loader: Funktion ohne Argumente, die die Daten lädt
+            version: Versionsstand der Quelle; bei Abweichung wird neu geladen (optional)
+            ttl: Maximales Alter in Sekunden (optional)
+
+        Returns:
+            Geladene oder zwischengespeicherte Daten
+        """
+        view_cache = self._cache().setdefault(view, {})
+        entry = view_cache.get(name)
+        now = time.monotonic()
+
+        if entry is not None:
+            loaded_at, cached_version, value = entry
+            if cached_version == version and (ttl is None or now - loaded_at < ttl):
+                return value
+
+        value = loader()
+        view_cache[name] = (now, version, value)
+        return value
+
+    def invalidate(self, view=None):
+        """
+        Verwirft zwischengespeicherte Daten einer oder aller Ansichten.
+
+        Args:
+            view: Beschriftung oder Name der Ansicht (optional, sonst alle)
+        """
+        if view is None:
+            self._cache().clear()
+        else:
+            self._cache().pop(view, None)